@@ -0,0 +1,84 @@
+"""Latency of the contractor typeahead index.
+
+Usage:
+    python -m benchmarks.contractor_search [contractors] [queries]
+"""
+import os
+import random
+import string
+import sys
+import time
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quickbids.settings')
+django.setup()
+
+from quickbidsapi.search import ContractorIndex  # noqa: E402  pylint: disable=wrong-import-position
+
+FIRST_NAMES = ['Ryan', 'Meg', 'Jenna', 'Bryan', 'Emily', 'Tyler', 'Maria', 'Jose',
+               'Aisha', 'Chen', 'Olga', 'Sam', 'Priya', 'Noah', 'Grace', 'Luis']
+TRADES = ['Painting', 'Drywall', 'Flooring', 'Electric', 'Plumbing', 'Roofing',
+          'Construction', 'Builders', 'Concrete', 'Glass', 'Framing', 'Tile']
+
+
+def random_word(rng, low=4, high=10):
+    return ''.join(rng.choice(string.ascii_lowercase)
+                   for _ in range(rng.randint(low, high))).capitalize()
+
+
+def contractor_rows(count, rng):
+    for pk in range(1, count + 1):
+        last_name = random_word(rng)
+        company_name = f'{random_word(rng)} {rng.choice(TRADES)}'
+        yield (pk, company_name, rng.choice(FIRST_NAMES), last_name, rng.random() < 0.2)
+
+
+def queries(rows, count, rng):
+    for _ in range(count):
+        _, company_name, first_name, last_name, _ = rng.choice(rows)
+        kind = rng.random()
+        if kind < 0.6:
+            word = rng.choice(company_name.split() + [last_name])
+            yield word[:rng.randint(1, len(word))]
+        elif kind < 0.8:
+            yield f'{first_name} {last_name[:rng.randint(1, 4)]}'
+        else:
+            # A typo in a last name exercises the trigram fallback
+            position = rng.randrange(len(last_name))
+            yield last_name[:position] + rng.choice(string.ascii_lowercase) \
+                + last_name[position + 1:]
+
+
+def main():
+    contractors = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    query_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    rng = random.Random(42)
+
+    rows = list(contractor_rows(contractors, rng))
+    index = ContractorIndex()
+    started = time.perf_counter()
+    index.build(rows)
+    print(f'built index of {contractors} contractors in '
+          f'{time.perf_counter() - started:.2f}s')
+
+    timings = []
+    for query in queries(rows, query_count, rng):
+        started = time.perf_counter()
+        index.search(query, 10)
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    for label, quantile in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0)):
+        value = timings[min(int(len(timings) * quantile), len(timings) - 1)]
+        print(f'{label}: {value * 1000:.3f}ms')
+
+    started = time.perf_counter()
+    for pk, *row in rows[:1000]:
+        index.update(pk, *row)
+    per_update = (time.perf_counter() - started) / 1000
+    print(f'incremental update: {per_update * 1000:.3f}ms per contractor')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Time to build list responses with DRF ModelSerializers versus readers.
+
+The ModelSerializers below are the ones the views used before
+``quickbidsapi.readers``; every run also checks the rendered bytes match.
+Runs against a throwaway test database.
+
+Usage:
+    python -m benchmarks.read_serializers [bids] [repeat]
+"""
+import sys
+import time
+
+from benchmarks.streaming_memory import seed
+
+# pylint: disable=wrong-import-position,wrong-import-order
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework import serializers  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from quickbidsapi.models import Bid, Contractor, Field, Job, JobField  # noqa: E402
+from quickbidsapi.readers import bid_reader, contractor_reader, job_reader  # noqa: E402
+
+
+class FieldSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Field
+        fields = ('id', 'job_title',)
+
+
+class ContractorSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Contractor
+        fields = ('id', 'company_name',)
+
+
+class JobSerializer(serializers.ModelSerializer):
+
+    fields = FieldSerializer(many=True)
+    contractor = ContractorSummarySerializer(many=False)
+
+    class Meta:
+        model = Job
+        fields = ('id', 'contractor', 'fields', 'name', 'address',
+                  'square_footage', 'open', 'complete',)
+
+
+class JobSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ('id', 'name', 'contractor_id', 'complete', 'open')
+
+
+class BidSerializer(serializers.ModelSerializer):
+
+    job = JobSummarySerializer(many=False)
+    primary_contractor = ContractorSummarySerializer(many=False)
+    sub_contractor = ContractorSummarySerializer(many=False)
+
+    class Meta:
+        model = Bid
+        fields = ('id', 'rate', 'job', 'primary_contractor',
+                  'sub_contractor', 'accepted', 'rejected', 'is_request',)
+
+
+class ContractorSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Contractor
+        fields = ('id', 'first_name', 'last_name', 'username', 'email',
+                  'company_name', 'phone_number', 'primary_contractor', 'full_name')
+
+
+def seed_extra(contractors):
+    fields = Field.objects.bulk_create(Field(job_title=f'Trade {i}') for i in range(5))
+    JobField.objects.bulk_create(
+        JobField(job=job, field=fields[(job.pk + i) % len(fields)])
+        for job in Job.objects.all() for i in range(2))
+    users = User.objects.bulk_create(
+        User(username=f'extra{i}', first_name='First', last_name=f'Last{i}')
+        for i in range(contractors))
+    Contractor.objects.bulk_create(
+        Contractor(user=user, company_name=f'Extra {user.pk}', phone_number='5555555555')
+        for user in users)
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, min(timings)
+
+
+def main():
+    bids = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    render = JSONRenderer().render
+
+    cases = [
+        ('bids', lambda: BidSerializer(Bid.objects.select_related(
+            'job', 'primary_contractor', 'sub_contractor'), many=True).data,
+         lambda: bid_reader.read(Bid.objects.all())),
+        ('jobs', lambda: JobSerializer(Job.objects.select_related(
+            'contractor').prefetch_related('fields'), many=True).data,
+         lambda: job_reader.read(Job.objects.all())),
+        ('contractors', lambda: ContractorSerializer(Contractor.objects.select_related(
+            'user'), many=True).data,
+         lambda: contractor_reader.read(Contractor.objects.all())),
+    ]
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        seed(bids)
+        seed_extra(bids // 10)
+        for label, serializer, reader in cases:
+            expected, serializer_time = best_of(repeat, lambda: render(serializer()))
+            content, reader_time = best_of(repeat, lambda: render(reader()))
+            assert content == expected, f'{label} output differs'
+            print(f'{label}: serializer {serializer_time * 1000:.1f}ms, '
+                  f'reader {reader_time * 1000:.1f}ms '
+                  f'({serializer_time / reader_time:.1f}x)')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Peak memory of rendering the bid list in one piece versus in chunks.
+
+Runs against a throwaway test database.
+
+Usage:
+    python -m benchmarks.streaming_memory [rows ...]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'quickbids.settings')
+django.setup()
+
+# pylint: disable=wrong-import-position
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from quickbidsapi.models import Bid, Contractor, Job  # noqa: E402
+from quickbidsapi.readers import bid_reader  # noqa: E402
+from quickbidsapi.streaming import iter_chunks, stream_json  # noqa: E402
+
+
+def seed(rows):
+    Bid.objects.all().delete()
+    if not Contractor.objects.exists():
+        users = User.objects.bulk_create(
+            User(username=f'bench{i}') for i in range(2))
+        Contractor.objects.bulk_create(
+            Contractor(user=user, company_name=f'Bench {user.pk}', phone_number='5555555555',
+                       primary_contractor=i == 0) for i, user in enumerate(users))
+        primary = Contractor.objects.get(primary_contractor=True)
+        Job.objects.bulk_create(
+            Job(contractor=primary, name=f'Job {i}', address=f'{i} Bench Rd', open=True)
+            for i in range(100))
+    primary, sub = Contractor.objects.order_by('-primary_contractor')
+    jobs = list(Job.objects.values_list('pk', flat=True))
+    for start in range(0, rows, 10_000):
+        Bid.objects.bulk_create(
+            Bid(rate=i % 50, job_id=jobs[i % len(jobs)], primary_contractor=primary,
+                sub_contractor=sub) for i in range(start, min(start + 10_000, rows)))
+
+
+def measure(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    queryset = Bid.objects.all()
+
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        for rows in sizes:
+            seed(rows)
+
+            def buffered():
+                return JSONRenderer().render(bid_reader.read(queryset.all()))
+
+            def streamed():
+                # Only the length is kept, as a client reading the stream would
+                return sum(len(part) for part in stream_json(
+                    iter_chunks([(queryset.all(), bid_reader)],
+                                settings.STREAM_CHUNK_SIZE)))
+
+            content, buffered_peak, buffered_time = measure(buffered)
+            length, streamed_peak, streamed_time = measure(streamed)
+            assert length == len(content)
+            assert b''.join(stream_json(iter_chunks(
+                [(queryset.all(), bid_reader)], settings.STREAM_CHUNK_SIZE))) == content
+            del content
+
+            print(f'{rows} bids: buffered {buffered_peak / 2**20:.1f}MiB '
+                  f'in {buffered_time:.2f}s, streamed {streamed_peak / 2**20:.1f}MiB '
+                  f'in {streamed_time:.2f}s')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -46,7 +46,9 @@ INSTALLED_APPS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
+        'quickbidsapi.batch.BatchAuthentication',
         'rest_framework.authentication.TokenAuthentication',
+        'quickbidsapi.signed_tokens.SignedTokenAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -61,6 +63,8 @@ CORS_ORIGIN_WHITELIST = (
 )
 
 MIDDLEWARE = [
+    'quickbidsapi.metrics.MetricsMiddleware',
+    'quickbidsapi.slow_queries.QueryContextMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -69,6 +73,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'quickbidsapi.profiling.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'quickbids.urls'
@@ -99,9 +104,200 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file backed test database gives concurrent tests the same locking
+        # behaviour as production instead of SQLite's shared memory cache
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    }
+}
+
+# Bids can be hash partitioned by job across several databases. Each alias in
+# BID_SHARD_DATABASES is declared below and only ever holds the bid table;
+# BID_SHARDS lists the ones in use, in order (`BID_SHARDS=bids_0,bids_1`), and
+# is empty to keep every bid in the default database. Existing bids are moved
+# with `manage.py reshard_bids` before BID_SHARDS changes
+BID_SHARD_DATABASES = [
+    alias for alias in os.environ.get('BID_SHARD_DATABASES', 'bids_0,bids_1').split(',') if alias]
+BID_SHARDS = [alias for alias in os.environ.get('BID_SHARDS', '').split(',') if alias]
+RESHARD_BATCH_SIZE = 1000
+for alias in BID_SHARD_DATABASES:
+    DATABASES[alias] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'{alias}.sqlite3',
+        'TEST': {
+            'NAME': BASE_DIR / f'test_{alias}.sqlite3',
+        },
     }
+
+DATABASE_ROUTERS = ['quickbidsapi.routers.BidShardRouter']
+
+
+# Caches
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'idempotency': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'idempotency',
+        'TIMEOUT': 60 * 60 * 24,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
 }
 
+# /login and /register respond with a DRF token unless the request asks for a
+# token_type of 'signed': a stateless token valid for SIGNED_TOKEN_MAX_AGE
+# seconds. Each process rereads revoked signed tokens at most every
+# SIGNED_TOKEN_REVOCATION_SYNC_SECONDS
+DEFAULT_TOKEN_TYPE = 'token'
+SIGNED_TOKEN_MAX_AGE = 60 * 60 * 24
+SIGNED_TOKEN_REVOCATION_SYNC_SECONDS = 30
+
+# Cache alias that stores first responses for Idempotency-Key replays
+IDEMPOTENCY_CACHE_ALIAS = 'idempotency'
+
+# Seconds a contractor dashboard stays cached between invalidations
+DASHBOARD_CACHE_TIMEOUT = 60 * 5
+
+# Largest number of rows a single ?ids= batch retrieval may ask for
+MULTIGET_MAX_IDS = 100
+
+# Rendered responses of the read endpoints are kept in a per process LRU of
+# this many entries. Point RESPONSE_CACHE_SHARED_ALIAS at a cache shared by
+# every worker process (e.g. memcached) to share entries and invalidations.
+# Without one, a write is only seen by the process that handled it, so entries
+# in the LRU expire after RESPONSE_CACHE_LOCAL_TIMEOUT seconds, the longest
+# another process can serve a response from before the write
+RESPONSE_CACHE_MAX_ENTRIES = 1000
+RESPONSE_CACHE_SHARED_ALIAS = None
+RESPONSE_CACHE_TIMEOUT = 60 * 5
+RESPONSE_CACHE_LOCAL_TIMEOUT = 5
+# Longest a request waits on an identical in-flight request before computing
+# the response itself
+RESPONSE_CACHE_WAIT_SECONDS = 10
+# Streamed lists up to this many bytes are read whole and cached; longer ones
+# are streamed to the client without being cached
+RESPONSE_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+# Seconds before the contractor typeahead index is rebuilt from the database
+# to pick up writes made by other processes
+SEARCH_INDEX_MAX_AGE = 60 * 5
+SEARCH_MAX_RESULTS = 50
+
+# Accepted rate samples behind /analytics/rates are rebuilt from the database
+# when older than this, picking up writes from other processes
+ANALYTICS_MAX_AGE = 60 * 5
+ANALYTICS_HISTOGRAM_BUCKETS = 10
+
+# /analytics/activity returns ACTIVITY_DEFAULT_BUCKETS hours or days up to
+# now unless a range is given, and never more than ACTIVITY_MAX_BUCKETS
+ACTIVITY_DEFAULT_BUCKETS = 30
+ACTIVITY_MAX_BUCKETS = 24 * 92
+
+# Suggested rates come from a per field fit refreshed by `manage.py
+# fit_rate_model` or every RATE_MODEL_REFRESH_SECONDS by the worker; fields
+# with fewer accepted bids than RATE_MODEL_MIN_SAMPLES suggest their mean rate
+RATE_MODEL_MIN_SAMPLES = 5
+RATE_MODEL_REFRESH_SECONDS = 60 * 60 * 24
+
+# GET /sync returns at most SYNC_PAGE_SIZE change log entries per page.
+# `manage.py compact_change_log` drops superseded entries and tombstones older
+# than the retention; the worker reruns it every SYNC_COMPACT_INTERVAL_SECONDS
+SYNC_PAGE_SIZE = 500
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+SYNC_COMPACT_BATCH_SIZE = 10000
+SYNC_COMPACT_INTERVAL_SECONDS = 60 * 60
+
+# Bid and job changes are buffered and appended to AUDIT_LOG_PATH every
+# AUDIT_FLUSH_SIZE records or AUDIT_FLUSH_SECONDS, whichever comes first, so a
+# crash loses at most that much. Past AUDIT_MAX_BUFFERED unwritten records the
+# oldest are dropped
+AUDIT_LOG_PATH = os.environ.get('AUDIT_LOG_PATH', BASE_DIR / 'audit.log')
+AUDIT_FLUSH_SIZE = 100
+AUDIT_FLUSH_SECONDS = 1
+AUDIT_FSYNC = True
+AUDIT_MAX_BUFFERED = 100000
+
+# POST /batch runs at most BATCH_MAX_REQUESTS sub-requests, running
+# consecutive reads on up to BATCH_MAX_WORKERS threads
+BATCH_MAX_REQUESTS = 20
+BATCH_MAX_WORKERS = 4
+
+# List endpoints read and render this many rows at a time and stream results
+# that do not fit in one chunk, unless the response cache keeps them (see
+# RESPONSE_CACHE_MAX_BYTES)
+STREAM_CHUNK_SIZE = 1000
+
+# Completed jobs older than this are moved to the archive tables by
+# `manage.py archive_jobs`, this many jobs per transaction
+ARCHIVE_COMPLETED_JOBS_AFTER_DAYS = 90
+ARCHIVE_BATCH_SIZE = 100
+
+# Contractor rosters imported by `manage.py import_roster` or POST
+# /contractors/import are written ROSTER_BATCH_SIZE rows per transaction, with
+# passwords hashed on ROSTER_HASH_WORKERS processes. The endpoint queues the
+# import for `manage.py run_worker` and takes at most ROSTER_MAX_REQUEST_ROWS
+# rows; larger rosters go through the command
+ROSTER_HASH_WORKERS = int(os.environ.get('ROSTER_HASH_WORKERS', os.cpu_count() or 1))
+ROSTER_BATCH_SIZE = 500
+ROSTER_MAX_REQUEST_ROWS = 1000
+
+# Every worker process records request, database and cache metrics in its own
+# memory mapped file in METRICS_DIR, and GET /metrics sums them all. Empty the
+# directory when the service restarts. Scrapers send METRICS_TOKEN as a bearer
+# token; without one /metrics is refused unless METRICS_PUBLIC opens it to
+# anyone. The open job and pending bid counts are read at most every
+# METRICS_GAUGE_CACHE_SECONDS
+METRICS_DIR = os.environ.get('METRICS_DIR', BASE_DIR / 'metrics')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+METRICS_PUBLIC = False
+METRICS_GAUGE_CACHE_SECONDS = 15
+
+# Statements slower than SLOW_QUERY_THRESHOLD_MS are appended to
+# SLOW_QUERY_LOG_PATH with their view, call site and, unless SLOW_QUERY_EXPLAIN
+# is off, their plan, explained at most once per statement every
+# SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS; `manage.py slow_queries` summarizes them.
+# SLOW_QUERY_THRESHOLD_MS=off in the environment, or None here, turns the log off
+SLOW_QUERY_THRESHOLD_MS = os.environ.get('SLOW_QUERY_THRESHOLD_MS', '100')
+SLOW_QUERY_THRESHOLD_MS = None if SLOW_QUERY_THRESHOLD_MS.lower() in ('off', 'none', '') \
+    else float(SLOW_QUERY_THRESHOLD_MS)
+SLOW_QUERY_LOG_PATH = os.environ.get('SLOW_QUERY_LOG_PATH', BASE_DIR / 'slow_queries.log')
+SLOW_QUERY_EXPLAIN = True
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = 60 * 10
+
+# A request from a staff user sending the PROFILE_HEADER header, or picked at
+# random at PROFILE_SAMPLE_RATE (0 to 1), is profiled into PROFILE_DIR: cProfile
+# statistics, stacks sampled every PROFILE_SAMPLE_INTERVAL_MS and a tracemalloc
+# summary. The newest PROFILE_MAX_CAPTURES are kept, and GET /profiles lists
+# PROFILE_INDEX_SIZE of them
+PROFILE_DIR = os.environ.get('PROFILE_DIR', BASE_DIR / 'profiles')
+PROFILE_HEADER = 'X-Profile'
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_SAMPLE_INTERVAL_MS = 1
+PROFILE_MAX_CAPTURES = 200
+PROFILE_INDEX_SIZE = 50
+
+# Admin changelists count unfiltered tables larger than this from the
+# database's statistics instead of a full COUNT(*)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 10000
+
+# Rows deleted per transaction when purging soft deleted contractors and jobs
+PURGE_BATCH_SIZE = 500
+PURGE_BATCHES_PER_TASK = 10
+
+# Background task queue drained by `manage.py run_worker`
+TASK_WORKER_THREADS = 4
+TASK_POLL_SECONDS = 1
+TASK_LEASE_SECONDS = 60 * 5
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY_SECONDS = 10
+TASK_CLAIM_CANDIDATES = 10
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -15,12 +15,13 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework import routers
 from quickbidsapi.views import (
-    register_user, login_user, ContractorView, FieldView, BidView, JobView)
+    register_user, login_user, logout_user, sync_changes, batch_requests, metrics, profiles, profile_file,
+    ContractorView, FieldView, BidView, JobView, AnalyticsView)
 
 
 router = routers.DefaultRouter(trailing_slash=False)
@@ -28,10 +29,17 @@ router.register(r'contractors', ContractorView, 'contractor')
 router.register(r'fields', FieldView, 'field')
 router.register(r'bids', BidView, 'bid')
 router.register(r'jobs', JobView, 'job')
+router.register(r'analytics', AnalyticsView, 'analytics')
 
 urlpatterns = [
     path('register', register_user),
     path('login', login_user),
+    path('logout', logout_user),
+    path('sync', sync_changes),
+    path('batch', batch_requests),
+    path('metrics', metrics),
+    path('profiles', profiles),
+    re_path(r'^profiles/(?P<capture_id>[\w-]+)\.(?P<kind>prof|folded)$', profile_file),
     path('admin/', admin.site.urls),
     path('', include(router.urls))
 ]
@@ -0,0 +1,164 @@
+"""Hourly and daily bid activity behind ``/analytics/activity``.
+
+Every bid save adjusts the ActivityRollup rows its timestamps fall in: a bid
+counts towards ``bids`` and ``rate_sum`` in the hour and day it was created
+and towards ``accepted`` and ``accepted_rate_sum`` in the hour and day it was
+accepted. Each of those is kept for every bid, for each field the bid's job
+needs and for the bid's primary contractor. A save subtracts what the bid
+contributed as loaded and adds what it contributes now, in the save's own
+transaction, so reading a dashboard only reads one row per bucket.
+
+Bids are counted against the job fields and contractor they have when saved,
+and stay counted when deleted. ``manage.py rebuild_activity`` recounts the
+rollups from the bids that still exist.
+"""
+from datetime import timedelta
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from quickbidsapi.models import ActivityRollup, ArchivedBid, ArchivedJobField, Bid, JobField
+from quickbidsapi.sharding import bid_shards
+
+BUCKETS = {
+    ActivityRollup.HOUR: timedelta(hours=1),
+    ActivityRollup.DAY: timedelta(days=1),
+}
+
+
+def bucket_start(moment, bucket):
+    """The start of the UTC hour or day ``moment`` falls in"""
+    start = moment.replace(minute=0, second=0, microsecond=0)
+    if bucket == ActivityRollup.DAY:
+        start = start.replace(hour=0)
+    return start
+
+
+def _contributions(created_at, accepted_at, rate):
+    """``(moment, counts)`` pairs a bid with these values adds to the rollups"""
+    rated = rate is not None
+    contributions = []
+    if created_at is not None:
+        contributions.append((created_at, {
+            'bids': 1, 'rated_bids': int(rated), 'rate_sum': rate or 0.0}))
+    if accepted_at is not None:
+        contributions.append((accepted_at, {
+            'accepted': 1, 'rated_accepted': int(rated), 'accepted_rate_sum': rate or 0.0}))
+    return contributions
+
+
+def _scopes(job_id, primary_contractor_id):
+    field_ids = JobField._base_manager.filter(job_id=job_id).values_list('field_id', flat=True)
+    return [(ActivityRollup.ALL, 0), (ActivityRollup.CONTRACTOR, primary_contractor_id)] \
+        + [(ActivityRollup.FIELD, field_id) for field_id in field_ids]
+
+
+def _add(scopes, moment, counts, sign):
+    deltas = {name: F(name) + sign * value for name, value in counts.items() if value}
+    for bucket in BUCKETS:
+        start = bucket_start(moment, bucket)
+        for scope, scope_id in scopes:
+            rollup = ActivityRollup.objects.filter(
+                bucket=bucket, scope=scope, scope_id=scope_id, start=start)
+            if rollup.update(**deltas):
+                continue
+            try:
+                with transaction.atomic():
+                    ActivityRollup.objects.create(
+                        bucket=bucket, scope=scope, scope_id=scope_id, start=start,
+                        **{name: sign * value for name, value in counts.items()})
+            except IntegrityError:
+                # Another writer created the row first
+                rollup.update(**deltas)
+
+
+def record_bid_activity(bid, created, changes):
+    """Moves a bid's counts from what it was loaded with to what it was saved with
+
+    Args:
+        changes (dict): The bid's ``audit_changes()`` for this save.
+    """
+    def before(name):
+        return changes[name][0] if name in changes else getattr(bid, name)
+
+    old = [] if created else _contributions(bid.created_at, before('accepted_at'), before('rate'))
+    new = _contributions(bid.created_at, bid.accepted_at, bid.rate)
+    if old == new:
+        return
+
+    scopes = _scopes(bid.job_id, bid.primary_contractor_id)
+    for moment, counts in old:
+        _add(scopes, moment, counts, -1)
+    for moment, counts in new:
+        _add(scopes, moment, counts, 1)
+
+
+def remove_acceptances(job_id, bids):
+    """Subtracts the acceptances of a job's bids from the rollups before a bulk
+    ``update()``, which skips ``save()``, clears them
+
+    Args:
+        bids (list): ``(accepted_at, rate, primary_contractor_id)`` of each bid.
+    """
+    for accepted_at, rate, primary_contractor_id in bids:
+        if accepted_at is None:
+            continue
+        scopes = _scopes(job_id, primary_contractor_id)
+        for moment, counts in _contributions(None, accepted_at, rate):
+            _add(scopes, moment, counts, -1)
+
+
+def rebuild_activity():
+    """Recounts every rollup from the live and archived bids. Returns the rows written."""
+    totals = {}
+    sources = [(Bid._base_manager.using(alias), JobField) for alias in bid_shards()]
+    sources.append((ArchivedBid._base_manager.all(), ArchivedJobField))
+    for bids, fields in sources:
+        field_ids = {}
+        for job_id, field_id in fields._base_manager.values_list('job_id', 'field_id'):
+            field_ids.setdefault(job_id, []).append(field_id)
+
+        for created_at, accepted_at, rate, job_id, primary_contractor_id in \
+                bids.values_list(
+                    'created_at', 'accepted_at', 'rate', 'job_id', 'primary_contractor_id'
+                ).iterator():
+            scopes = [(ActivityRollup.ALL, 0), (ActivityRollup.CONTRACTOR, primary_contractor_id)] \
+                + [(ActivityRollup.FIELD, field_id) for field_id in field_ids.get(job_id, ())]
+            for moment, counts in _contributions(created_at, accepted_at, rate):
+                for bucket in BUCKETS:
+                    start = bucket_start(moment, bucket)
+                    for scope, scope_id in scopes:
+                        row = totals.setdefault((bucket, scope, scope_id, start), {})
+                        for name, value in counts.items():
+                            row[name] = row.get(name, 0) + value
+
+    rollups = [ActivityRollup(bucket=bucket, scope=scope, scope_id=scope_id, start=start, **counts)
+               for (bucket, scope, scope_id, start), counts in totals.items()]
+    with transaction.atomic():
+        ActivityRollup.objects.all().delete()
+        ActivityRollup.objects.bulk_create(rollups, batch_size=1000)
+    return rollups
+
+
+def activity_series(bucket, scope, scope_id, since, until):
+    """One entry per bucket from ``since`` to ``until``, empty buckets included"""
+    first, last = bucket_start(since, bucket), bucket_start(until, bucket)
+    rows = {
+        row.start: row for row in ActivityRollup.objects.filter(
+            bucket=bucket, scope=scope, scope_id=scope_id, start__gte=first, start__lte=last)
+    }
+
+    series = []
+    start = first
+    while start <= last:
+        row = rows.get(start) or ActivityRollup()
+        series.append({
+            'start': start,
+            'bids': row.bids,
+            'rate_sum': row.rate_sum,
+            'average_rate': row.rate_sum / row.rated_bids if row.rated_bids else None,
+            'accepted': row.accepted,
+            'accepted_rate_sum': row.accepted_rate_sum,
+            'average_accepted_rate':
+                row.accepted_rate_sum / row.rated_accepted if row.rated_accepted else None,
+        })
+        start += BUCKETS[bucket]
+    return series
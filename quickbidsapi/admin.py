@@ -1,3 +1,256 @@
+"""Admin for support staff, built for tables too large to count or list naively.
+
+Every changelist selects the rows it displays in the same query, picks related
+rows with raw id or autocomplete widgets rather than a dropdown of the whole
+table, and only filters on indexed columns. An unfiltered changelist takes its
+row count from the database's table statistics once the table holds more than
+``settings.ADMIN_ESTIMATED_COUNT_THRESHOLD`` rows, and the "show all" count is
+never run.
+
+Deleted contractors and jobs are listed too. They are deleted through the API,
+which hides them at once and purges their rows in the background, since the
+admin's cascade would hold the write lock for as long as it takes.
+
+With ``BID_SHARDS`` set bids are listed one shard at a time, without their job
+and contractors, which live in the default database.
+"""
+from django.conf import settings
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections, transaction
+from django.utils.functional import cached_property
+from quickbidsapi.audit import record_update
+from quickbidsapi.changelog import log_rows
+from quickbidsapi.dashboard import invalidate_dashboards
+from quickbidsapi.models import Bid, Contractor, Field, Job, JobField
+from quickbidsapi.response_cache import bump
+from quickbidsapi.sharding import bid_shards, bids_on_jobs, is_sharded
+
+
+def estimated_rows(model, using):
+    """The row count of ``model``'s table from the database's statistics, or
+    None when it keeps none
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s', [table])
+        elif connection.vendor == 'sqlite':
+            # Only there once ANALYZE has run
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table])
+            row = cursor.fetchone()
+            return int(row[0].split()[0]) if row else None
+        else:
+            return None
+        row = cursor.fetchone()
+    # PostgreSQL reports -1 for a table never analyzed
+    return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Counts an unfiltered changelist of a large table from its statistics"""
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            estimate = estimated_rows(self.object_list.model, self.object_list.db)
+            if estimate is not None and estimate > settings.ADMIN_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-id',)
+
+    def get_queryset(self, request):
+        # Soft deleted rows included, and none of the default managers' joins
+        return self.model._base_manager.all()
+
+
+class DeletedFilter(admin.SimpleListFilter):
+    title = 'deleted'
+    parameter_name = 'deleted'
+
+    def lookups(self, request, model_admin):
+        return [('no', 'No'), ('yes', 'Yes')]
+
+    def queryset(self, request, queryset):
+        if self.value() in ('no', 'yes'):
+            return queryset.filter(deleted_at__isnull=self.value() == 'no')
+        return queryset
+
+
+class JobStatusFilter(admin.SimpleListFilter):
+    """Filters on the ``job_status_idx`` index"""
+    title = 'status'
+    parameter_name = 'status'
+
+    def lookups(self, request, model_admin):
+        return [('open', 'Open'), ('in_progress', 'In progress'), ('complete', 'Complete')]
+
+    def queryset(self, request, queryset):
+        if self.value() == 'open':
+            return queryset.filter(open=True)
+        if self.value() == 'in_progress':
+            return queryset.filter(open=False, complete=False)
+        if self.value() == 'complete':
+            return queryset.filter(open=False, complete=True)
+        return queryset
+
+
+class BidStatusFilter(admin.SimpleListFilter):
+    """Filters on the ``bid_status_idx`` index"""
+    title = 'status'
+    parameter_name = 'status'
+
+    def lookups(self, request, model_admin):
+        return [('pending', 'Pending'), ('accepted', 'Accepted'), ('rejected', 'Rejected')]
+
+    def queryset(self, request, queryset):
+        if self.value() == 'pending':
+            return queryset.filter(accepted=False, rejected=False)
+        if self.value() == 'accepted':
+            return queryset.filter(accepted=True)
+        if self.value() == 'rejected':
+            return queryset.filter(accepted=False, rejected=True)
+        return queryset
+
+
+class ShardFilter(admin.SimpleListFilter):
+    """Picks the bid shard to list, the first one by default"""
+    title = 'shard'
+    parameter_name = 'shard'
+
+    def lookups(self, request, model_admin):
+        return [(alias, alias) for alias in bid_shards()]
+
+    def choices(self, changelist):
+        # There is no listing every shard at once
+        for lookup, title in self.lookup_choices:
+            yield {
+                'selected': (self.value() or bid_shards()[0]) == lookup,
+                'query_string': changelist.get_query_string({self.parameter_name: lookup}),
+                'display': title,
+            }
+
+    def queryset(self, request, queryset):
+        alias = self.value() if self.value() in bid_shards() else bid_shards()[0]
+        return queryset.using(alias)
+
+
+@admin.register(Contractor)
+class ContractorAdmin(LargeTableAdmin):
+    list_display = ('id', 'company_name', 'username', 'email', 'primary_contractor', 'deleted_at')
+    list_select_related = ('user',)
+    list_filter = (DeletedFilter,)
+    search_fields = ('^company_name', '=user__username', '=user__email')
+    raw_id_fields = ('user',)
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Field)
+class FieldAdmin(admin.ModelAdmin):
+    list_display = ('id', 'job_title')
+    search_fields = ('^job_title',)
+    ordering = ('job_title',)
+
+
+@admin.register(Job)
+class JobAdmin(LargeTableAdmin):
+    list_display = ('id', 'name', 'contractor', 'open', 'complete', 'created_at', 'deleted_at')
+    list_select_related = ('contractor',)
+    list_filter = (JobStatusFilter, DeletedFilter, 'created_at', 'completed_at')
+    search_fields = ('^name',)
+    autocomplete_fields = ('contractor',)
+    actions = ['close_jobs']
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='Close selected jobs to new bids')
+    def close_jobs(self, request, queryset):
+        with transaction.atomic():
+            jobs = {row['id']: row for row in queryset.filter(open=True).values(
+                'id', 'open', 'contractor_id')}
+            # One UPDATE, which skips save() and the post_save receivers
+            closed = Job._base_manager.filter(pk__in=list(jobs)).update(open=False)
+            record_update(Job, jobs, open=False)
+            log_rows(Job._base_manager.filter(pk__in=list(jobs)))
+
+        contractor_ids = {job['contractor_id'] for job in jobs.values()}
+        for bids in bids_on_jobs(list(jobs)):
+            for primary_id, sub_id in bids.values_list(
+                    'primary_contractor_id', 'sub_contractor_id'):
+                contractor_ids.update((primary_id, sub_id))
+        invalidate_dashboards(*contractor_ids)
+        bump(Job)
+        self.message_user(request, f'Closed {closed} jobs')
+
+
+@admin.register(JobField)
+class JobFieldAdmin(LargeTableAdmin):
+    list_display = ('id', 'job', 'field')
+    list_select_related = ('job', 'field')
+    list_filter = ('field',)
+    autocomplete_fields = ('job', 'field')
+
+
+@admin.register(Bid)
+class BidAdmin(LargeTableAdmin):
+    list_display = ('id', 'job', 'primary_contractor', 'sub_contractor', 'rate',
+                    'accepted', 'rejected', 'is_request', 'created_at')
+    list_select_related = ('job', 'primary_contractor', 'sub_contractor')
+    list_filter = (BidStatusFilter, 'created_at')
+    raw_id_fields = ('job',)
+    autocomplete_fields = ('primary_contractor', 'sub_contractor')
+    actions = ['reject_bids']
+
+    def get_list_display(self, request):
+        if is_sharded():
+            # A shard cannot join the jobs and contractors
+            return [f'{name}_id' if name in ('job', 'primary_contractor', 'sub_contractor')
+                    else name for name in self.list_display]
+        return self.list_display
+
+    def get_list_select_related(self, request):
+        return () if is_sharded() else self.list_select_related
+
+    def get_list_filter(self, request):
+        return (ShardFilter, *self.list_filter) if is_sharded() else self.list_filter
+
+    def get_object(self, request, object_id, from_field=None):
+        if not is_sharded():
+            return super().get_object(request, object_id, from_field)
+        for alias in bid_shards():
+            bid = Bid._base_manager.using(alias).filter(pk=object_id).first()
+            if bid is not None:
+                return bid
+        return None
+
+    @admin.action(description='Reject selected pending bids')
+    def reject_bids(self, request, queryset):
+        with transaction.atomic(using=queryset.db):
+            bids = {row['id']: row for row in queryset.filter(accepted=False, rejected=False).values(
+                'id', 'accepted', 'rejected', 'primary_contractor_id', 'sub_contractor_id')}
+            # One UPDATE, which skips save() and the post_save receivers
+            rejected = Bid._base_manager.using(queryset.db).filter(pk__in=list(bids)).update(rejected=True)
+            record_update(Bid, bids, rejected=True)
+            log_rows(Bid._base_manager.using(queryset.db).filter(pk__in=list(bids)))
 
-# Register your models here.
+        invalidate_dashboards(*{pk for bid in bids.values()
+                                for pk in (bid['primary_contractor_id'], bid['sub_contractor_id'])})
+        bump(Bid)
+        self.message_user(request, f'Rejected {rejected} bids')
@@ -0,0 +1,250 @@
+"""Rate statistics over accepted bids, per trade.
+
+The accepted rate and job square footage of every bid on a field's jobs are
+pulled with one ``values_list`` query per field (live and archived bids) into
+NumPy arrays, kept in process, and every ``/analytics/rates`` request filters
+and summarises those arrays without touching the database.
+
+Accepting, rejecting or deleting a bid updates the arrays in place through the
+Bid receivers in ``quickbidsapi.signals``; edits that can move many samples at
+once (a job's size or trades, a contractor being deleted) drop the cached
+arrays instead. Writes made by other processes are picked up by a rebuild once
+a field's samples are older than ``settings.ANALYTICS_MAX_AGE``, made
+without blocking the requests reading the old samples meanwhile.
+"""
+import threading
+import time
+import numpy as np
+from django.conf import settings
+from quickbidsapi.models import ArchivedBid, Bid, Job, JobField
+from quickbidsapi.sharding import bids_on_job, is_sharded, visible_bids
+
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+class RateSamples:
+    """Bid ids, rates and square footages of one field's accepted bids.
+
+    Adds and removes are buffered and folded into the arrays on the next read.
+    """
+
+    def __init__(self, ids, rates, square_footage):
+        self.ids = ids
+        self.rates = rates
+        self.square_footage = square_footage
+        self.built_at = time.monotonic()
+        self._added = {}
+        self._removed = set()
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Args:
+            rows: ``(id, rate, square_footage)`` tuples; a missing size is NaN
+        """
+        data = np.array(rows, dtype=float).reshape(-1, 3)
+        return cls(data[:, 0].astype(np.int64), data[:, 1], data[:, 2])
+
+    def add(self, pk, rate, square_footage):
+        # Any earlier sample of the same bid is dropped when the buffer is folded
+        self._removed.add(pk)
+        self._added[pk] = (rate, square_footage)
+
+    def remove(self, pk):
+        self._removed.add(pk)
+        self._added.pop(pk, None)
+
+    def arrays(self):
+        """Current ``(rates, square_footage)`` arrays"""
+        if self._removed:
+            keep = ~np.isin(self.ids, np.fromiter(self._removed, dtype=np.int64))
+            self.ids = self.ids[keep]
+            self.rates = self.rates[keep]
+            self.square_footage = self.square_footage[keep]
+            self._removed = set()
+        if self._added:
+            added = RateSamples.from_rows(
+                [(pk, *sample) for pk, sample in self._added.items()])
+            self.ids = np.concatenate((self.ids, added.ids))
+            self.rates = np.concatenate((self.rates, added.rates))
+            self.square_footage = np.concatenate(
+                (self.square_footage, added.square_footage))
+            self._added = {}
+        return self.rates, self.square_footage
+
+
+class RateStore:
+    """Samples per field id, with ``None`` holding every field's bids.
+
+    Samples are rebuilt from the database without holding the lock; bid
+    updates made while a rebuild reads are replayed onto its samples before
+    they are swapped in. Once a field has samples only one thread rebuilds
+    them at a time, and the others keep reading the old ones.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = {}
+        # Field id: the update lists of the rebuilds under way
+        self._pending = {}
+        self._generation = 0
+
+    def clear(self):
+        with self._lock:
+            self._samples = {}
+            self._generation += 1
+
+    def arrays(self, field_id):
+        with self._lock:
+            samples = self._samples.get(field_id)
+            if samples is not None and (field_id in self._pending or time.monotonic()
+                                        - samples.built_at <= settings.ANALYTICS_MAX_AGE):
+                return samples.arrays()
+            updates = []
+            self._pending.setdefault(field_id, []).append(updates)
+            generation = self._generation
+
+        try:
+            samples = RateSamples.from_rows(rate_rows(field_id))
+        finally:
+            with self._lock:
+                self._pending[field_id].remove(updates)
+                if not self._pending[field_id]:
+                    del self._pending[field_id]
+
+        with self._lock:
+            for update in updates:
+                update(samples)
+            # A clear() while reading means the rows may already be out of date
+            if generation == self._generation:
+                self._samples[field_id] = samples
+            return samples.arrays()
+
+    def _update(self, field_id, update):
+        samples = self._samples.get(field_id)
+        if samples is not None:
+            update(samples)
+        for updates in self._pending.get(field_id, ()):
+            updates.append(update)
+
+    def update_bid(self, pk, accepted, rate, square_footage, field_ids):
+        """Adds or removes one bid in the samples that are built or being built"""
+        def update(samples):
+            if accepted and rate is not None:
+                samples.add(pk, rate, square_footage)
+            else:
+                samples.remove(pk)
+
+        with self._lock:
+            for field_id in (None, *field_ids):
+                self._update(field_id, update)
+
+    def remove_bid(self, pk):
+        with self._lock:
+            for field_id in {*self._samples, *self._pending}:
+                self._update(field_id, lambda samples: samples.remove(pk))
+
+    def is_empty(self):
+        return not self._samples and not self._pending
+
+
+rate_store = RateStore()
+
+
+def rate_rows(field_id):
+    rows = []
+    models = (Bid, ArchivedBid)
+    if is_sharded():
+        # Sharded bids are read without joins and matched to their jobs here
+        bids = visible_bids('id', 'rate', 'job_id', accepted=True, rate__isnull=False)
+        jobs = Job._base_manager.filter(pk__in={job_id for _, _, job_id in bids})
+        if field_id is not None:
+            jobs = jobs.filter(fields=field_id)
+        square_footage = dict(jobs.values_list('pk', 'square_footage'))
+        rows += [(pk, rate, np.nan if square_footage[job_id] is None else square_footage[job_id])
+                 for pk, rate, job_id in bids if job_id in square_footage]
+        models = (ArchivedBid,)
+    for model in models:
+        bids = model.objects.filter(accepted=True, rate__isnull=False)
+        if field_id is not None:
+            bids = bids.filter(job__fields=field_id)
+        rows += [(pk, rate, np.nan if square_footage is None else square_footage)
+                 for pk, rate, square_footage
+                 in bids.values_list('id', 'rate', 'job__square_footage')]
+    return rows
+
+
+def record_bid(bid):
+    """Brings the cached samples up to date after a bid is saved"""
+    if rate_store.is_empty():
+        return
+    square_footage = bid.job.square_footage
+    field_ids = JobField.objects.filter(job_id=bid.job_id).values_list('field_id', flat=True)
+    rate_store.update_bid(
+        bid.pk, bid.accepted, bid.rate,
+        np.nan if square_footage is None else square_footage, list(field_ids))
+
+
+def record_job(job_id):
+    """Brings the cached samples up to date after a bulk update of a job's bids"""
+    if rate_store.is_empty():
+        return
+    for bid in bids_on_job(job_id):
+        record_bid(bid)
+
+
+def forget_job(job_id):
+    """Drops the cached samples if a job with accepted bids changed size or trades"""
+    if not rate_store.is_empty() and bids_on_job(job_id).filter(accepted=True).exists():
+        rate_store.clear()
+
+
+def _summary(values):
+    if not len(values):
+        return {'count': 0, 'mean': None, 'std': None, 'min': None, 'max': None,
+                'percentiles': {f'p{q}': None for q in PERCENTILES}}
+    percentiles = np.percentile(values, PERCENTILES)
+    return {
+        'count': int(len(values)),
+        'mean': float(values.mean()),
+        'std': float(values.std()),
+        'min': float(values.min()),
+        'max': float(values.max()),
+        'percentiles': {f'p{q}': float(value) for q, value in zip(PERCENTILES, percentiles)},
+    }
+
+
+def _histogram(values, buckets):
+    if not len(values):
+        return []
+    counts, edges = np.histogram(values, bins=buckets)
+    return [{'low': float(low), 'high': float(high), 'count': int(count)}
+            for low, high, count in zip(edges[:-1], edges[1:], counts)]
+
+
+def rate_statistics(field_id=None, min_sqft=None, max_sqft=None):
+    """Percentiles, a histogram and rate per square foot of accepted rates.
+
+    Args:
+        field_id (int): Only bids on jobs needing this field; None for every field.
+        min_sqft (float): Only jobs at least this large.
+        max_sqft (float): Only jobs at most this large.
+    """
+    rates, square_footage = rate_store.arrays(field_id)
+
+    # Jobs without a size compare as NaN and drop out of any size range
+    keep = np.ones(len(rates), dtype=bool)
+    if min_sqft is not None:
+        keep &= square_footage >= min_sqft
+    if max_sqft is not None:
+        keep &= square_footage <= max_sqft
+    rates, square_footage = rates[keep], square_footage[keep]
+
+    sized = square_footage > 0
+    return {
+        'field': field_id,
+        'min_sqft': min_sqft,
+        'max_sqft': max_sqft,
+        'rate': _summary(rates),
+        'histogram': _histogram(rates, settings.ANALYTICS_HISTOGRAM_BUCKETS),
+        'rate_per_sqft': _summary(rates[sized] / square_footage[sized]),
+    }
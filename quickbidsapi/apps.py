@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class QuickbidsapiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'quickbidsapi'
+
+    def ready(self):
+        # Connect signal receivers and register background tasks
+        from quickbidsapi import signals, tasks  # pylint: disable=unused-import,import-outside-toplevel
+        from quickbidsapi.slow_queries import install  # pylint: disable=import-outside-toplevel
+        connection_created.connect(install)
@@ -0,0 +1,72 @@
+"""Moves completed jobs, with their bids and job fields, into the archive tables"""
+from django.db import transaction
+from quickbidsapi.changelog import archiving
+from quickbidsapi.models import (
+    ArchivedBid, ArchivedJob, ArchivedJobField, Job, JobField)
+from quickbidsapi.sharding import bids_on_jobs
+
+
+def archivable_jobs(cutoff):
+    return Job.objects.filter(complete=True, completed_at__lte=cutoff)
+
+
+def archive_batch(cutoff, batch_size):
+    """Archives up to ``batch_size`` jobs completed before ``cutoff``.
+
+    Each batch is copied and removed from the hot tables in its own
+    transaction, so an interrupted run simply resumes with the jobs that are
+    still in the hot table.
+
+    Returns:
+        int: the number of jobs archived
+    """
+    with transaction.atomic():
+        jobs = list(archivable_jobs(cutoff).order_by('pk')[:batch_size])
+        if not jobs:
+            return 0
+        job_ids = [job.pk for job in jobs]
+
+        ArchivedJob.objects.bulk_create([
+            ArchivedJob(
+                id=job.pk,
+                contractor_id=job.contractor_id,
+                name=job.name,
+                address=job.address,
+                square_footage=job.square_footage,
+                open=job.open,
+                complete=job.complete,
+                created_at=job.created_at,
+                accepted_at=job.accepted_at,
+                completed_at=job.completed_at,
+            )
+            for job in jobs
+        ])
+        ArchivedJobField.objects.bulk_create([
+            ArchivedJobField(id=pk, job_id=job_id, field_id=field_id)
+            for pk, job_id, field_id in JobField._base_manager.filter(
+                job_id__in=job_ids).values_list('pk', 'job_id', 'field_id')
+        ])
+        ArchivedBid.objects.bulk_create([
+            ArchivedBid(
+                id=bid.pk,
+                rate=bid.rate,
+                job_id=bid.job_id,
+                primary_contractor_id=bid.primary_contractor_id,
+                sub_contractor_id=bid.sub_contractor_id,
+                accepted=bid.accepted,
+                rejected=bid.rejected,
+                is_request=bid.is_request,
+                created_at=bid.created_at,
+                accepted_at=bid.accepted_at,
+            )
+            for bids in bids_on_jobs(job_ids)
+            for bid in bids
+        ])
+
+        # Cascades to the hot Bid and JobField rows, and to sharded bids
+        # through the Job post_delete receiver. Sync clients keep the rows,
+        # now read from the archive, instead of getting tombstones.
+        with archiving():
+            Job.objects.filter(pk__in=job_ids).delete()
+
+    return len(jobs)
@@ -0,0 +1,172 @@
+"""Buffered, append only audit trail of bid and job changes.
+
+Saves of ``Audited`` models add a record to an in-process buffer once their
+transaction commits; nothing is written on the request path. The buffer is
+appended to ``settings.AUDIT_LOG_PATH`` with a single ``write`` when it holds
+``settings.AUDIT_FLUSH_SIZE`` records, and by a background thread at least
+every ``settings.AUDIT_FLUSH_SECONDS``, then fsynced when
+``settings.AUDIT_FSYNC`` is on. A crash therefore loses at most the records
+of the last flush interval or flush size, whichever comes first.
+
+The file is opened with ``O_APPEND`` so several processes can share it. Each
+line is ``<model>:<id>`` and a tab followed by the JSON record. Each process
+keeps the offsets of every row's lines in memory, reading only the lines
+appended since its last lookup, so a history lookup reads just the lines of
+the row it asks for plus the row's records still in the buffer; it never
+flushes.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+from functools import partial
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class AuditLog:
+
+    def __init__(self):
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            # The child has none of the parent's threads, and its copy of the
+            # buffer is flushed by the parent
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._buffer = []
+        self._wake = threading.Event()
+        self._flusher = None
+        # '<model>:<id>': offsets of its lines in the file at _indexed_path,
+        # read up to _indexed_to
+        self._offsets = {}
+        self._indexed_path = None
+        self._indexed_to = 0
+
+    def record(self, model, pk, changes, created=False):
+        """Buffers one record of ``{field: [old, new]}`` changes"""
+        line = '{}:{}\t{}\n'.format(model, pk, json.dumps({
+            'at': timezone.now().isoformat(),
+            'model': model,
+            'id': pk,
+            'created': created,
+            'changes': changes,
+        }, separators=(',', ':'), cls=DjangoJSONEncoder))
+        with self._lock:
+            self._buffer.append(line)
+            overflow = len(self._buffer) - settings.AUDIT_MAX_BUFFERED
+            if overflow > 0:
+                # Only reached while flushes keep failing
+                del self._buffer[:overflow]
+                logger.error('Audit buffer full, dropped %s records', overflow)
+            full = len(self._buffer) >= settings.AUDIT_FLUSH_SIZE
+        self._start()
+        if full:
+            self._wake.set()
+
+    def _start(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            with self._lock:
+                if self._flusher is None or not self._flusher.is_alive():
+                    self._flusher = threading.Thread(
+                        target=self._run, name='audit-flusher', daemon=True)
+                    self._flusher.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(settings.AUDIT_FLUSH_SECONDS)
+            self._wake.clear()
+            try:
+                self.flush()
+            except OSError:
+                logger.exception('Audit flush failed, retrying')
+
+    def flush(self):
+        """Appends every buffered record to the audit file"""
+        with self._flush_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+            if not lines:
+                return
+            try:
+                fd = os.open(settings.AUDIT_LOG_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+                try:
+                    os.write(fd, ''.join(lines).encode())
+                    if settings.AUDIT_FSYNC:
+                        os.fsync(fd)
+                finally:
+                    os.close(fd)
+            except OSError:
+                # Put the records back in front of anything buffered since
+                with self._lock:
+                    self._buffer[:0] = lines
+                raise
+
+    def _index(self, path):
+        """Adds the lines appended to ``path`` since the last call to the
+        offsets; called with the flush lock held
+        """
+        try:
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            size = 0
+        if path != self._indexed_path or size < self._indexed_to:
+            # Another file, or this one was truncated or rotated
+            self._offsets, self._indexed_path, self._indexed_to = {}, path, 0
+        if size == self._indexed_to:
+            return
+        with open(path, 'rb') as audit_file:
+            audit_file.seek(self._indexed_to)
+            offset = self._indexed_to
+            for line in audit_file:
+                if not line.endswith(b'\n'):
+                    break
+                key = line.split(b'\t', 1)[0].decode()
+                self._offsets.setdefault(key, []).append(offset)
+                offset += len(line)
+        self._indexed_to = offset
+
+    def history(self, model, pk):
+        """Every record of one row, oldest first"""
+        key = f'{model}:{pk}'
+        prefix = key + '\t'
+        path = str(settings.AUDIT_LOG_PATH)
+        # Held so no record is between the buffer and the file
+        with self._flush_lock:
+            self._index(path)
+            offsets = list(self._offsets.get(key, ()))
+            with self._lock:
+                buffered = [line for line in self._buffer if line.startswith(prefix)]
+
+        lines = []
+        if offsets:
+            with open(path, 'rb') as audit_file:
+                for offset in offsets:
+                    audit_file.seek(offset)
+                    lines.append(audit_file.readline().decode())
+        return [json.loads(line[len(prefix):]) for line in lines + buffered]
+
+
+audit_log = AuditLog()
+atexit.register(audit_log.flush)
+
+
+def record_update(model, old_rows, **values):
+    """Records a bulk ``update()`` of ``values``, which skips ``save()``, once
+    the transaction commits
+
+    Args:
+        old_rows (dict): ``{pk: {field: value}}`` read before the update.
+    """
+    for pk, old in old_rows.items():
+        changes = {name: [old[name], value] for name, value in values.items()
+                   if name in old and old[name] != value}
+        if changes:
+            transaction.on_commit(partial(audit_log.record, model._meta.model_name, pk, changes))
@@ -0,0 +1,193 @@
+"""Runs several API requests from one ``POST /batch`` round trip.
+
+Each sub-request is resolved against the project's URLconf and handed to the
+view directly, authenticated as the batch request's user by
+``BatchAuthentication`` without another token lookup. Consecutive GETs are independent of each other, so each run of
+them is spread over a thread pool; any other method runs on its own, in
+order, so reads after a write see it.
+
+In atomic mode the whole batch runs in one transaction on the default
+database and every bid shard, and is rolled back as soon as a sub-request
+fails. Reads then run one after another, since other connections cannot see
+the transaction's writes.
+"""
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.urls import Resolver404, resolve
+from rest_framework.authentication import BaseAuthentication, TokenAuthentication
+from quickbidsapi.idempotency import IDEMPOTENCY_HEADER
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+
+class BatchError(Exception):
+    """A malformed batch, reported before anything runs"""
+
+
+class BatchFailed(Exception):
+    """A sub-request of an atomic batch failed; rolls the batch back"""
+
+    def __init__(self, index, results):
+        super().__init__(index)
+        self.index = index
+        self.results = results
+
+
+def parse_batch(data):
+    """``[(method, path, body, headers)]`` of a batch request body
+
+    Raises:
+        BatchError: if the body is not a list of valid sub-requests
+    """
+    requests = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(requests, list) or not requests:
+        raise BatchError('requests must be a non-empty list')
+    if len(requests) > settings.BATCH_MAX_REQUESTS:
+        raise BatchError(f'At most {settings.BATCH_MAX_REQUESTS} requests may be batched')
+
+    parsed = []
+    for index, sub_request in enumerate(requests):
+        if not isinstance(sub_request, dict):
+            raise BatchError(f'requests[{index}] must be an object')
+        method = str(sub_request.get('method', 'GET')).upper()
+        path = sub_request.get('path')
+        headers = sub_request.get('headers') or {}
+        if method not in METHODS:
+            raise BatchError(f'requests[{index}].method must be one of {", ".join(METHODS)}')
+        if not isinstance(path, str) or not path.startswith('/'):
+            raise BatchError(f'requests[{index}].path must start with /')
+        if not isinstance(headers, dict):
+            raise BatchError(f'requests[{index}].headers must be an object')
+        parsed.append((method, path, sub_request.get('body'), headers))
+    return parsed
+
+
+def _sub_request(request, method, path, body, headers):
+    path, _, query = path.partition('?')
+    content = b'' if body is None else json.dumps(body).encode()
+    environ = {
+        key: value for key, value in request.META.items()
+        if key != IDEMPOTENCY_HEADER and not key.startswith('wsgi.')
+    }
+    environ.update({
+        'wsgi.input': io.BytesIO(content),
+        'wsgi.url_scheme': request.scheme,
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(content)),
+    })
+    for name, value in headers.items():
+        environ['HTTP_' + name.upper().replace('-', '_')] = str(value)
+
+    sub_request = WSGIRequest(environ)
+    # Read by BatchAuthentication; an attribute, so no client can set it
+    sub_request.batch_auth = (request.user, request.auth)
+    return sub_request
+
+
+class BatchAuthentication(BaseAuthentication):
+    """Authenticates a sub-request as the user of the batch it came in"""
+
+    def authenticate(self, request):
+        return getattr(request._request, 'batch_auth', None)
+
+    def authenticate_header(self, request):
+        # Listed first, so it names the scheme unauthenticated clients are told to use
+        return TokenAuthentication.keyword
+
+
+def _content(response):
+    if getattr(response, 'streaming', False):
+        content = b''.join(response.streaming_content)
+    else:
+        if hasattr(response, 'render'):
+            response.render()
+        content = response.content
+    if not content:
+        return None
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(content)
+    return content.decode(response.charset)
+
+
+def run_one(request, method, path, body, headers):
+    """The ``{'status', 'body'}`` result of one sub-request"""
+    try:
+        match = resolve(path.partition('?')[0])
+    except Resolver404:
+        return {'status': 404, 'body': None}
+    # Only API views, and not the batch view itself
+    if not hasattr(match.func, 'cls') or not getattr(match.func, 'batchable', True):
+        return {'status': 404, 'body': None}
+
+    sub_request = _sub_request(request, method, path, body, headers)
+    try:
+        response = match.func(sub_request, *match.args, **match.kwargs)
+        return {'status': response.status_code, 'body': _content(response)}
+    except Exception:  # pylint: disable=broad-except
+        # One broken sub-request must not take the rest of the batch down
+        logger.exception('Batched %s %s failed', method, path)
+        return {'status': 500, 'body': None}
+
+
+def _run_in_thread(request, sub_request):
+    try:
+        return run_one(request, *sub_request)
+    finally:
+        # Each worker thread opened its own connections
+        connections.close_all()
+
+
+def _run_reads(executor, request, reads):
+    if executor is None or len(reads) == 1:
+        return [run_one(request, *sub_request) for sub_request in reads]
+    return list(executor.map(lambda sub_request: _run_in_thread(request, sub_request), reads))
+
+
+def _run(request, sub_requests, executor, stop_on_failure):
+    results = []
+    reads = []
+    for sub_request in [*sub_requests, None]:
+        if sub_request is not None and sub_request[0] == 'GET':
+            reads.append(sub_request)
+            continue
+        results += _run_reads(executor, request, reads)
+        reads = []
+        if sub_request is not None:
+            results.append(run_one(request, *sub_request))
+        if stop_on_failure:
+            for index, result in enumerate(results):
+                if result['status'] >= 400:
+                    raise BatchFailed(index, results)
+    return results
+
+
+def run_batch(request, sub_requests, atomic=False):
+    """Results of every sub-request, in order
+
+    Raises:
+        BatchFailed: in atomic mode, once a sub-request fails; nothing is saved
+    """
+    if atomic:
+        with ExitStack() as stack:
+            # Entered last so it commits first, with the change log; see
+            # ``quickbidsapi.changelog``
+            for alias in dict.fromkeys([*settings.BID_SHARDS, DEFAULT_DB_ALIAS]):
+                stack.enter_context(transaction.atomic(using=alias))
+            return _run(request, sub_requests, None, stop_on_failure=True)
+
+    # Worker threads could not see writes of a transaction already open here
+    if connection.in_atomic_block or settings.BATCH_MAX_WORKERS < 2:
+        return _run(request, sub_requests, None, stop_on_failure=False)
+    with ThreadPoolExecutor(max_workers=settings.BATCH_MAX_WORKERS) as executor:
+        return _run(request, sub_requests, executor, stop_on_failure=False)
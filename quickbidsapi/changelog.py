@@ -0,0 +1,199 @@
+"""Change log queries behind ``GET /sync`` and its compaction.
+
+Every save of a Job, Bid, JobField or Contractor appends a Change in the same
+transaction (see ``quickbidsapi.models.change_logged``); deletes and many to
+many edits are logged by receivers in ``quickbidsapi.signals``, and bulk
+``update()`` calls log with ``log_rows``. A sync cursor is the last Change id
+a client has seen and the latest compaction run when it started syncing; the
+client sends it back and gets the rows changed after it.
+
+A sharded bid is written in its shard, which cannot share a transaction with
+its Change in the default database. Writers commit the Change first: an entry
+whose shard write then fails only makes sync send the row as it is, while a
+shard write without its entry would never reach clients. Bulk writes run the
+default database transaction inside the shard's, as ``BidView.accept`` does.
+
+Compaction keeps the log from growing with every write. An entry is dropped
+once a later entry exists for the same row and audience, which never changes
+what any cursor syncs to, and tombstones are dropped after
+``settings.SYNC_TOMBSTONE_RETENTION_DAYS``. A cursor older than the newest
+dropped tombstone, from before that compaction ran, could miss a delete, so it
+is refused and the client starts over from an empty cursor.
+
+Archiving moves a job and its bids out of the hot tables without removing
+them, so their deletes are logged as upserts inside ``archiving()`` and sync
+reads rows missing from the hot tables from the archive tables.
+"""
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from quickbidsapi.models import (
+    ArchivedBid, ArchivedJob, Bid, Change, ChangeCompaction, Contractor, Job)
+from quickbidsapi.models.change_logged import log_change
+from quickbidsapi.readers import (
+    archived_bid_reader, archived_job_reader, bid_reader, contractor_reader, job_reader)
+from quickbidsapi.sharding import bid_source
+
+# Synced models, the key they are returned under, how to read them and the
+# archive table and reader of rows archiving moved out of the hot table
+SYNCED = {
+    'contractor': ('contractors', Contractor, contractor_reader, None, None),
+    'job': ('jobs', Job, job_reader, ArchivedJob, archived_job_reader),
+    'bid': ('bids', Bid, bid_reader, ArchivedBid, archived_bid_reader),
+}
+
+_context = threading.local()
+
+
+class CursorExpired(Exception):
+    """The cursor predates compacted tombstones; sync again from scratch"""
+
+
+def parse_cursor(cursor):
+    """``(change_id, compaction_id)`` of a cursor; an empty cursor starts a
+    full sync after the latest compaction
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    if not cursor:
+        latest = ChangeCompaction.objects.order_by('-id').values_list('id', flat=True).first()
+        return 0, latest or 0
+    change_id, compaction_id = (int(part) for part in cursor.split('-'))
+    if change_id < 0 or compaction_id < 0:
+        raise ValueError(cursor)
+    return change_id, compaction_id
+
+
+def format_cursor(change_id, compaction_id):
+    return f'{change_id}-{compaction_id}'
+
+
+def log_rows(queryset):
+    """Logs every row of ``queryset`` after a bulk ``update()``, which skips ``save()``"""
+    Change.objects.bulk_create([
+        Change(model=model, object_id=object_id, action=instance.change_action(),
+               primary_contractor_id=primary_contractor_id,
+               sub_contractor_id=sub_contractor_id)
+        for instance in queryset
+        for model, object_id, primary_contractor_id, sub_contractor_id in [instance.change_key()]
+    ])
+
+
+@contextmanager
+def archiving():
+    """Logs the deletes made inside it as upserts of rows moved to the archive"""
+    _context.archiving = True
+    try:
+        yield
+    finally:
+        _context.archiving = False
+
+
+def log_delete(instance):
+    key = instance.change_key()
+    # Deleting a job's field changes the job, deleting anything else removes
+    # it, unless it is being archived
+    removed = key[:2] == (instance._meta.model_name, instance.pk) \
+        and not getattr(_context, 'archiving', False)
+    log_change(key, Change.DELETE if removed else Change.UPSERT)
+
+
+def visible_to(contractor_id):
+    return Q(primary_contractor_id__isnull=True, sub_contractor_id__isnull=True) \
+        | Q(primary_contractor_id=contractor_id) | Q(sub_contractor_id=contractor_id)
+
+
+def sync(contractor_id, cursor=None, limit=None):
+    """Upserts and tombstones visible to a contractor after ``cursor``.
+
+    Raises:
+        ValueError: if the cursor is malformed
+        CursorExpired: if entries the cursor still needed were compacted away
+    """
+    limit = min(limit or settings.SYNC_PAGE_SIZE, settings.SYNC_PAGE_SIZE)
+    since, compaction_id = parse_cursor(cursor)
+    if ChangeCompaction.objects.filter(id__gt=compaction_id, horizon__gt=since).exists():
+        raise CursorExpired()
+
+    changes = list(Change.objects.filter(visible_to(contractor_id), id__gt=since)
+                   .order_by('id').values_list('id', 'model', 'object_id', 'action')[:limit + 1])
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    # Only the newest entry for each row in the page matters
+    latest = {}
+    for _, model, object_id, action in changes:
+        latest[model, object_id] = action
+
+    data = {
+        'cursor': format_cursor(changes[-1][0] if changes else since, compaction_id),
+        'has_more': has_more,
+        'upserts': {},
+        'tombstones': {},
+    }
+    for model, (name, model_class, reader, archive_class, archive_reader) in SYNCED.items():
+        upserts = [object_id for (change_model, object_id), action in latest.items()
+                   if change_model == model and action == Change.UPSERT]
+        tombstones = [object_id for (change_model, object_id), action in latest.items()
+                      if change_model == model and action == Change.DELETE]
+
+        queryset = model_class.objects.all()
+        archived = archive_class.objects.all() if archive_class is not None else None
+        if model == 'bid':
+            queryset, reader = bid_source()
+            queryset = queryset.filter(
+                Q(primary_contractor=contractor_id) | Q(sub_contractor=contractor_id))
+            archived = archived.filter(
+                Q(primary_contractor=contractor_id) | Q(sub_contractor=contractor_id))
+        rows = reader.in_bulk(queryset, upserts) if upserts else {}
+        missing = [pk for pk in upserts if pk not in rows]
+        if missing and archived is not None:
+            rows.update(archive_reader.in_bulk(archived, missing))
+
+        # Rows gone or hidden since they were logged are sent as tombstones
+        data['upserts'][name] = [rows[pk] for pk in upserts if pk in rows]
+        data['tombstones'][name] = tombstones + [pk for pk in upserts if pk not in rows]
+    return data
+
+
+def compact(batch_size=None, retention_days=None):
+    """Drops superseded entries and old tombstones in batches. Returns the run."""
+    batch_size = batch_size or settings.SYNC_COMPACT_BATCH_SIZE
+    retention_days = settings.SYNC_TOMBSTONE_RETENTION_DAYS \
+        if retention_days is None else retention_days
+    run = ChangeCompaction()
+
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    last_id = Change.objects.aggregate(last=Max('id'))['last'] or 0
+    # A later entry for the same row and audience, found through the
+    # (model, object_id) index; a null audience equals a null one, which a
+    # plain comparison would not, and contractor ids start at 1
+    newer = Change.objects.filter(
+        model=OuterRef('model'), object_id=OuterRef('object_id'), id__gt=OuterRef('id'),
+    ).annotate(
+        primary=Coalesce('primary_contractor_id', Value(0)),
+        sub=Coalesce('sub_contractor_id', Value(0)),
+    ).filter(
+        primary=Coalesce(OuterRef('primary_contractor_id'), Value(0)),
+        sub=Coalesce(OuterRef('sub_contractor_id'), Value(0)),
+    )
+
+    for start in range(0, last_id, batch_size):
+        window = Change.objects.filter(id__gt=start, id__lte=start + batch_size)
+        with transaction.atomic():
+            run.superseded_deleted += window.filter(Exists(newer)).delete()[0]
+
+            tombstones = window.filter(action=Change.DELETE, created_at__lt=cutoff)
+            newest = tombstones.aggregate(newest=Max('id'))['newest']
+            if newest is not None:
+                run.horizon = max(run.horizon, newest)
+                run.tombstones_deleted += tombstones.delete()[0]
+
+    run.save()
+    return run
@@ -0,0 +1,59 @@
+"""Per contractor cache for the dashboard endpoint.
+
+Entries are dropped whenever a Bid or Job that appears on a contractor's
+dashboard is written, or a Contractor or User whose details it shows; see
+``quickbidsapi.signals``.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from quickbidsapi.metrics import record_cache
+from django.db.models import Q
+from quickbidsapi.models import Bid, Contractor, Job
+from quickbidsapi.sharding import bid_shards, bids_on_job
+
+
+def dashboard_cache_key(contractor_id):
+    return f'dashboard:{contractor_id}'
+
+
+def get_cached_dashboard(contractor_id):
+    data = cache.get(dashboard_cache_key(contractor_id))
+    record_cache('dashboard', data is not None)
+    return data
+
+
+def cache_dashboard(contractor_id, data):
+    cache.set(dashboard_cache_key(contractor_id), data,
+              settings.DASHBOARD_CACHE_TIMEOUT)
+
+
+def invalidate_dashboards(*contractor_ids):
+    cache.delete_many([dashboard_cache_key(pk) for pk in set(contractor_ids)])
+
+
+def invalidate_job_dashboards(job_id):
+    """Drops the dashboards of a job's owner and of everyone bidding on it"""
+    contractor_ids = set(Job.objects.filter(
+        pk=job_id).values_list('contractor_id', flat=True))
+    for primary_id, sub_id in bids_on_job(job_id).values_list(
+            'primary_contractor_id', 'sub_contractor_id'):
+        contractor_ids.update((primary_id, sub_id))
+    invalidate_dashboards(*contractor_ids)
+
+
+def invalidate_contractor_dashboards(*contractor_ids):
+    """Drops the dashboards showing any of these contractors: their own and
+    those of everyone on a bid with them
+    """
+    dropped = set(contractor_ids)
+    for alias in bid_shards():
+        for primary_id, sub_id in Bid._base_manager.using(alias).filter(
+                Q(primary_contractor__in=contractor_ids) | Q(sub_contractor__in=contractor_ids),
+        ).values_list('primary_contractor_id', 'sub_contractor_id'):
+            dropped.update((primary_id, sub_id))
+    invalidate_dashboards(*dropped)
+
+
+def invalidate_user_dashboards(user_id):
+    invalidate_contractor_dashboards(*Contractor._base_manager.filter(
+        user_id=user_id).values_list('pk', flat=True))
@@ -0,0 +1,134 @@
+"""Suggested bid rates from a per field fit of past accepted bids.
+
+``fit_rate_model`` regresses accepted rate on job square footage for every
+field at once: the per field sums a least squares line needs are accumulated
+with ``np.bincount`` over the field id of each sample, so the whole fit is a
+handful of array passes however many fields there are. The result replaces
+the RateCoefficient table, one row per field plus a null field row fitted
+over every sample as the fallback.
+
+``suggest_rate`` only reads that table. It is refreshed by
+``manage.py fit_rate_model`` or on a schedule by the ``refresh_rate_model``
+task, never per request.
+"""
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from quickbidsapi.models import ArchivedBid, Bid, Job, JobField, RateCoefficient
+from quickbidsapi.sharding import is_sharded, visible_bids
+
+
+def training_rows():
+    """``(bid_id, field_id, rate, square_footage)`` for every accepted bid with
+    a rate and a sized job, once per field the job needs
+    """
+    rows = []
+    models = (Bid, ArchivedBid)
+    if is_sharded():
+        # Sharded bids are read without joins and matched to their jobs here
+        bids = visible_bids('id', 'rate', 'job_id', accepted=True, rate__isnull=False)
+        jobs = {}
+        for job_id, field_id, square_footage in Job._base_manager.filter(
+                pk__in={job_id for _, _, job_id in bids}, square_footage__isnull=False,
+        ).values_list('pk', 'fields', 'square_footage'):
+            if field_id is not None:
+                jobs.setdefault(job_id, []).append((field_id, square_footage))
+        rows += [(pk, field_id, rate, square_footage)
+                 for pk, rate, job_id in bids
+                 for field_id, square_footage in jobs.get(job_id, ())]
+        models = (ArchivedBid,)
+    for model in models:
+        rows += [row for row in model.objects.filter(
+            accepted=True, rate__isnull=False, job__square_footage__isnull=False,
+        ).values_list('id', 'job__fields', 'rate', 'job__square_footage') if row[1] is not None]
+    return rows
+
+
+def _least_squares(groups, size, rates, square_footage):
+    """Per group intercept, slope, mean and residual spread of rate on size.
+
+    Groups with fewer than ``settings.RATE_MODEL_MIN_SAMPLES`` samples, or
+    whose jobs are all the same size, get a flat line through their mean.
+    """
+    n = np.bincount(groups, minlength=size).astype(float)
+    sum_x = np.bincount(groups, square_footage, size)
+    sum_y = np.bincount(groups, rates, size)
+    sum_xx = np.bincount(groups, square_footage * square_footage, size)
+    sum_xy = np.bincount(groups, square_footage * rates, size)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_x = sum_x / n
+        mean_y = sum_y / n
+        variance = sum_xx - n * mean_x * mean_x
+        slope = (sum_xy - n * mean_x * mean_y) / variance
+    fitted = (n >= settings.RATE_MODEL_MIN_SAMPLES) & (variance > 1e-9 * np.maximum(sum_xx, 1))
+    slope = np.where(fitted, slope, 0.0)
+    intercept = mean_y - slope * np.where(fitted, mean_x, 0.0)
+
+    residuals = rates - (intercept[groups] + slope[groups] * square_footage)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        residual_std = np.sqrt(np.bincount(groups, residuals * residuals, size) / n)
+    return n, intercept, slope, mean_y, residual_std
+
+
+def fit_rate_model(rows=None):
+    """Refits and replaces the RateCoefficient table. Returns the rows written."""
+    data = np.array(training_rows() if rows is None else rows, dtype=float).reshape(-1, 4)
+    field_ids, groups = np.unique(data[:, 1].astype(np.int64), return_inverse=True)
+    rates, square_footage = data[:, 2], data[:, 3]
+
+    # Every bid is counted once more, however many fields its job needs, in
+    # group len(field_ids): the fallback
+    _, first = np.unique(data[:, 0].astype(np.int64), return_index=True)
+    fit = _least_squares(
+        np.concatenate((groups, np.full(len(first), len(field_ids)))), len(field_ids) + 1,
+        np.concatenate((rates, rates[first])),
+        np.concatenate((square_footage, square_footage[first])))
+
+    now = timezone.now()
+    coefficients = [
+        RateCoefficient(
+            field_id=None if index == len(field_ids) else int(field_ids[index]),
+            samples=int(samples), intercept=float(intercept), slope=float(slope),
+            mean_rate=float(mean_rate), residual_std=float(residual_std), fitted_at=now)
+        for index, (samples, intercept, slope, mean_rate, residual_std) in enumerate(zip(*fit))
+        if samples
+    ]
+    with transaction.atomic():
+        RateCoefficient.objects.all().delete()
+        RateCoefficient.objects.bulk_create(coefficients)
+    return coefficients
+
+
+def suggest_rate(job):
+    """The sample weighted suggestion of every field the job needs, falling
+    back to the fit over every field. None before the first fit.
+    """
+    field_ids = list(JobField.objects.filter(job=job).values_list('field_id', flat=True))
+    coefficients = list(RateCoefficient.objects.filter(field__in=field_ids)) \
+        or list(RateCoefficient.objects.filter(field__isnull=True))
+    if not coefficients:
+        return None
+
+    samples = sum(coefficient.samples for coefficient in coefficients)
+
+    def weighted(value):
+        return sum(value(coefficient) * coefficient.samples for coefficient in coefficients) / samples
+
+    if job.square_footage is None:
+        rate = weighted(lambda coefficient: coefficient.mean_rate)
+    else:
+        rate = weighted(lambda coefficient: coefficient.intercept
+                        + coefficient.slope * job.square_footage)
+    spread = weighted(lambda coefficient: coefficient.residual_std)
+
+    return {
+        'job': job.id,
+        'suggested_rate': max(rate, 0.0),
+        'low': max(rate - spread, 0.0),
+        'high': rate + spread,
+        'fields': [coefficient.field_id for coefficient in coefficients],
+        'samples': samples,
+        'fitted_at': min(coefficient.fitted_at for coefficient in coefficients),
+    }
@@ -0,0 +1,92 @@
+"""Idempotency-Key support for endpoints that create rows.
+
+Clients on unreliable connections retry writes. When a request carries an
+``Idempotency-Key`` header, the first response is stored in the cache alias
+named by ``settings.IDEMPOTENCY_CACHE_ALIAS`` (bounded by ``MAX_ENTRIES`` and
+expired by ``TIMEOUT``) and replayed for any retry with the same key, without
+running the view again.
+"""
+import hashlib
+import json
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+
+# How long a key stays reserved while its first request is still running
+LOCK_TIMEOUT = 30
+
+
+def idempotent(view):
+    """Decorates a view function or viewset action so that retries carrying
+    the same Idempotency-Key replay the stored response.
+
+    Works for both ``def create(self, request)`` and ``def view(request)``;
+    for ``@api_view`` functions it must be applied below ``@api_view`` so it
+    receives the DRF request.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        request = next(arg for arg in args if isinstance(arg, Request))
+        key = request.META.get(IDEMPOTENCY_HEADER)
+        if not key:
+            return view(*args, **kwargs)
+
+        store = caches[settings.IDEMPOTENCY_CACHE_ALIAS]
+        cache_key = _cache_key(request, key)
+        fingerprint = _fingerprint(request)
+
+        stored = store.get(cache_key)
+        if stored is not None:
+            if stored['fingerprint'] != fingerprint:
+                return Response(
+                    {'message': 'Idempotency-Key was already used with a different request body'},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY
+                )
+            return _replay(stored)
+
+        lock_key = f'{cache_key}:lock'
+        if not store.add(lock_key, True, LOCK_TIMEOUT):
+            return Response(
+                {'message': 'A request with this Idempotency-Key is already in progress'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        try:
+            response = view(*args, **kwargs)
+            # Server errors are not final, so let the client retry those
+            if response.status_code < 500:
+                store.set(cache_key, {
+                    'fingerprint': fingerprint,
+                    'status': response.status_code,
+                    'data': response.data,
+                })
+        finally:
+            store.delete(lock_key)
+
+        return response
+
+    return wrapper
+
+
+def _cache_key(request, key):
+    """Scopes a client supplied key to the caller and the endpoint"""
+    user = request.user.pk if request.user.is_authenticated else 'anonymous'
+    raw = f'{user}:{request.method}:{request.path}:{key}'
+    return 'idempotency:' + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def _replay(stored):
+    response = Response(stored['data'], status=stored['status'])
+    response[REPLAYED_HEADER] = 'true'
+    return response
@@ -0,0 +1,32 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from quickbidsapi.archive import archivable_jobs, archive_batch
+
+
+class Command(BaseCommand):
+    help = 'Moves completed jobs and their bids into the archive tables in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_COMPLETED_JOBS_AFTER_DAYS,
+            help='Archive jobs completed at least this many days ago')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE,
+            help='Number of jobs moved per transaction')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        remaining = archivable_jobs(cutoff).count()
+        self.stdout.write(f'{remaining} jobs completed before {cutoff:%Y-%m-%d} to archive')
+
+        archived = 0
+        while True:
+            moved = archive_batch(cutoff, options['batch_size'])
+            if not moved:
+                break
+            archived += moved
+            self.stdout.write(f'Archived {archived}/{remaining} jobs')
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} jobs'))
@@ -0,0 +1,36 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from quickbidsapi.changelog import compact
+from quickbidsapi.models import Task
+from quickbidsapi.tasks import compact_change_log
+
+
+class Command(BaseCommand):
+    help = 'Drops superseded sync change log entries and old tombstones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.SYNC_COMPACT_BATCH_SIZE,
+            help='Change log ids compacted per transaction')
+        parser.add_argument(
+            '--retention-days', type=int, default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+            help='Keep tombstones at least this many days')
+        parser.add_argument(
+            '--schedule', action='store_true',
+            help='Also queue the compact_change_log task, which compacts on a schedule')
+
+    def handle(self, *args, **options):
+        run = compact(options['batch_size'], options['retention_days'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Dropped {run.superseded_deleted} superseded entries and '
+            f'{run.tombstones_deleted} tombstones; cursors before {run.horizon} must resync'))
+
+        if options['schedule']:
+            if Task.objects.filter(name='compact_change_log', status__in=[
+                    Task.PENDING, Task.RUNNING]).exists():
+                self.stdout.write('The compact_change_log task is already scheduled')
+            else:
+                compact_change_log.enqueue(
+                    delay=timedelta(seconds=settings.SYNC_COMPACT_INTERVAL_SECONDS))
+                self.stdout.write('Scheduled the compact_change_log task')
@@ -0,0 +1,33 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from quickbidsapi.estimator import fit_rate_model
+from quickbidsapi.models import Task
+from quickbidsapi.tasks import refresh_rate_model
+
+
+class Command(BaseCommand):
+    help = 'Fits suggested rates per field from accepted bids and replaces the coefficient table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--schedule', action='store_true',
+            help='Also queue the refresh_rate_model task, which refits on a schedule')
+
+    def handle(self, *args, **options):
+        coefficients = fit_rate_model()
+        for coefficient in coefficients:
+            label = f'field {coefficient.field_id}' if coefficient.field_id else 'all fields'
+            self.stdout.write(
+                f'{label}: rate = {coefficient.intercept:.2f} + {coefficient.slope:.4f} * sqft '
+                f'(+/- {coefficient.residual_std:.2f}, {coefficient.samples} bids)')
+        self.stdout.write(self.style.SUCCESS(f'Fitted {len(coefficients)} rate coefficients'))
+
+        if options['schedule']:
+            if Task.objects.filter(name='refresh_rate_model', status__in=[
+                    Task.PENDING, Task.RUNNING]).exists():
+                self.stdout.write('The refresh_rate_model task is already scheduled')
+            else:
+                refresh_rate_model.enqueue(
+                    delay=timedelta(seconds=settings.RATE_MODEL_REFRESH_SECONDS))
+                self.stdout.write('Scheduled the refresh_rate_model task')
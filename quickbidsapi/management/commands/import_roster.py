@@ -0,0 +1,48 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from quickbidsapi.roster import RosterError, import_roster, parse_roster
+
+
+class Command(BaseCommand):
+    help = 'Creates a contractor, user and token for every row of a CSV or JSON roster'
+
+    def add_arguments(self, parser):
+        parser.add_argument('roster', help='Path of the CSV or JSON roster')
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Skip rows an earlier run of the same roster already created')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.ROSTER_BATCH_SIZE,
+            help='Number of rows written per transaction')
+        parser.add_argument(
+            '--workers', type=int, default=settings.ROSTER_HASH_WORKERS,
+            help='Number of processes hashing passwords')
+        parser.add_argument(
+            '--report', help='Write the created, skipped and refused rows to this JSON file')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['roster'], 'rb') as roster:
+                rows = parse_roster(roster.read(), options['roster'])
+        except OSError as error:
+            raise CommandError(f'Cannot read {options["roster"]}: {error}') from error
+        except RosterError as error:
+            raise CommandError(str(error)) from error
+        self.stdout.write(f'{len(rows)} rows to import')
+
+        def progress(result):
+            done = len(result.created) + len(result.skipped) + len(result.errors)
+            self.stdout.write(f'Checked {done}/{len(rows)} rows, created {len(result.created)}')
+
+        result = import_roster(rows, options['resume'], options['batch_size'], progress,
+                               options['workers'])
+        for error in result.errors:
+            self.stderr.write(f'Row {error["row"]} ({error["username"]}): {error["error"]}')
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as report:
+                json.dump(result.as_dict(), report, indent=2)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(result.created)} contractors, skipped {len(result.skipped)}, '
+            f'refused {len(result.errors)}'))
@@ -0,0 +1,29 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from quickbidsapi.models import Purge
+from quickbidsapi.purge import run_purge
+
+
+class Command(BaseCommand):
+    help = 'Removes the dependents of soft deleted contractors and jobs in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.PURGE_BATCH_SIZE,
+            help='Number of rows deleted per transaction')
+        parser.add_argument(
+            '--poll', type=float, default=None,
+            help='Keep running, checking for new purges every POLL seconds')
+
+    def handle(self, *args, **options):
+        while True:
+            for purge in Purge.objects.exclude(status=Purge.DONE).order_by('pk'):
+                self.stdout.write(f'Purging {purge.model} {purge.object_id}')
+                run_purge(purge, options['batch_size'])
+                self.stdout.write(f'Purged {purge.model} {purge.object_id}: '
+                                  f'{purge.rows_deleted} rows deleted')
+
+            if options['poll'] is None:
+                break
+            time.sleep(options['poll'])
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from quickbidsapi.activity import rebuild_activity
+
+
+class Command(BaseCommand):
+    help = 'Recounts the hourly and daily bid activity rollups from the bids'
+
+    def handle(self, *args, **options):
+        rollups = rebuild_activity()
+        self.stdout.write(self.style.SUCCESS(f'Wrote {len(rollups)} activity rollups'))
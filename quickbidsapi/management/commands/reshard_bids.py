@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from quickbidsapi.models import Bid
+from quickbidsapi.sharding import reshard_batch, seed_bid_ids
+
+
+class Command(BaseCommand):
+    help = 'Moves bids between databases in batches to match a new BID_SHARDS layout'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--to', required=True,
+            help='Comma separated database aliases of the new layout, in order')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.RESHARD_BATCH_SIZE,
+            help='Number of bids looked at per batch')
+
+    def handle(self, *args, **options):
+        shards = [alias for alias in options['to'].split(',') if alias]
+        if not shards:
+            raise CommandError('--to needs at least one database alias')
+        for alias in shards:
+            if alias != DEFAULT_DB_ALIAS and alias not in settings.BID_SHARD_DATABASES:
+                raise CommandError(f'{alias} is not in BID_SHARD_DATABASES')
+            if Bid._meta.db_table not in connections[alias].introspection.table_names():
+                raise CommandError(f'Run `manage.py migrate --database {alias}` first')
+
+        # Bids can be anywhere an earlier layout put them
+        sources = list(dict.fromkeys([DEFAULT_DB_ALIAS, *settings.BID_SHARDS, *shards]))
+        seed_bid_ids(sources)
+
+        total = 0
+        for source in sources:
+            after, moved_from_source = 0, 0
+            while after is not None:
+                after, moved = reshard_batch(source, shards, after, options['batch_size'])
+                moved_from_source += moved
+            total += moved_from_source
+            self.stdout.write(f'Moved {moved_from_source} bids out of {source}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Moved {total} bids; restart with BID_SHARDS={",".join(shards)}'))
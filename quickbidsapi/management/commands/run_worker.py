@@ -0,0 +1,51 @@
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from quickbidsapi import taskqueue
+
+
+class Command(BaseCommand):
+    help = 'Runs queued tasks on a pool of worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=settings.TASK_WORKER_THREADS,
+            help='Number of tasks run at the same time')
+        parser.add_argument(
+            '--poll', type=float, default=settings.TASK_POLL_SECONDS,
+            help='Seconds an idle thread waits before checking the queue again')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once the queue is empty instead of polling forever')
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        name = f'{socket.gethostname()}:{os.getpid()}'
+        self.stdout.write(f'Worker {name} running with {options["threads"]} threads')
+
+        def work():
+            try:
+                while not stop.is_set():
+                    if taskqueue.run_next():
+                        continue
+                    if options['once']:
+                        return
+                    stop.wait(options['poll'])
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            futures = [pool.submit(work) for _ in range(options['threads'])]
+            try:
+                while not all(future.done() for future in futures):
+                    time.sleep(0.1)
+            except KeyboardInterrupt:
+                stop.set()
+
+        for future in futures:
+            future.result()
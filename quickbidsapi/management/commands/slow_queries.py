@@ -0,0 +1,40 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from quickbidsapi.slow_queries import read_log, summarize
+
+
+class Command(BaseCommand):
+    help = 'Summarizes the slow query log, grouping repeats of the same statement'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=10,
+            help='Number of statements shown, most total time first')
+        parser.add_argument(
+            '--hours', type=float,
+            help='Only count queries logged in the last this many hours')
+        parser.add_argument('--log', help='Log file to read instead of SLOW_QUERY_LOG_PATH')
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options['hours']) if options['hours'] else None
+        groups = summarize(read_log(options['log']), since)
+        if not groups:
+            self.stdout.write('No slow queries logged')
+            return
+
+        for rank, group in enumerate(groups[:options['top']], 1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{rank}. {group["fingerprint"]}: {group["count"]} queries, '
+                f'{group["total_ms"]:.1f} ms in total, {group["max_ms"]:.1f} ms at most, '
+                f'{len(group["distinct_params"])} distinct parameter sets'))
+            self.stdout.write(f'   {group["sql"]}')
+            for title, key in (('Views', 'views'), ('Call sites', 'call_sites')):
+                self.stdout.write(f'   {title}:')
+                for name, count in sorted(group[key].items(), key=lambda item: -item[1]):
+                    self.stdout.write(f'     {count:>6}  {name or "(outside a request)"}')
+            if group['plan']:
+                self.stdout.write('   Latest plan:')
+                for step in group['plan']:
+                    self.stdout.write(f'     {step}')
+        self.stdout.write(f'{len(groups)} distinct statements')
@@ -0,0 +1,352 @@
+"""In-process metrics shared by every worker process, scraped from ``/metrics``.
+
+Each process adds to its own memory mapped file in ``settings.METRICS_DIR``,
+so recording a value is a dict lookup and an 8 byte write under a lock only
+that process takes. A scrape, served by any worker, reads every file in the
+directory and sums them. Counters and histograms of processes that have
+exited stay in the sums; gauges such as requests in flight are only read from
+files whose process is still running. Empty the directory when the service is
+restarted.
+
+A file is an 8 byte header holding the bytes in use followed by entries: the
+length of a key, the key (a JSON ``[name, labels]`` pair) padded to 8 bytes,
+then the value as a double. An entry is written in full before the header
+counts it, so a reader never sees half an entry.
+"""
+import glob
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+
+HEADER = struct.Struct('Q')
+LENGTH = struct.Struct('I')
+VALUE = struct.Struct('d')
+INITIAL_SIZE = 1024 * 1024
+
+# Files of values summed over every process ever started, and of values only
+# counted while their process is running
+CUMULATIVE = 'cumulative'
+LIVE = 'live'
+
+
+def _entry_size(key):
+    return LENGTH.size + len(key) + (-(LENGTH.size + len(key)) % 8) + VALUE.size
+
+
+def read_entries(data):
+    """``(key, value)`` pairs of a metrics file's bytes"""
+    used = HEADER.unpack_from(data, 0)[0]
+    offset = HEADER.size
+    while offset < used:
+        length = LENGTH.unpack_from(data, offset)[0]
+        key = bytes(data[offset + LENGTH.size:offset + LENGTH.size + length]).decode()
+        size = _entry_size(key.encode())
+        yield key, VALUE.unpack_from(data, offset + size - VALUE.size)[0]
+        offset += size
+
+
+class MmapValues:
+    """Float values by key in a memory mapped file written by this process only"""
+
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.file = open(path, 'a+b')  # pylint: disable=consider-using-with
+        size = os.fstat(self.file.fileno()).st_size
+        if size < HEADER.size:
+            self.file.truncate(INITIAL_SIZE)
+        self._map()
+        self.used = HEADER.unpack_from(self.map, 0)[0] or HEADER.size
+        self.offsets = {}
+        offset = HEADER.size
+        for key, _ in read_entries(self.map):
+            size = _entry_size(key.encode())
+            self.offsets[key] = offset + size - VALUE.size
+            offset += size
+
+    def _map(self):
+        self.map = mmap.mmap(self.file.fileno(), os.fstat(self.file.fileno()).st_size)
+
+    def _append(self, key):
+        encoded = key.encode()
+        size = _entry_size(encoded)
+        if self.used + size > len(self.map):
+            capacity = len(self.map)
+            while self.used + size > capacity:
+                capacity *= 2
+            self.map.close()
+            self.file.truncate(capacity)
+            self._map()
+
+        LENGTH.pack_into(self.map, self.used, len(encoded))
+        self.map[self.used + LENGTH.size:self.used + LENGTH.size + len(encoded)] = encoded
+        offset = self.used + size - VALUE.size
+        VALUE.pack_into(self.map, offset, 0.0)
+        self.used += size
+        HEADER.pack_into(self.map, 0, self.used)
+        self.offsets[key] = offset
+        return offset
+
+    def add(self, key, amount):
+        with self.lock:
+            offset = self.offsets.get(key)
+            if offset is None:
+                offset = self._append(key)
+            VALUE.pack_into(self.map, offset, VALUE.unpack_from(self.map, offset)[0] + amount)
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+class Store:
+    """This process's metrics files, opened in ``settings.METRICS_DIR`` on first use"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.directory = None
+        self.pid = None
+        self.files = {}
+
+    def values(self, kind):
+        directory, pid = str(settings.METRICS_DIR), os.getpid()
+        # A forked child or a changed setting writes files of its own
+        if directory != self.directory or pid != self.pid:
+            with self.lock:
+                if directory != self.directory or pid != self.pid:
+                    os.makedirs(directory, exist_ok=True)
+                    if pid == self.pid:
+                        for values in self.files.values():
+                            values.close()
+                    self.files = {
+                        name: MmapValues(os.path.join(directory, f'{name}_{pid}.db'))
+                        for name in (CUMULATIVE, LIVE)
+                    }
+                    self.directory, self.pid = directory, pid
+        return self.files[kind]
+
+
+store = Store()
+
+
+def _key(name, labels):
+    return json.dumps([name, sorted(labels.items())], separators=(',', ':'))
+
+
+class Metric:
+    kind = CUMULATIVE
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY[name] = self
+
+    def _labels(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} takes the labels {", ".join(self.labelnames)}')
+        return {name: str(value) for name, value in labels.items()}
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        store.values(self.kind).add(_key(self.name, self._labels(labels)), amount)
+
+
+class Gauge(Counter):
+    """A value that goes up and down, counted only for running processes"""
+    kind = LIVE
+    type = 'gauge'
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = sorted(buckets) + [math.inf]
+
+    def observe(self, value, **labels):
+        labels = self._labels(labels)
+        values = store.values(self.kind)
+        # Only the bucket the value falls in; buckets are summed up when read
+        bound = next(bound for bound in self.buckets if value <= bound)
+        values.add(_key(f'{self.name}_bucket', {**labels, 'le': _format(bound)}), 1)
+        values.add(_key(f'{self.name}_sum', labels), value)
+        values.add(_key(f'{self.name}_count', labels), 1)
+
+
+REGISTRY = {}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+http_requests = Counter(
+    'quickbids_http_requests_total', 'Requests handled',
+    ('method', 'route', 'status'))
+http_request_duration = Histogram(
+    'quickbids_http_request_duration_seconds', 'Time to produce a response',
+    ('method', 'route'), LATENCY_BUCKETS)
+http_requests_in_flight = Gauge(
+    'quickbids_http_requests_in_flight', 'Requests being handled')
+db_queries = Histogram(
+    'quickbids_db_queries_per_request', 'Database queries run per request',
+    ('route',), (0, 1, 2, 5, 10, 20, 50, 100, 200))
+db_query_duration = Histogram(
+    'quickbids_db_query_duration_seconds', 'Time taken by each database query',
+    ('database',), (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1))
+cache_requests = Counter(
+    'quickbids_cache_requests_total', 'Cache lookups; hits over all lookups is the hit ratio',
+    ('cache', 'result'))
+
+
+def record_cache(cache, hit):
+    cache_requests.inc(cache=cache, result='hit' if hit else 'miss')
+
+
+def _format(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+def _escape(value):
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _pid_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect():
+    """Every recorded value summed over the processes, by ``(name, labels)``"""
+    totals = defaultdict(float)
+    for path in glob.glob(os.path.join(str(settings.METRICS_DIR), '*.db')):
+        kind, _, pid = os.path.basename(path)[:-len('.db')].rpartition('_')
+        if kind == LIVE and not _pid_running(int(pid)):
+            continue
+        try:
+            with open(path, 'rb') as values:
+                data = values.read()
+        except FileNotFoundError:
+            continue
+        if len(data) < HEADER.size:
+            continue
+        for key, value in read_entries(data):
+            name, labels = json.loads(key)
+            totals[name, tuple(map(tuple, labels))] += value
+    return totals
+
+
+def _sample(name, labels, value):
+    if labels:
+        label_text = ','.join(f'{label}="{_escape(text)}"' for label, text in labels)
+        return f'{name}{{{label_text}}} {_format(value)}'
+    return f'{name} {_format(value)}'
+
+
+def exposition(gauges=()):
+    """The Prometheus text format of every metric, with ``gauges``, a list
+    of ``(name, help, value)`` computed for this scrape, appended
+    """
+    totals = collect()
+    samples = defaultdict(list)
+    for (name, labels), value in totals.items():
+        samples[name].append((labels, value))
+
+    lines = []
+    for metric in REGISTRY.values():
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.type}')
+        if not isinstance(metric, Histogram):
+            for labels, value in sorted(samples[metric.name]):
+                lines.append(_sample(metric.name, labels, value))
+            continue
+
+        # Buckets are stored one by one and exposed cumulatively
+        buckets = defaultdict(dict)
+        for labels, value in samples[f'{metric.name}_bucket']:
+            rest = tuple(label for label in labels if label[0] != 'le')
+            le = dict(labels)['le']
+            buckets[rest][float(le)] = value
+        for labels, _ in sorted(samples[f'{metric.name}_count']):
+            running = 0.0
+            for bound in metric.buckets:
+                running += buckets[labels].get(bound, 0.0)
+                lines.append(_sample(
+                    f'{metric.name}_bucket', tuple(sorted(labels + (('le', _format(bound)),))),
+                    running))
+            lines.append(_sample(f'{metric.name}_sum', labels, totals[f'{metric.name}_sum', labels]))
+            lines.append(_sample(f'{metric.name}_count', labels,
+                                 totals[f'{metric.name}_count', labels]))
+
+    for name, documentation, value in gauges:
+        lines += [f'# HELP {name} {documentation}', f'# TYPE {name} gauge', _sample(name, (), value)]
+    return '\n'.join(lines) + '\n'
+
+
+class QueryMetrics:
+    """A database execute wrapper counting and timing a request's queries"""
+
+    def __init__(self, alias):
+        self.alias = alias
+        self.queries = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            db_query_duration.observe(time.perf_counter() - start, database=self.alias)
+
+
+def _route(request):
+    match = getattr(request, 'resolver_match', None)
+    # The URL name keeps the label to one value per endpoint, whatever the ids
+    return (match.view_name or match.route) if match is not None else 'unmatched'
+
+
+class MetricsMiddleware:
+    """Records the count, latency and database queries of every request"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        http_requests_in_flight.inc()
+        start = time.perf_counter()
+        wrappers = [QueryMetrics(connection.alias) for connection in connections.all()]
+        try:
+            with ExitStack() as stack:
+                for connection, wrapper in zip(connections.all(), wrappers):
+                    stack.enter_context(connection.execute_wrapper(wrapper))
+                response = self.get_response(request)
+        finally:
+            http_requests_in_flight.dec()
+
+        # Streamed bodies are still being sent; this times the first byte
+        route = _route(request)
+        http_request_duration.observe(
+            time.perf_counter() - start, method=request.method, route=route)
+        http_requests.inc(method=request.method, route=route, status=response.status_code)
+        db_queries.observe(sum(wrapper.queries for wrapper in wrappers), route=route)
+        return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quickbidsapi', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bid',
+            name='rejected',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_completed_at(apps, schema_editor):
+    # Jobs completed before this migration start their archive clock now
+    Job = apps.get_model('quickbidsapi', 'Job')
+    Job.objects.filter(complete=True, completed_at__isnull=True).update(
+        completed_at=timezone.now())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quickbidsapi', '0002_bid_rejected'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedJob',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=50)),
+                ('address', models.CharField(max_length=100)),
+                ('square_footage', models.FloatField(blank=True, null=True)),
+                ('open', models.BooleanField(blank=True, null=True)),
+                ('complete', models.BooleanField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('contractor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_jobs', to='quickbidsapi.contractor')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedBid',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('rate', models.FloatField(blank=True, null=True)),
+                ('accepted', models.BooleanField(default=False)),
+                ('rejected', models.BooleanField(default=False)),
+                ('is_request', models.BooleanField(default=False)),
+                ('primary_contractor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_requests', to='quickbidsapi.contractor')),
+                ('sub_contractor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_bids', to='quickbidsapi.contractor')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bids', to='quickbidsapi.archivedjob')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedJobField',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('field', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_jobs', to='quickbidsapi.field')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applicable_fields', to='quickbidsapi.archivedjob')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='archivedjob',
+            name='fields',
+            field=models.ManyToManyField(through='quickbidsapi.ArchivedJobField', to='quickbidsapi.field'),
+        ),
+        migrations.RunPython(backfill_completed_at, migrations.RunPython.noop),
+    ]
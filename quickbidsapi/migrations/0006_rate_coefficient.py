@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quickbidsapi', '0005_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateCoefficient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('intercept', models.FloatField()),
+                ('slope', models.FloatField()),
+                ('mean_rate', models.FloatField()),
+                ('residual_std', models.FloatField()),
+                ('samples', models.PositiveIntegerField()),
+                ('fitted_at', models.DateTimeField()),
+                ('field', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='rate_coefficient', to='quickbidsapi.field')),
+            ],
+        ),
+    ]
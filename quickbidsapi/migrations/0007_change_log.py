@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:01
+
+from django.db import migrations, models
+
+
+def backfill_changes(apps, schema_editor):
+    # Existing rows start out as upserts so a first sync sees everything
+    Change = apps.get_model('quickbidsapi', 'Change')
+    Contractor = apps.get_model('quickbidsapi', 'Contractor')
+    Job = apps.get_model('quickbidsapi', 'Job')
+    Bid = apps.get_model('quickbidsapi', 'Bid')
+
+    def upserts(model, rows):
+        for pk, *scope in rows:
+            yield Change(model=model, object_id=pk, action='upsert',
+                         primary_contractor_id=scope[0] if scope else None,
+                         sub_contractor_id=scope[1] if scope else None)
+
+    for model, rows in (
+        ('contractor', Contractor.objects.filter(deleted_at__isnull=True)
+         .order_by('pk').values_list('pk')),
+        ('job', Job.objects.filter(deleted_at__isnull=True)
+         .order_by('pk').values_list('pk')),
+        ('bid', Bid.objects.order_by('pk').values_list(
+            'pk', 'primary_contractor_id', 'sub_contractor_id')),
+    ):
+        Change.objects.bulk_create(upserts(model, rows.iterator()), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quickbidsapi', '0006_rate_coefficient'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeCompaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('horizon', models.BigIntegerField(default=0)),
+                ('superseded_deleted', models.PositiveIntegerField(default=0)),
+                ('tombstones_deleted', models.PositiveIntegerField(default=0)),
+                ('ran_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('action', models.CharField(choices=[('upsert', 'Upsert'), ('delete', 'Delete')], max_length=10)),
+                ('primary_contractor_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('sub_contractor_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model', 'object_id'], name='quickbidsap_model_e3ebc3_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_changes, migrations.RunPython.noop),
+    ]
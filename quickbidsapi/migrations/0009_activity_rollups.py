@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quickbidsapi', '0008_bid_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedbid',
+            name='accepted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedbid',
+            name='created_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedjob',
+            name='accepted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='archivedjob',
+            name='created_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='bid',
+            name='accepted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='bid',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='accepted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ActivityRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('scope', models.CharField(choices=[('all', 'All'), ('field', 'Field'), ('contractor', 'Primary contractor')], max_length=10)),
+                ('scope_id', models.BigIntegerField(default=0)),
+                ('start', models.DateTimeField()),
+                ('bids', models.IntegerField(default=0)),
+                ('rated_bids', models.IntegerField(default=0)),
+                ('rate_sum', models.FloatField(default=0.0)),
+                ('accepted', models.IntegerField(default=0)),
+                ('rated_accepted', models.IntegerField(default=0)),
+                ('accepted_rate_sum', models.FloatField(default=0.0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'scope', 'scope_id', 'start'), name='unique_activity_bucket')],
+            },
+        ),
+    ]
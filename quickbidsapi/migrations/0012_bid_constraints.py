@@ -0,0 +1,42 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class AlterBidReference(migrations.AlterField):
+    """Alters a bid foreign key everywhere but the shard databases, which hold
+    only the bid table and so cannot enforce a constraint on it
+    """
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.alias not in settings.BID_SHARD_DATABASES:
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.alias not in settings.BID_SHARD_DATABASES:
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quickbidsapi', '0011_admin_indexes'),
+    ]
+
+    operations = [
+        AlterBidReference(
+            model_name='bid',
+            name='job',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bids', to='quickbidsapi.job'),
+        ),
+        AlterBidReference(
+            model_name='bid',
+            name='primary_contractor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='my_requests', to='quickbidsapi.contractor'),
+        ),
+        AlterBidReference(
+            model_name='bid',
+            name='sub_contractor',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='my_bids', to='quickbidsapi.contractor'),
+        ),
+    ]
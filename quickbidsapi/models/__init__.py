@@ -2,4 +2,16 @@ from .bid import Bid
 from .contractor import Contractor
 from .field import Field
 from .job import Job
-from .job_field import JobField
\ No newline at end of file
+from .job_field import JobField
+from .archived_bid import ArchivedBid
+from .archived_job import ArchivedJob
+from .archived_job_field import ArchivedJobField
+from .purge import Purge
+from .task import Task
+from .rate_coefficient import RateCoefficient
+from .change import Change
+from .change_compaction import ChangeCompaction
+from .id_sequence import IdSequence
+from .activity_rollup import ActivityRollup
+from .revoked_token import RevokedToken
+from .roster_upload import RosterUpload
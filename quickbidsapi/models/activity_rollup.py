@@ -0,0 +1,40 @@
+from django.db import models
+
+
+class ActivityRollup(models.Model):
+    """Bid counts and rate sums of one hour or day, over every bid or the bids
+    of one field or primary contractor; see ``quickbidsapi.activity``
+    """
+    HOUR = 'hour'
+    DAY = 'day'
+    BUCKET_CHOICES = [
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+    ]
+    ALL = 'all'
+    FIELD = 'field'
+    CONTRACTOR = 'contractor'
+    SCOPE_CHOICES = [
+        (ALL, 'All'),
+        (FIELD, 'Field'),
+        (CONTRACTOR, 'Primary contractor'),
+    ]
+
+    bucket = models.CharField(max_length=4, choices=BUCKET_CHOICES)
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    # The field or contractor id, 0 for every bid
+    scope_id = models.BigIntegerField(default=0)
+    start = models.DateTimeField()
+    bids = models.IntegerField(default=0)
+    rated_bids = models.IntegerField(default=0)
+    rate_sum = models.FloatField(default=0.0)
+    accepted = models.IntegerField(default=0)
+    rated_accepted = models.IntegerField(default=0)
+    accepted_rate_sum = models.FloatField(default=0.0)
+
+    class Meta:
+        constraints = [
+            # Also the index a dashboard's range of buckets is read from
+            models.UniqueConstraint(
+                fields=['bucket', 'scope', 'scope_id', 'start'], name='unique_activity_bucket'),
+        ]
@@ -0,0 +1,25 @@
+from django.db import models
+from .managers import ActiveManager
+
+
+class ArchivedBid(models.Model):
+    """A Bid on an ArchivedJob; keeps the original id"""
+    id = models.BigIntegerField(primary_key=True)
+    rate = models.FloatField(null=True, blank=True)
+    job = models.ForeignKey(
+        "ArchivedJob", on_delete=models.CASCADE, related_name="bids")
+    primary_contractor = models.ForeignKey(
+        "Contractor", on_delete=models.CASCADE, related_name="archived_requests")
+    sub_contractor = models.ForeignKey(
+        "Contractor", on_delete=models.CASCADE, related_name="archived_bids")
+    accepted = models.BooleanField(default=False)
+    rejected = models.BooleanField(default=False)
+    is_request = models.BooleanField(default=False)
+    created_at = models.DateTimeField(null=True, blank=True)
+    accepted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveManager(
+        'job__contractor__deleted_at',
+        'primary_contractor__deleted_at',
+        'sub_contractor__deleted_at',
+    )
@@ -0,0 +1,21 @@
+from django.db import models
+from .managers import ActiveManager
+
+
+class ArchivedJob(models.Model):
+    """A completed Job moved out of the hot table; keeps the original id"""
+    id = models.BigIntegerField(primary_key=True)
+    contractor = models.ForeignKey(
+        "Contractor", on_delete=models.CASCADE, related_name="archived_jobs")
+    name = models.CharField(max_length=50)
+    address = models.CharField(max_length=100)
+    fields = models.ManyToManyField("Field", through='ArchivedJobField')
+    square_footage = models.FloatField(null=True, blank=True)
+    open = models.BooleanField(null=True, blank=True)
+    complete = models.BooleanField(null=True, blank=True)
+    created_at = models.DateTimeField(null=True, blank=True)
+    accepted_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ActiveManager('contractor__deleted_at')
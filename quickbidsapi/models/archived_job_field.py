@@ -0,0 +1,7 @@
+from django.db import models
+
+
+class ArchivedJobField(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    job = models.ForeignKey("ArchivedJob", on_delete=models.CASCADE, related_name="applicable_fields")
+    field = models.ForeignKey("Field", on_delete=models.CASCADE, related_name="archived_jobs")
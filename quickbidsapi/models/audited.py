@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class Audited(models.Model):
+    """Remembers the ``audit_fields`` values a row was loaded with, so the
+    audit receiver in ``quickbidsapi.signals`` can tell what a save changed
+    without reading the row again
+    """
+
+    audit_fields = ()
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.audit_loaded = instance.audit_values()
+        return instance
+
+    def audit_values(self):
+        # Deferred fields are skipped rather than loaded
+        return {name: self.__dict__[name] for name in self.audit_fields if name in self.__dict__}
+
+    def audit_changes(self):
+        """``{field: [old, new]}`` since the row was loaded or last audited"""
+        loaded = getattr(self, 'audit_loaded', {})
+        return {name: [loaded.get(name), value] for name, value in self.audit_values().items()
+                if name not in loaded or loaded[name] != value}
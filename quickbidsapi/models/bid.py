@@ -1,8 +1,14 @@
 from django.db import models
+from .audited import Audited
+from .change_logged import ChangeLogged
+from .managers import ActiveManager
 
 
-class Bid(models.Model):
+class Bid(Audited, ChangeLogged):
     rate = models.FloatField(null=True, blank=True)
+    # Enforced in the default database only: a shard holds just the bid table,
+    # so migrations that rebuild it must leave the shard databases out, as
+    # 0012_bid_constraints does; see ``quickbidsapi.sharding``
     job = models.ForeignKey(
         "Job", on_delete=models.CASCADE, related_name="bids")
     primary_contractor = models.ForeignKey(
@@ -10,4 +16,28 @@ class Bid(models.Model):
     sub_contractor = models.ForeignKey(
         "Contractor", on_delete=models.CASCADE, related_name="my_bids")
     accepted = models.BooleanField(default=False)
+    rejected = models.BooleanField(default=False)
     is_request = models.BooleanField(default=False)
+    # Null for bids made before the timestamps were recorded
+    created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True, db_index=True)
+    accepted_at = models.DateTimeField(null=True, blank=True)
+
+    objects = ActiveManager(
+        'job__deleted_at',
+        'job__contractor__deleted_at',
+        'primary_contractor__deleted_at',
+        'sub_contractor__deleted_at',
+    )
+
+    audit_fields = ('rate', 'accepted', 'rejected', 'accepted_at')
+    scope_fields = ('primary_contractor', 'sub_contractor')
+
+    class Meta:
+        indexes = [
+            # Bids by status, as filtered in the admin
+            models.Index(fields=['accepted', 'rejected'], name='bid_status_idx'),
+        ]
+
+    def change_key(self):
+        # Only the two contractors on a bid can see it
+        return 'bid', self.pk, self.primary_contractor_id, self.sub_contractor_id
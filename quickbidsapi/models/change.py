@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class Change(models.Model):
+    """One entry of the append only change log behind ``GET /sync``.
+
+    The id is the sync cursor. ``primary_contractor_id`` and
+    ``sub_contractor_id`` limit who is sent the entry; both are null for rows
+    every contractor can see.
+    """
+    UPSERT = 'upsert'
+    DELETE = 'delete'
+    ACTION_CHOICES = [
+        (UPSERT, 'Upsert'),
+        (DELETE, 'Delete'),
+    ]
+
+    model = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    primary_contractor_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    sub_contractor_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model', 'object_id']),
+        ]
@@ -0,0 +1,12 @@
+from django.db import models
+
+
+class ChangeCompaction(models.Model):
+    """A run of the change log compaction. Cursors issued before the run
+    that are older than its ``horizon``, the newest tombstone it dropped, may
+    have missed a delete and must sync from scratch
+    """
+    horizon = models.BigIntegerField(default=0)
+    superseded_deleted = models.PositiveIntegerField(default=0)
+    tombstones_deleted = models.PositiveIntegerField(default=0)
+    ran_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,59 @@
+from django.db import models, router, transaction
+from .change import Change
+
+
+class ChangeLogged(models.Model):
+    """Writes a Change entry in the same transaction as every save.
+
+    Deletes, including queryset deletes, are logged by the post_delete
+    receiver in ``quickbidsapi.signals``, which Django runs inside the
+    delete's own transaction.
+    """
+
+    # Fields the visibility of a row depends on; when a save changes them the
+    # contractors who could see the old row are sent a tombstone
+    scope_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def change_key(self):
+        """``(model, object_id, primary_contractor_id, sub_contractor_id)``
+        of the synced row this row belongs to
+        """
+        return self._meta.model_name, self.pk, None, None
+
+    def change_action(self):
+        return Change.UPSERT
+
+    def _previous_change_key(self, update_fields):
+        if not self.scope_fields or self._state.adding:
+            return None
+        if update_fields is not None and not set(update_fields) & set(self.scope_fields):
+            return None
+        previous = type(self)._base_manager.using(self._state.db).filter(pk=self.pk).first()
+        return previous.change_key() if previous is not None else None
+
+    def save(self, *args, **kwargs):
+        # A sharded bid is saved in its shard's transaction, and its Change
+        # entry is written in the default database before the shard commits;
+        # see ``quickbidsapi.changelog``
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            previous = self._previous_change_key(kwargs.get('update_fields'))
+            super().save(*args, **kwargs)
+            key = self.change_key()
+            if previous is not None and previous != key:
+                log_change(previous, Change.DELETE)
+            log_change(key, self.change_action())
+
+
+def log_change(key, action):
+    model, object_id, primary_contractor_id, sub_contractor_id = key
+    return Change.objects.create(
+        model=model,
+        object_id=object_id,
+        action=action,
+        primary_contractor_id=primary_contractor_id,
+        sub_contractor_id=sub_contractor_id,
+    )
@@ -1,12 +1,24 @@
 from django.db import models
 from django.contrib.auth.models import User
+from .change import Change
+from .change_logged import ChangeLogged
+from .managers import ActiveManager
 
 
-class Contractor(models.Model):
+class Contractor(ChangeLogged):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     company_name = models.CharField(max_length=200)
     phone_number = models.CharField(max_length=10)
     primary_contractor = models.BooleanField(default=False)
+    deleted_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = ActiveManager('deleted_at')
+
+    def __str__(self):
+        return self.company_name
+
+    def change_action(self):
+        return Change.DELETE if self.deleted_at else Change.UPSERT
 
     @property
     def full_name(self):
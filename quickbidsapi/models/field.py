@@ -3,3 +3,6 @@ from django.db import models
 
 class Field(models.Model):
     job_title = models.CharField(max_length=50)
+
+    def __str__(self):
+        return self.job_title
@@ -0,0 +1,9 @@
+from django.db import models
+
+
+class IdSequence(models.Model):
+    """The last id handed out for rows spread over several databases, which
+    cannot each number their own rows without colliding
+    """
+    name = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
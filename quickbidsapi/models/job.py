@@ -1,7 +1,11 @@
 from django.db import models
+from .audited import Audited
+from .change import Change
+from .change_logged import ChangeLogged
+from .managers import ActiveManager
 
 
-class Job(models.Model):
+class Job(Audited, ChangeLogged):
     contractor = models.ForeignKey(
         "Contractor", on_delete=models.CASCADE, related_name="my_jobs")
     name = models.CharField(max_length=50)
@@ -10,3 +14,24 @@ class Job(models.Model):
     square_footage = models.FloatField(null=True, blank=True)
     open = models.BooleanField(null=True, blank=True)
     complete = models.BooleanField(null=True, blank=True)
+    # Null for jobs posted before the timestamps were recorded
+    created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True, db_index=True)
+    accepted_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    deleted_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = ActiveManager('deleted_at', 'contractor__deleted_at')
+
+    audit_fields = ('open', 'complete')
+
+    class Meta:
+        indexes = [
+            # Jobs by status, as filtered in the admin
+            models.Index(fields=['open', 'complete'], name='job_status_idx'),
+        ]
+
+    def __str__(self):
+        return self.name
+
+    def change_action(self):
+        return Change.DELETE if self.deleted_at else Change.UPSERT
@@ -1,6 +1,11 @@
 from django.db import models
+from .change_logged import ChangeLogged
 
 
-class JobField(models.Model):
+class JobField(ChangeLogged):
     job = models.ForeignKey("Job", on_delete=models.CASCADE, related_name="applicable_fields")
     field = models.ForeignKey("Field", on_delete=models.CASCADE, related_name="applicable_jobs")
+
+    def change_key(self):
+        # Jobs are synced with their fields
+        return 'job', self.job_id, None, None
@@ -0,0 +1,18 @@
+from django.db import models
+
+
+class ActiveManager(models.Manager):
+    """Default manager that hides soft deleted rows.
+
+    ``lookups`` are the ``deleted_at`` paths that must be empty for a row to
+    be visible, e.g. a Job disappears with its contractor. Code that needs to
+    see deleted rows (the purge worker) uses ``Model._base_manager``.
+    """
+
+    def __init__(self, *lookups):
+        super().__init__()
+        self.lookups = lookups
+
+    def get_queryset(self):
+        return super().get_queryset().filter(
+            **{f'{lookup}__isnull': True for lookup in self.lookups})
@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class RateCoefficient(models.Model):
+    """Least squares fit of accepted rate against job square footage for one
+    field, or for every field when ``field`` is null; see ``quickbidsapi.estimator``
+    """
+    field = models.OneToOneField(
+        "Field", on_delete=models.CASCADE, null=True, blank=True, related_name="rate_coefficient")
+    intercept = models.FloatField()
+    slope = models.FloatField()
+    mean_rate = models.FloatField()
+    residual_std = models.FloatField()
+    samples = models.PositiveIntegerField()
+    fitted_at = models.DateTimeField()
@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class RevokedToken(models.Model):
+    """A signed access token that must no longer authenticate, by its ``jti``,
+    or with no ``jti`` every token of the user issued up to ``revoked_at``.
+    Kept until ``expires_at``, when the tokens it covers have expired anyway.
+
+    ``user_id`` is not a foreign key: the revocation has to outlive a purged
+    user, whose signed tokens would still verify.
+    """
+    jti = models.CharField(max_length=32, blank=True)
+    user_id = models.IntegerField()
+    revoked_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
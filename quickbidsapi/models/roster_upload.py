@@ -0,0 +1,27 @@
+from django.db import models
+
+
+class RosterUpload(models.Model):
+    """A roster posted to ``/contractors/import``, imported in the background
+    by the ``import_roster_upload`` task.
+
+    ``rows`` holds the roster, plaintext passwords included, only until the
+    import finishes; ``result`` holds the created, skipped and refused rows so
+    far.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+    ]
+
+    rows = models.JSONField(default=list)
+    row_count = models.PositiveIntegerField(default=0)
+    resume = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    result = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
@@ -0,0 +1,34 @@
+"""``?ids=1,2,3`` batch retrieval shared by the list endpoints"""
+from django.conf import settings
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def parse_ids(raw):
+    """Parses a comma separated id list, keeping request order and dropping duplicates
+
+    Raises:
+        ValueError: if an id is not an integer or too many ids are requested
+    """
+    ids = list(dict.fromkeys(int(pk) for pk in raw.split(',') if pk.strip()))
+    if len(ids) > settings.MULTIGET_MAX_IDS:
+        raise ValueError(f'At most {settings.MULTIGET_MAX_IDS} ids may be requested at once')
+    return ids
+
+
+def multiget_response(request, queryset, reader):
+    """Loads every requested row with a single query and reports the ids
+    that were not found instead of failing the whole batch.
+    """
+    try:
+        ids = parse_ids(request.query_params.get('ids'))
+    except ValueError as ex:
+        return Response({'message': str(ex)}, status=status.HTTP_400_BAD_REQUEST)
+
+    rows = reader.in_bulk(queryset, ids)
+
+    data = {
+        'results': [rows[pk] for pk in ids if pk in rows],
+        'missing': [pk for pk in ids if pk not in rows],
+    }
+    return Response(data, status=status.HTTP_200_OK)
@@ -0,0 +1,228 @@
+"""Profiles of single requests, captured on demand into ``settings.PROFILE_DIR``.
+
+A request is profiled when a staff user sends the ``settings.PROFILE_HEADER``
+header, or when it falls in the ``settings.PROFILE_SAMPLE_RATE`` fraction of
+traffic picked at random. Any other request goes straight through: the
+middleware costs a header lookup and, with sampling on, one random number.
+
+A profiled request runs under three tools at once:
+
+- cProfile, whose statistics are saved as ``<id>.prof`` for pstats or snakeviz
+- a thread sampling the request's stack every ``PROFILE_SAMPLE_INTERVAL_MS``,
+  saved in the collapsed format flame graph tools read as ``<id>.folded``
+- tracemalloc, whose peak and largest allocations by line go in ``<id>.json``
+  with the request's method, path, status and duration
+
+tracemalloc traces every thread, so one capture runs at a time per process; a
+request asking while another is captured is served without one. Only the
+newest ``settings.PROFILE_MAX_CAPTURES`` captures are kept. ``GET /profiles``
+lists them and the response of a profiled request names its capture in the
+``X-Profile-Id`` header.
+"""
+import cProfile
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+MAX_STACK_DEPTH = 100
+TOP_ALLOCATIONS = 25
+
+_capture_lock = threading.Lock()
+
+
+def _header_key(name):
+    return 'HTTP_' + name.upper().replace('-', '_')
+
+
+def _frame_name(code):
+    filename = code.co_filename
+    for root in (str(settings.BASE_DIR) + os.sep, *(path + os.sep for path in sys.path if path)):
+        if filename.startswith(root):
+            filename = filename[len(root):]
+            break
+    # Semicolons separate the frames of a collapsed stack
+    return f'{code.co_name} ({filename})'.replace(';', ':')
+
+
+class StackSampler(threading.Thread):
+    """Counts the stacks of one thread, root first, until stopped"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.names = {}
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)  # pylint: disable=protected-access
+            names = []
+            while frame is not None and len(names) < MAX_STACK_DEPTH:
+                name = self.names.get(frame.f_code)
+                if name is None:
+                    name = self.names[frame.f_code] = _frame_name(frame.f_code)
+                names.append(name)
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def _allocations(snapshot):
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ])
+    return [{
+        'file': str(stat.traceback[0].filename),
+        'line': stat.traceback[0].lineno,
+        'size': stat.size,
+        'count': stat.count,
+    } for stat in snapshot.statistics('lineno')[:TOP_ALLOCATIONS]]
+
+
+def _is_staff(request):
+    """Whether the request's credentials, of any kind the API takes, are a staff user's"""
+    authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    try:
+        user = Request(request, authenticators=authenticators).user
+    except APIException:
+        return False
+    return bool(user and user.is_staff)
+
+
+def _prune(directory):
+    names = sorted((name for name in os.listdir(directory) if name.endswith('.json')), reverse=True)
+    for name in names[settings.PROFILE_MAX_CAPTURES:]:
+        capture_id = name[:-len('.json')]
+        for suffix in ('.json', '.prof', '.folded'):
+            try:
+                os.remove(os.path.join(directory, capture_id + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def capture(request, get_response, trigger):
+    """The response to ``request``, with a capture of it saved"""
+    directory = str(settings.PROFILE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    capture_id = f'{timezone.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}'
+
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    sampler = StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+    profile = cProfile.Profile()
+    started_at = timezone.now()
+    start = time.perf_counter()
+    sampler.start()
+    profile.enable()
+    try:
+        response = get_response(request)
+    finally:
+        profile.disable()
+        duration = time.perf_counter() - start
+        sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not tracing:
+            tracemalloc.stop()
+
+    profile.dump_stats(os.path.join(directory, f'{capture_id}.prof'))
+    with open(os.path.join(directory, f'{capture_id}.folded'), 'w', encoding='utf-8') as folded:
+        folded.write(sampler.collapsed())
+    summary = {
+        'id': capture_id,
+        'time': started_at,
+        'trigger': trigger,
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'duration_ms': round(duration * 1000, 3),
+        'samples': sum(sampler.stacks.values()),
+        'memory': {'peak': peak, 'retained': current, 'top': _allocations(snapshot)},
+    }
+    with open(os.path.join(directory, f'{capture_id}.json'), 'w', encoding='utf-8') as meta:
+        json.dump(summary, meta, cls=DjangoJSONEncoder)
+    _prune(directory)
+
+    response['X-Profile-Id'] = capture_id
+    return response
+
+
+CAPTURE_FILES = {'prof': 'application/octet-stream', 'folded': 'text/plain; charset=utf-8'}
+
+
+def capture_path(capture_id, kind):
+    """The path of a capture's ``.prof`` or ``.folded`` file, or None when
+    there is no such capture
+    """
+    if kind not in CAPTURE_FILES or not re.fullmatch(r'\d{8}T\d{12}-[0-9a-f]{8}', capture_id):
+        return None
+    path = os.path.join(str(settings.PROFILE_DIR), f'{capture_id}.{kind}')
+    return path if os.path.exists(path) else None
+
+
+def recent_captures(limit=None):
+    """Summaries of the kept captures, newest first"""
+    directory = str(settings.PROFILE_DIR)
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith('.json')]
+    except FileNotFoundError:
+        return []
+    summaries = []
+    # Ids start with their time, so they sort by it
+    for name in sorted(names, reverse=True)[:limit]:
+        try:
+            with open(os.path.join(directory, name), encoding='utf-8') as meta:
+                summaries.append(json.load(meta))
+        except (FileNotFoundError, ValueError):
+            continue
+    return summaries
+
+
+class ProfilingMiddleware:
+    """Profiles the requests a staff user asks for and a sample of the rest"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.header = _header_key(settings.PROFILE_HEADER)
+
+    def __call__(self, request):
+        if self.header in request.META:
+            trigger = 'header'
+        elif settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE:
+            trigger = 'sample'
+        else:
+            return self.get_response(request)
+
+        if trigger == 'header' and not _is_staff(request):
+            return self.get_response(request)
+        if not _capture_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return capture(request, self.get_response, trigger)
+        finally:
+            _capture_lock.release()
@@ -0,0 +1,110 @@
+"""Soft deletion of contractors and jobs, and the background purge that
+removes their dependent rows in bounded batches.
+
+Deleting a large account through ``on_delete=CASCADE`` in one request holds
+the database write lock for seconds, so requests only mark the row deleted
+(hiding it, and everything under it, from the default managers) and record a
+Purge. The ``purge_deleted`` background task (or ``manage.py purge_deleted``
+for anything left behind) then works through the dependents one batch per
+transaction.
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from quickbidsapi.models import (
+    ArchivedBid, ArchivedJob, ArchivedJobField, Bid, Contractor, Job, JobField, Purge)
+from quickbidsapi.sharding import bid_shards, bids_on_job
+from quickbidsapi.signed_tokens import revoke_user_tokens
+from quickbidsapi.transactions import atomic_with_retry
+
+
+def soft_delete_contractor(contractor):
+    """Hides a contractor with their jobs and bids and schedules the purge"""
+    with transaction.atomic():
+        contractor.deleted_at = timezone.now()
+        contractor.save(update_fields=['deleted_at'])
+        # Inactive users can neither log in nor authenticate with their token
+        User.objects.filter(pk=contractor.user_id).update(is_active=False)
+        # Signed tokens are verified without reading the user
+        revoke_user_tokens(contractor.user_id)
+        return Purge.objects.create(model='contractor', object_id=contractor.pk)
+
+
+def soft_delete_job(job):
+    """Hides a job with its bids and schedules the purge"""
+    with transaction.atomic():
+        job.deleted_at = timezone.now()
+        job.save(update_fields=['deleted_at'])
+        return Purge.objects.create(model='job', object_id=job.pk)
+
+
+def _contractor_dependents(contractor_id):
+    """Querysets to empty, in order, when purging a contractor"""
+    involved = Q(primary_contractor_id=contractor_id) \
+        | Q(sub_contractor_id=contractor_id) \
+        | Q(job__contractor_id=contractor_id)
+    # A shard cannot join the contractor's jobs, so their ids are read here
+    job_ids = list(Job._base_manager.filter(contractor_id=contractor_id).values_list('pk', flat=True))
+    return [
+        *(Bid._base_manager.using(alias).filter(
+            Q(primary_contractor_id=contractor_id) | Q(sub_contractor_id=contractor_id)
+            | Q(job_id__in=job_ids)) for alias in bid_shards()),
+        ArchivedBid._base_manager.filter(involved),
+        JobField._base_manager.filter(job__contractor_id=contractor_id),
+        ArchivedJobField._base_manager.filter(job__contractor_id=contractor_id),
+        Job._base_manager.filter(contractor_id=contractor_id),
+        ArchivedJob._base_manager.filter(contractor_id=contractor_id),
+        Token.objects.filter(user__contractor__id=contractor_id),
+        # Cascades to the contractor row itself
+        User.objects.filter(contractor__id=contractor_id),
+        Contractor._base_manager.filter(pk=contractor_id),
+    ]
+
+
+def _job_dependents(job_id):
+    """Querysets to empty, in order, when purging a job"""
+    return [
+        bids_on_job(job_id),
+        JobField._base_manager.filter(job_id=job_id),
+        Job._base_manager.filter(pk=job_id),
+    ]
+
+
+DEPENDENTS = {
+    'contractor': _contractor_dependents,
+    'job': _job_dependents,
+}
+
+
+def purge_batch(purge, batch_size):
+    """Deletes up to ``batch_size`` rows of the next non-empty dependent
+    queryset in one transaction and records the progress.
+
+    Returns:
+        bool: whether there is anything left to delete
+    """
+    def delete_batch():
+        for queryset in DEPENDENTS[purge.model](purge.object_id):
+            ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+            if ids:
+                deleted, _ = queryset.model._base_manager.using(queryset.db).filter(
+                    pk__in=ids).delete()
+                purge.rows_deleted += deleted
+                purge.status = Purge.RUNNING
+                purge.save(update_fields=['rows_deleted', 'status', 'updated_at'])
+                return True
+
+        purge.status = Purge.DONE
+        purge.finished_at = timezone.now()
+        purge.save(update_fields=['status', 'finished_at', 'updated_at'])
+        return False
+
+    return atomic_with_retry(delete_batch)
+
+
+def run_purge(purge, batch_size):
+    while purge_batch(purge, batch_size):
+        pass
+    return purge
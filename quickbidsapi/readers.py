@@ -0,0 +1,200 @@
+"""Read only serialization built straight from ``values_list()`` rows.
+
+A ``Reader`` is declared once per response shape and compiled into a single
+function that turns a row tuple into the output dict, so reading a list costs
+one tuple per row instead of a model instance per row and related object plus
+a ``ModelSerializer`` walk over every field. The output is the same JSON the
+DRF serializers produced: float fields go through ``float()``, everything else
+is passed through as the database returned it.
+
+Spec values are a lookup string, ``Related`` for a nested object, ``Many`` for
+a nested list over a many to many field (read with one extra query per chunk)
+or ``Computed`` for a value derived from other columns::
+
+    job_reader = Reader(Job, {
+        'id': 'id',
+        'contractor': Related('contractor', CONTRACTOR_SUMMARY),
+        'fields': Many('fields', FIELD),
+    })
+    job_reader.read(Job.objects.filter(open=True))
+"""
+from collections import defaultdict
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+from quickbidsapi.models import ArchivedBid, ArchivedJob, Bid, Contractor, Field, Job
+
+
+class Related:
+    """A nested object read through a foreign key"""
+
+    def __init__(self, lookup, spec):
+        self.lookup = lookup
+        self.spec = spec
+
+
+class Many:
+    """A nested list read through a many to many field"""
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.spec = spec
+
+
+class Computed:
+    """``func(*values)`` of the given lookups"""
+
+    def __init__(self, func, *lookups):
+        self.func = func
+        self.lookups = lookups
+
+
+def _resolve(model, lookup):
+    """The model field at the end of ``lookup``, or None for annotations"""
+    field = None
+    for name in lookup.split('__'):
+        if model is None:
+            return None
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        model = field.related_model
+    return field
+
+
+class Reader:
+
+    def __init__(self, model, spec):
+        self.model = model
+        self.columns = ['pk']
+        self._many = []
+        self._namespace = {}
+        body = self._compile(spec, model, '')
+        source = f'def build(row, many):\n    return {body}\n'
+        exec(compile(source, f'<reader {model.__name__}>', 'exec'), self._namespace)  # pylint: disable=exec-used
+        self._build = self._namespace['build']
+
+    def _column(self, lookup):
+        if lookup not in self.columns:
+            self.columns.append(lookup)
+        return f'row[{self.columns.index(lookup)}]'
+
+    def _name(self, value):
+        name = f'_v{len(self._namespace)}'
+        self._namespace[name] = value
+        return name
+
+    def _compile(self, spec, model, prefix):
+        items = []
+        for key, source in spec.items():
+            if isinstance(source, Related):
+                field = _resolve(model, source.lookup)
+                value = self._compile(source.spec, field.related_model,
+                                      f'{prefix}{source.lookup}__')
+            elif isinstance(source, Many):
+                field = model._meta.get_field(source.name)
+                value = f'many[{len(self._many)}][row[0]]'
+                self._many.append((field, Reader(field.related_model, source.spec)))
+            elif isinstance(source, Computed):
+                args = ', '.join(self._column(prefix + lookup) for lookup in source.lookups)
+                value = f'{self._name(source.func)}({args})'
+            else:
+                value = self._column(prefix + source)
+                if isinstance(_resolve(model, source), models.FloatField):
+                    value = f'(None if {value} is None else float({value}))'
+            items.append(f'{key!r}: {value}')
+        return '{' + ', '.join(items) + '}'
+
+    def values(self, queryset):
+        """The row tuples ``build`` expects"""
+        return queryset.values_list(*self.columns)
+
+    def _read_many(self, field, reader, ids):
+        """Nested rows of ``field`` for each parent id, in the order they were added"""
+        through = field.remote_field.through
+        parent = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        rows = through.objects.filter(**{f'{parent}__in': ids}).order_by('pk').values_list(
+            parent, *(f'{target}__{column}' for column in reader.columns))
+        grouped = defaultdict(list)
+        for parent_id, *row in rows:
+            grouped[parent_id].append(reader._build(row, ()))
+        return grouped
+
+    def build(self, rows):
+        """Output dicts for rows read with ``values``"""
+        rows = list(rows)
+        many = ()
+        if self._many and rows:
+            ids = [row[0] for row in rows]
+            many = [self._read_many(field, reader, ids) for field, reader in self._many]
+        build = self._build
+        return [build(row, many) for row in rows]
+
+    def read(self, queryset):
+        return self.build(self.values(queryset))
+
+    def get(self, queryset, **lookups):
+        """The output dict for the single matching row, or None"""
+        results = self.build(self.values(queryset.filter(**lookups))[:1])
+        return results[0] if results else None
+
+    def in_bulk(self, queryset, ids):
+        """Output dicts keyed by id for the rows in ``ids`` that exist"""
+        return {data['id']: data for data in self.read(queryset.filter(pk__in=ids))}
+
+
+FIELD = {'id': 'id', 'job_title': 'job_title'}
+
+CONTRACTOR_SUMMARY = {'id': 'id', 'company_name': 'company_name'}
+
+CONTRACTOR = {
+    'id': 'id',
+    'first_name': 'user__first_name',
+    'last_name': 'user__last_name',
+    'username': 'user__username',
+    'email': 'user__email',
+    'company_name': 'company_name',
+    'phone_number': 'phone_number',
+    'primary_contractor': 'primary_contractor',
+    'full_name': Computed('{} {}'.format, 'user__first_name', 'user__last_name'),
+}
+
+JOB = {
+    'id': 'id',
+    'contractor': Related('contractor', CONTRACTOR_SUMMARY),
+    'fields': Many('fields', FIELD),
+    'name': 'name',
+    'address': 'address',
+    'square_footage': 'square_footage',
+    'open': 'open',
+    'complete': 'complete',
+}
+
+JOB_SUMMARY = {
+    'id': 'id',
+    'name': 'name',
+    'contractor_id': 'contractor',
+    'complete': 'complete',
+    'open': 'open',
+}
+
+BID = {
+    'id': 'id',
+    'rate': 'rate',
+    'job': Related('job', JOB_SUMMARY),
+    'primary_contractor': Related('primary_contractor', CONTRACTOR_SUMMARY),
+    'sub_contractor': Related('sub_contractor', CONTRACTOR_SUMMARY),
+    'accepted': 'accepted',
+    'rejected': 'rejected',
+    'is_request': 'is_request',
+}
+
+
+field_reader = Reader(Field, FIELD)
+contractor_reader = Reader(Contractor, CONTRACTOR)
+job_reader = Reader(Job, JOB)
+dashboard_job_reader = Reader(Job, dict(JOB, bid_count='bid_count'))
+archived_job_reader = Reader(ArchivedJob, JOB)
+bid_reader = Reader(Bid, BID)
+archived_bid_reader = Reader(ArchivedBid, BID)
@@ -0,0 +1,234 @@
+"""Rendered response cache for the read endpoints.
+
+Entries are keyed by endpoint, normalized query parameters and the current
+generation of every model the response is built from. Writes never touch
+cached entries; ``quickbidsapi.signals`` bumps the generation of the written
+model instead, so the next request computes a new key and old entries age
+out of the LRU.
+
+There are two tiers: a bounded in-process LRU, and an optional shared Django
+cache (``settings.RESPONSE_CACHE_SHARED_ALIAS``). When the shared tier is
+configured it also holds the generation counters, so every worker process
+sees a write. Without it, generations are per process and a write only
+invalidates the process that handled it, so in-process entries expire after
+``settings.RESPONSE_CACHE_LOCAL_TIMEOUT`` seconds: the longest another worker
+serves a response from before a write.
+
+Concurrent misses for the same key are coalesced: one thread runs the query
+and renders, the rest wait for its bytes (see ``quickbidsapi.singleflight``).
+A streamed list (see ``quickbidsapi.streaming``) is read into bytes and cached
+like any other response as long as it is at most
+``settings.RESPONSE_CACHE_MAX_BYTES``; a larger one is streamed uncached, with
+only the bytes read so far held in memory.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.response import Response
+from quickbidsapi.metrics import record_cache
+from quickbidsapi.singleflight import SingleFlight
+
+
+class LRUCache:
+    """Thread safe, size bounded mapping that evicts the least recently used
+    key, and drops keys older than the timeout they were set with
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires_at, value = self._data[key]
+            except KeyError:
+                return None
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, timeout=None):
+        expires_at = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+local_cache = LRUCache(settings.RESPONSE_CACHE_MAX_ENTRIES)
+in_flight = SingleFlight()
+_local_generations = {}
+_generation_lock = threading.Lock()
+
+
+def _shared_cache():
+    alias = settings.RESPONSE_CACHE_SHARED_ALIAS
+    return caches[alias] if alias else None
+
+
+def _generation_key(model):
+    return f'generation:{model._meta.label_lower}'
+
+
+def generations(models):
+    """Current generation of each model, in order"""
+    keys = [_generation_key(model) for model in models]
+    shared = _shared_cache()
+    if shared is not None:
+        found = shared.get_many(keys)
+        return [found.get(key, 0) for key in keys]
+    with _generation_lock:
+        return [_local_generations.get(key, 0) for key in keys]
+
+
+def _bump(models):
+    shared = _shared_cache()
+    for model in models:
+        key = _generation_key(model)
+        if shared is not None:
+            # A fresh key starts at 1; add() loses the race harmlessly
+            if not shared.add(key, 1, None):
+                try:
+                    shared.incr(key)
+                except ValueError:
+                    shared.add(key, 1, None)
+        else:
+            with _generation_lock:
+                _local_generations[key] = _local_generations.get(key, 0) + 1
+
+
+def bump(*models):
+    """Invalidates every cached response built from any of ``models``.
+
+    Bumps straight away, and again once the surrounding transaction commits,
+    so a response computed from uncommitted data between the two cannot stay
+    cached under the new generation.
+    """
+    _bump(models)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _bump(models))
+
+
+def cache_key(request, view_name, models, kwargs, vary):
+    params = sorted(
+        (key, sorted(values)) for key, values in request.query_params.lists())
+    raw = repr((view_name, sorted(kwargs.items()), params,
+                generations(models), vary))
+    return 'response:' + hashlib.sha256(raw.encode()).hexdigest()
+
+
+def get(key):
+    entry = local_cache.get(key)
+    if entry is None:
+        shared = _shared_cache()
+        if shared is not None:
+            entry = shared.get(key)
+            if entry is not None:
+                local_cache.set(key, entry, settings.RESPONSE_CACHE_LOCAL_TIMEOUT)
+    return entry
+
+
+def put(key, entry):
+    local_cache.set(key, entry, settings.RESPONSE_CACHE_LOCAL_TIMEOUT)
+    shared = _shared_cache()
+    if shared is not None:
+        shared.set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+
+
+def clear():
+    local_cache.clear()
+
+
+def _to_response(entry):
+    content_type, content = entry
+    return HttpResponse(content, status=status.HTTP_200_OK,
+                        content_type=content_type)
+
+
+def _read_stream(response, limit):
+    """The body of a StreamingHttpResponse, or None when it is longer than
+    ``limit`` bytes, in which case the response streams it as before
+    """
+    parts = []
+    size = 0
+    stream = iter(response.streaming_content)
+    for part in stream:
+        parts.append(part)
+        size += len(part)
+        if size > limit:
+            response.streaming_content = chain(parts, stream)
+            return None
+    return b''.join(parts)
+
+
+def cached_response(*models, vary_on=None):
+    """Caches the rendered JSON of a viewset method's 200 responses.
+
+    Args:
+        models: Every model whose rows end up in the response.
+        vary_on: Optional ``function(request)`` returning anything else the
+            response depends on, e.g. the user for ``?current``.
+    """
+    def decorator(view):
+        view_name = view.__qualname__
+
+        @wraps(view)
+        def wrapper(self, request, *args, **kwargs):
+            # The browsable API and other formats are rendered as usual
+            if request.accepted_renderer.format != 'json':
+                return view(self, request, *args, **kwargs)
+
+            vary = vary_on(request) if vary_on else None
+            key = cache_key(request, view_name, models, kwargs, vary)
+            entry = get(key)
+            record_cache('response', entry is not None)
+            if entry is not None:
+                return _to_response(entry)
+
+            def compute():
+                response = view(self, request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return None, response
+                if isinstance(response, StreamingHttpResponse):
+                    content = _read_stream(response, settings.RESPONSE_CACHE_MAX_BYTES)
+                    if content is None:
+                        return None, response
+                elif isinstance(response, Response):
+                    context = self.get_renderer_context()
+                    context['response'] = response
+                    content = request.accepted_renderer.render(
+                        response.data, request.accepted_media_type, context)
+                else:
+                    return None, response
+                entry = (request.accepted_renderer.media_type, content)
+                put(key, entry)
+                return entry, None
+
+            (entry, response), leader = in_flight.do(
+                key, compute, settings.RESPONSE_CACHE_WAIT_SECONDS)
+            if entry is not None:
+                return _to_response(entry)
+            if not leader:
+                # Responses that are not cached belong to the request that made them
+                return view(self, request, *args, **kwargs)
+            return response
+
+        return wrapper
+    return decorator
@@ -0,0 +1,272 @@
+"""Bulk onboarding of contractor rosters, behind ``manage.py import_roster``
+and ``POST /contractors/import``.
+
+A roster is a CSV file with a header row, or a JSON list of objects, holding
+the fields ``/register`` takes for each contractor. Every row is checked
+before anything is written: rows missing a field, or whose username or email
+is taken in the database or by an earlier row, are reported and left out.
+
+Hashing passwords dominates an import, PBKDF2 being slow on purpose, so
+imports hash the rows across a pool of ``settings.ROSTER_HASH_WORKERS``
+processes. The endpoint never imports in the request: it saves the roster as
+a RosterUpload and the ``import_roster_upload`` task imports it on a worker.
+The pool's processes are spawned rather than forked, since a fork of the
+threaded task worker or of a command could copy a lock some other thread
+holds.
+Each batch of ``settings.ROSTER_BATCH_SIZE`` rows is then written with
+``bulk_create`` (users, contractors and their DRF tokens) in one transaction.
+
+An interrupted import is resumed by running the same roster again with
+``resume``: rows whose username already exists with the same email are taken
+to have been imported by the earlier run and skipped instead of reported.
+"""
+import csv
+import io
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import repeat
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.contrib.auth.models import User
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Lower
+from rest_framework.authtoken.models import Token
+from quickbidsapi import response_cache
+from quickbidsapi.changelog import log_rows
+from quickbidsapi.models import Contractor
+from quickbidsapi.search import contractor_index
+
+USER_FIELDS = ('username', 'email', 'password', 'first_name', 'last_name')
+CONTRACTOR_FIELDS = ('company_name', 'phone_number', 'primary_contractor')
+FIELDS = USER_FIELDS + CONTRACTOR_FIELDS
+
+# A batch that collides with a user created since it was checked is checked
+# and written again this many times
+INSERT_ATTEMPTS = 3
+
+
+class RosterError(Exception):
+    """A roster that cannot be read at all"""
+
+
+def parse_roster(content, name=''):
+    """Row dicts of a roster: JSON when ``name`` ends in .json or the content
+    is a list, CSV with a header row otherwise
+
+    Raises:
+        RosterError: if the roster is not valid CSV or JSON
+    """
+    if isinstance(content, bytes):
+        try:
+            content = content.decode('utf-8-sig')
+        except UnicodeDecodeError as error:
+            raise RosterError('The roster must be UTF-8 text') from error
+
+    if name.lower().endswith('.json') or content.lstrip().startswith('['):
+        try:
+            rows = json.loads(content)
+        except ValueError as error:
+            raise RosterError('The roster is not valid JSON') from error
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise RosterError('A JSON roster must be a list of objects')
+        return rows
+
+    try:
+        return list(csv.DictReader(io.StringIO(content)))
+    except csv.Error as error:
+        raise RosterError(f'The roster is not valid CSV: {error}') from error
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('true', 'yes', '1'):
+        return True
+    if text in ('false', 'no', '0'):
+        return False
+    raise ValueError(value)
+
+
+def _clean(row):
+    """The values of one roster row
+
+    Raises:
+        ValueError: with the message to report if the row is incomplete or invalid
+    """
+    values = {}
+    for name in FIELDS:
+        value = row.get(name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value is None or value == '':
+            raise ValueError(f'Missing {name}')
+        values[name] = value
+
+    try:
+        values['primary_contractor'] = _boolean(values['primary_contractor'])
+    except ValueError as error:
+        raise ValueError('primary_contractor must be true or false') from error
+    for name in FIELDS[:-1]:
+        values[name] = str(values[name])
+        model = User if name in USER_FIELDS else Contractor
+        max_length = model._meta.get_field(name).max_length
+        if name != 'password' and len(values[name]) > max_length:
+            raise ValueError(f'{name} is longer than {max_length} characters')
+    return values
+
+
+class RosterImport:
+    """Results of one import, filled in batch by batch"""
+
+    def __init__(self, resume=False):
+        self.resume = resume
+        self.created = []
+        self.skipped = []
+        self.errors = []
+        # Usernames and lowercased emails of the rows seen so far
+        self.usernames = set()
+        self.emails = set()
+
+    def as_dict(self):
+        return {'created': self.created, 'skipped': self.skipped, 'errors': self.errors}
+
+    def error(self, number, row, message):
+        self.errors.append({'row': number, 'username': row.get('username'), 'error': message})
+
+    def check(self, numbered_rows):
+        """``[(row number, values)]`` of the rows to write, reporting the rest"""
+        valid = []
+        for number, row in numbered_rows:
+            try:
+                values = _clean(row)
+            except ValueError as error:
+                self.error(number, row, str(error))
+                continue
+            if values['username'] in self.usernames:
+                self.error(number, row, 'Duplicate username in roster')
+            elif values['email'].lower() in self.emails:
+                self.error(number, row, 'Duplicate email in roster')
+            else:
+                valid.append((number, values))
+            self.usernames.add(values['username'])
+            self.emails.add(values['email'].lower())
+        return self.check_existing(valid)
+
+    def check_existing(self, valid):
+        if not valid:
+            return []
+        taken_usernames = dict(User.objects.filter(
+            username__in=[values['username'] for _, values in valid],
+        ).values_list('username', 'email'))
+        taken_emails = set(User.objects.annotate(lower_email=Lower('email')).filter(
+            lower_email__in=[values['email'].lower() for _, values in valid],
+        ).values_list('lower_email', flat=True))
+
+        remaining = []
+        for number, values in valid:
+            username, email = values['username'], values['email']
+            if username in taken_usernames:
+                if self.resume and taken_usernames[username].lower() == email.lower():
+                    self.skipped.append({'row': number, 'username': username})
+                else:
+                    self.error(number, values, 'An account with that username already exists')
+            elif email.lower() in taken_emails:
+                self.error(number, values, 'An account with that email address already exists')
+            else:
+                remaining.append((number, values))
+        return remaining
+
+
+def _encode(hasher, password, salt):
+    return hasher.encode(password, salt)
+
+
+def hash_passwords(passwords, pool=None, workers=1):
+    """Encoded ``passwords`` for the default hasher, on ``pool`` of ``workers``
+    processes when given
+    """
+    hasher = get_hasher()
+    salts = [hasher.salt() for _ in passwords]
+    if pool is None or len(passwords) < 2:
+        return [hasher.encode(password, salt) for password, salt in zip(passwords, salts)]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    return list(pool.map(_encode, repeat(hasher), passwords, salts, chunksize=chunksize))
+
+
+def _insert(rows):
+    with transaction.atomic():
+        users = User.objects.bulk_create([
+            User(username=values['username'], email=values['email'], password=password,
+                 first_name=values['first_name'], last_name=values['last_name'])
+            for _, values, password in rows
+        ])
+        contractors = Contractor.objects.bulk_create([
+            Contractor(user=user, company_name=values['company_name'],
+                       phone_number=values['phone_number'],
+                       primary_contractor=values['primary_contractor'])
+            for (_, values, _), user in zip(rows, users)
+        ])
+        Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in users])
+        # bulk_create skips save() and the post_save receivers
+        log_rows(contractors)
+    return contractors
+
+
+def _import_batch(result, numbered_rows, pool, workers):
+    checked = result.check(numbered_rows)
+    hashed = hash_passwords([values['password'] for _, values in checked], pool, workers)
+    rows = [(number, values, password) for (number, values), password in zip(checked, hashed)]
+
+    for attempt in range(INSERT_ATTEMPTS):
+        try:
+            contractors = _insert(rows) if rows else []
+            break
+        except IntegrityError:
+            if attempt == INSERT_ATTEMPTS - 1:
+                raise
+            # Another writer took a username since the batch was checked
+            kept = {number for number, _ in result.check_existing(
+                [(number, values) for number, values, _ in rows])}
+            rows = [row for row in rows if row[0] in kept]
+
+    result.created += [
+        {'row': number, 'username': values['username'], 'contractor': contractor.pk}
+        for (number, values, _), contractor in zip(rows, contractors)
+    ]
+
+
+def import_roster(rows, resume=False, batch_size=None, progress=None, workers=1):
+    """Creates a contractor, user and token for every valid roster row
+
+    Args:
+        rows (list): Row dicts as returned by ``parse_roster``.
+        resume (bool): Skip rows an earlier run of the same roster imported.
+        progress (callable): Called with the RosterImport after every batch.
+        workers (int): Processes to hash passwords on.
+
+    Returns:
+        RosterImport: the created, skipped and refused rows, numbered from 1
+    """
+    batch_size = batch_size or settings.ROSTER_BATCH_SIZE
+    result = RosterImport(resume)
+    numbered = list(enumerate(rows, 1))
+
+    # A pool is only worth starting for more than one password
+    workers = min(workers, len(rows))
+    executor = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+        initializer=django.setup) if workers > 1 else nullcontext()
+    with executor as pool:
+        for start in range(0, len(numbered), batch_size):
+            _import_batch(result, numbered[start:start + batch_size], pool, workers)
+            if progress is not None:
+                progress(result)
+
+    if result.created:
+        response_cache.bump(Contractor)
+        contractor_index.invalidate()
+    return result
@@ -0,0 +1,40 @@
+"""Database routing for bids sharded by job; see ``quickbidsapi.sharding``"""
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from quickbidsapi.models import Bid, Job
+
+
+class BidShardRouter:
+    """Sends a bid to its job's shard and everything else to the default database.
+
+    Only queries that carry the bid or job as a hint can be routed; queries
+    spanning jobs go through the helpers in ``quickbidsapi.sharding``.
+    """
+
+    def _route(self, model, instance=None, **hints):
+        if model is not Bid:
+            # Otherwise a sharded bid's job would be read from the bid's database
+            return DEFAULT_DB_ALIAS
+        if not settings.BID_SHARDS:
+            return None
+        # Imported here since sharding imports the readers, which import the models
+        from quickbidsapi.sharding import shard_for  # pylint: disable=import-outside-toplevel
+        if isinstance(instance, Bid) and instance.job_id is not None:
+            return shard_for(instance.job_id)
+        if isinstance(instance, Job) and instance.pk is not None:
+            return shard_for(instance.pk)
+        return None
+
+    db_for_read = _route
+    db_for_write = _route
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # A bid may point across databases at its job and contractors
+        if isinstance(obj1, Bid) or isinstance(obj2, Bid):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.BID_SHARD_DATABASES:
+            return app_label == 'quickbidsapi' and model_name == 'bid'
+        return None
@@ -0,0 +1,266 @@
+"""In-memory typeahead index over contractor company and user names.
+
+Every contractor is broken into normalized terms (the words of the company
+name and the user's first and last name). Terms are kept in one sorted list,
+so a prefix lookup is two bisects and a slice, and each term's trigrams are
+kept in an inverted index for fuzzy matches when the prefix lookup comes up
+short.
+
+The index is built from the database on first use and then kept current by
+the Contractor and User receivers in ``quickbidsapi.signals``. Writes made by
+other processes are picked up by a full rebuild once the index is older than
+``settings.SEARCH_INDEX_MAX_AGE``. The search that finds it stale rebuilds
+it without holding the index's lock, and every other search keeps using the
+old contents until the new ones are swapped in.
+"""
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import Counter
+from django.conf import settings
+from quickbidsapi.models import Contractor
+
+_WORD = re.compile(r'\w+')
+_MAX_TERM = '\U0010ffff'
+
+
+def normalize(text):
+    return _WORD.findall((text or '').casefold())
+
+
+def trigrams(term):
+    padded = f'  {term} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class IndexContents:
+    """The documents, sorted terms and trigram postings of one build"""
+
+    def __init__(self, rows=()):
+        self.docs = {}
+        self.terms = {}
+        self.trigrams = {}
+        entries = []
+        for row in rows:
+            entries.extend(self.add(*row))
+        self.sorted_terms = sorted(entries)
+
+    def add(self, pk, company_name, first_name, last_name, primary_contractor):
+        self.docs[pk] = {
+            'id': pk,
+            'company_name': company_name,
+            'full_name': f'{first_name} {last_name}',
+            'primary_contractor': primary_contractor,
+        }
+        terms = tuple(dict.fromkeys(
+            normalize(company_name) + normalize(first_name) + normalize(last_name)))
+        self.terms[pk] = terms
+        for term in terms:
+            for trigram in trigrams(term):
+                self.trigrams.setdefault(trigram, set()).add(pk)
+        return [(term, pk) for term in terms]
+
+    def put(self, pk, row):
+        """Replaces one contractor's entries, or drops them when ``row`` is None"""
+        self.remove(pk)
+        if row is not None:
+            for entry in self.add(*row):
+                insort(self.sorted_terms, entry)
+
+    def remove(self, pk):
+        self.docs.pop(pk, None)
+        for term in self.terms.pop(pk, ()):
+            index = bisect_left(self.sorted_terms, (term, pk))
+            if index < len(self.sorted_terms) and self.sorted_terms[index] == (term, pk):
+                del self.sorted_terms[index]
+            for trigram in trigrams(term):
+                postings = self.trigrams.get(trigram)
+                if postings is not None:
+                    postings.discard(pk)
+                    if not postings:
+                        del self.trigrams[trigram]
+
+
+class ContractorIndex:
+    """Searches one IndexContents at a time. A rebuild reads the database and
+    fills a new IndexContents without the lock, while searches keep using the
+    current one, and swaps it in with the writes made in the meantime applied.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._built = threading.Condition(self._lock)
+        self._contents = None
+        # Rows written while a build runs, by id, None for a removed contractor
+        self._pending = None
+        self._refreshing = False
+        self._stale = False
+        self.built_at = None
+
+    @property
+    def active(self):
+        """Whether writes have to be applied to the index"""
+        return self._contents is not None or self._pending is not None
+
+    def build(self, rows):
+        """Replaces the index contents.
+
+        Args:
+            rows: ``(id, company_name, first_name, last_name, primary_contractor)`` tuples
+        """
+        with self._lock:
+            self._pending = {}
+        try:
+            contents = IndexContents(rows)
+        except BaseException:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for pk, row in self._pending.items():
+                contents.put(pk, row)
+            self._contents = contents
+            self._pending = None
+            self._stale = False
+            self.built_at = time.monotonic()
+
+    def needs_refresh(self, max_age):
+        return self._contents is None or self._stale \
+            or time.monotonic() - self.built_at > max_age
+
+    def refresh(self, load_rows, max_age):
+        """Rebuilds from ``load_rows()`` when the index is missing, invalidated or
+        older than ``max_age`` seconds. Only one thread rebuilds at a time;
+        the others keep searching the current contents, or wait for the
+        first build when there are none yet.
+        """
+        with self._lock:
+            if not self.needs_refresh(max_age) or self._refreshing:
+                while self._contents is None and self._refreshing:
+                    self._built.wait()
+                return
+            self._refreshing = True
+        try:
+            self.build(load_rows())
+        finally:
+            with self._lock:
+                self._refreshing = False
+                self._built.notify_all()
+
+    def invalidate(self):
+        """Forces a rebuild from the database on the next search"""
+        with self._lock:
+            self._stale = True
+
+    def update(self, pk, company_name, first_name, last_name, primary_contractor):
+        self._put(pk, (pk, company_name, first_name, last_name, primary_contractor))
+
+    def remove(self, pk):
+        self._put(pk, None)
+
+    def _put(self, pk, row):
+        with self._lock:
+            if self._pending is not None:
+                self._pending[pk] = row
+            if self._contents is not None:
+                self._contents.put(pk, row)
+
+    @staticmethod
+    def _prefix_range(contents, token):
+        start = bisect_left(contents.sorted_terms, (token,))
+        end = bisect_left(contents.sorted_terms, (token + _MAX_TERM,), start)
+        return start, end
+
+    def search(self, query, limit=10, primary_contractor=None):
+        """Contractors whose terms start with every word of ``query``,
+        topped up with fuzzy trigram matches on the last word.
+        """
+        tokens = normalize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            contents = self._contents
+            if contents is None:
+                return []
+
+            def wanted(pk):
+                return primary_contractor is None \
+                    or contents.docs[pk]['primary_contractor'] == primary_contractor
+
+            ranges = [self._prefix_range(contents, token) for token in tokens]
+            # Walk the narrowest range and check the other words per contractor
+            start, end = min(ranges, key=lambda bounds: bounds[1] - bounds[0])
+            results = {}
+            for _, pk in contents.sorted_terms[start:end]:
+                if pk in results or not wanted(pk):
+                    continue
+                terms = contents.terms[pk]
+                if all(any(term.startswith(token) for term in terms) for token in tokens):
+                    results[pk] = contents.docs[pk]
+                    if len(results) == limit:
+                        return list(results.values())
+
+            if len(tokens[-1]) >= 3:
+                for pk in self._fuzzy(contents, tokens[-1], limit * 4):
+                    if pk not in results and wanted(pk):
+                        results[pk] = contents.docs[pk]
+                        if len(results) == limit:
+                            break
+
+            return list(results.values())
+
+    @staticmethod
+    def _fuzzy(contents, token, limit):
+        """Ids sharing at least half of ``token``'s trigrams, best first"""
+        query = sorted((contents.trigrams.get(trigram, ()) for trigram in trigrams(token)), key=len)
+        needed = (len(query) + 1) // 2
+        # A match shares at least one of the rarest len - needed + 1 trigrams,
+        # so only those postings are expanded; the common ones are probed
+        seeds = len(query) - needed + 1
+        counts = Counter()
+        for postings in query[:seeds]:
+            counts.update(postings)
+        for postings in query[seeds:]:
+            for pk in counts:
+                if pk in postings:
+                    counts[pk] += 1
+        return [pk for pk, count in counts.most_common(limit) if count >= needed]
+
+
+contractor_index = ContractorIndex()
+
+
+def contractor_rows(queryset):
+    return queryset.values_list(
+        'id', 'company_name', 'user__first_name', 'user__last_name', 'primary_contractor')
+
+
+def get_contractor_index():
+    """The shared index, built or rebuilt from the database when needed"""
+    index = contractor_index
+    if index.needs_refresh(settings.SEARCH_INDEX_MAX_AGE):
+        index.refresh(lambda: contractor_rows(Contractor.objects.all()),
+                      settings.SEARCH_INDEX_MAX_AGE)
+    return index
+
+
+def index_contractor(contractor_id):
+    """Reindexes one contractor after a write, dropping it if it is gone"""
+    if not contractor_index.active:
+        return
+    row = contractor_rows(Contractor.objects.filter(pk=contractor_id)).first()
+    if row is None:
+        contractor_index.remove(contractor_id)
+    else:
+        contractor_index.update(*row)
+
+
+def index_user(user_id):
+    """Reindexes the contractor belonging to a user whose name changed"""
+    if not contractor_index.active:
+        return
+    for contractor_id in Contractor.objects.filter(
+            user_id=user_id).values_list('pk', flat=True):
+        index_contractor(contractor_id)
@@ -0,0 +1,254 @@
+"""Hash partitioning of bids by job across the ``settings.BID_SHARDS`` databases.
+
+Every bid of a job lives on ``shard_for(job_id)``, so anything scoped to one
+job reads and writes a single database, routed by
+``quickbidsapi.routers.BidShardRouter``. Queries spanning jobs, such as a
+contractor's bids, run on every shard and are merged in id order.
+
+A shard holds only the bid table, so the jobs and contractors a bid points at
+are read from the default database afterwards by ``ShardedBidReader``, which
+also drops the bids the default manager would hide. Bid ids come from an
+IdSequence row in the default database so they stay unique across shards.
+
+With ``BID_SHARDS`` empty the default database is the only shard and reads go
+through ``Bid.objects`` and ``bid_reader`` as before.
+"""
+import heapq
+import zlib
+from collections import defaultdict
+from operator import itemgetter
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, F, Max
+from quickbidsapi.models import ArchivedBid, Bid, Contractor, IdSequence, Job
+from quickbidsapi.readers import CONTRACTOR_SUMMARY, JOB_SUMMARY, Reader, bid_reader
+
+
+def is_sharded():
+    return bool(settings.BID_SHARDS)
+
+
+def bid_shards():
+    """Aliases of the databases holding bids"""
+    return settings.BID_SHARDS or [DEFAULT_DB_ALIAS]
+
+
+def shard_for(job_id, shards=None):
+    """The alias holding the bids of ``job_id`` under ``shards``, the current
+    layout by default
+    """
+    shards = shards or bid_shards()
+    if len(shards) == 1:
+        return shards[0]
+    # crc32 rather than hash(), which is salted per process for strings
+    return shards[zlib.crc32(str(int(job_id)).encode()) % len(shards)]
+
+
+def bids_on_job(job_id):
+    """Every bid of a job, deleted or not, from its shard"""
+    return Bid._base_manager.using(shard_for(job_id)).filter(job_id=job_id)
+
+
+def bids_on_jobs(job_ids):
+    """Querysets of every bid on ``job_ids``, one per shard holding any of them"""
+    by_shard = defaultdict(list)
+    for job_id in job_ids:
+        by_shard[shard_for(job_id)].append(job_id)
+    return [Bid._base_manager.using(alias).filter(job_id__in=ids)
+            for alias, ids in by_shard.items()]
+
+
+def bid_counts(job_ids):
+    """Number of bids, deleted or not, on each of ``job_ids`` across the shards"""
+    counts = dict.fromkeys(job_ids, 0)
+    for bids in bids_on_jobs(job_ids):
+        counts.update(bids.values_list('job_id').annotate(count=Count('pk')).order_by())
+    return counts
+
+
+def visible_bids(*fields, **filters):
+    """``fields`` of the bids matching ``filters`` on every shard, without the
+    ones the default manager would hide, read without joins
+    """
+    columns = ['job_id', 'primary_contractor_id', 'sub_contractor_id', *fields]
+    rows = [row for alias in bid_shards()
+            for row in Bid._base_manager.using(alias).filter(**filters).values_list(*columns)]
+    if not rows:
+        return []
+    jobs = set(Job.objects.filter(pk__in={row[0] for row in rows}).values_list('pk', flat=True))
+    contractors = set(Contractor.objects.filter(
+        pk__in={pk for row in rows for pk in row[1:3]}).values_list('pk', flat=True))
+    return [row[3:] for row in rows
+            if row[0] in jobs and row[1] in contractors and row[2] in contractors]
+
+
+def delete_bids(*args, **kwargs):
+    """Deletes matching bids on every shard; used where a cascade from the
+    default database cannot reach them
+    """
+    for alias in settings.BID_SHARDS:
+        Bid._base_manager.using(alias).filter(*args, **kwargs).delete()
+
+
+class ShardedQuerySet:
+    """The same bid query on several shards, read by ``ShardedBidReader``"""
+
+    def __init__(self, querysets):
+        self.querysets = querysets
+
+    def filter(self, *args, **kwargs):
+        return ShardedQuerySet([queryset.filter(*args, **kwargs) for queryset in self.querysets])
+
+    def exclude(self, *args, **kwargs):
+        return ShardedQuerySet([queryset.exclude(*args, **kwargs) for queryset in self.querysets])
+
+
+class MergedRows:
+    """Row tuples of every shard merged in id order"""
+
+    def __init__(self, querysets):
+        self.querysets = querysets
+
+    def iterator(self, chunk_size=None):
+        return heapq.merge(*(queryset.order_by('pk').iterator(chunk_size=chunk_size)
+                             for queryset in self.querysets), key=itemgetter(0))
+
+    def __iter__(self):
+        return self.iterator()
+
+
+class ShardedBidReader:
+    """Reads the same output as ``bid_reader`` from bid rows without joins"""
+
+    columns = ['id', 'rate', 'job', 'primary_contractor', 'sub_contractor',
+               'accepted', 'rejected', 'is_request']
+
+    def __init__(self):
+        self.job_reader = Reader(Job, JOB_SUMMARY)
+        self.contractor_reader = Reader(Contractor, CONTRACTOR_SUMMARY)
+
+    def values(self, queryset):
+        return MergedRows([shard.values_list(*self.columns) for shard in queryset.querysets])
+
+    def build(self, rows):
+        """Output dicts for rows read with ``values``, without the bids whose
+        job or contractors are deleted
+        """
+        rows = list(rows)
+        if not rows:
+            return []
+        jobs = self.job_reader.in_bulk(Job.objects.all(), {row[2] for row in rows})
+        contractors = self.contractor_reader.in_bulk(
+            Contractor.objects.all(), {pk for row in rows for pk in row[3:5]})
+        return [
+            {
+                'id': pk,
+                'rate': None if rate is None else float(rate),
+                'job': jobs[job_id],
+                'primary_contractor': contractors[primary_id],
+                'sub_contractor': contractors[sub_id],
+                'accepted': accepted,
+                'rejected': rejected,
+                'is_request': is_request,
+            }
+            for pk, rate, job_id, primary_id, sub_id, accepted, rejected, is_request in rows
+            if job_id in jobs and primary_id in contractors and sub_id in contractors
+        ]
+
+    def read(self, queryset):
+        return self.build(self.values(queryset))
+
+    def get(self, queryset, **lookups):
+        results = self.read(queryset.filter(**lookups))
+        return results[0] if results else None
+
+    def in_bulk(self, queryset, ids):
+        return {data['id']: data for data in self.read(queryset.filter(pk__in=ids))}
+
+
+sharded_bid_reader = ShardedBidReader()
+
+
+def bid_source(job_id=None):
+    """``(queryset, reader)`` to read bids with: ``Bid.objects`` and
+    ``bid_reader``, or the shards that can hold the bids and a reader that
+    merges them. Passing ``job_id`` narrows the shards to that job's.
+    """
+    if not is_sharded():
+        return Bid.objects.all(), bid_reader
+    aliases = bid_shards() if job_id is None else [shard_for(job_id)]
+    return ShardedQuerySet([Bid._base_manager.using(alias).all() for alias in aliases]), \
+        sharded_bid_reader
+
+
+def get_bid(pk):
+    """The bid with primary key ``pk`` from whichever shard holds it
+
+    Raises:
+        Bid.DoesNotExist: if there is no such bid or the default manager hides it
+    """
+    if not is_sharded():
+        return Bid.objects.get(pk=pk)
+    for alias in bid_shards():
+        bid = Bid._base_manager.using(alias).filter(pk=pk).first()
+        if bid is None:
+            continue
+        contractor_ids = {bid.primary_contractor_id, bid.sub_contractor_id}
+        if Job.objects.filter(pk=bid.job_id).exists() and Contractor.objects.filter(
+                pk__in=contractor_ids).count() == len(contractor_ids):
+            return bid
+        break
+    raise Bid.DoesNotExist('Bid matching query does not exist.')
+
+
+def seed_bid_ids(aliases=()):
+    """Moves the central bid sequence past every id in use in the default
+    database, the current shards and ``aliases``, archived bids included
+    """
+    last = max([ArchivedBid.objects.aggregate(last=Max('id'))['last'] or 0] + [
+        Bid._base_manager.using(alias).aggregate(last=Max('id'))['last'] or 0
+        for alias in {DEFAULT_DB_ALIAS, *settings.BID_SHARDS, *aliases}])
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        sequence, created = IdSequence.objects.get_or_create(
+            name='bid', defaults={'last_id': last})
+        if not created:
+            IdSequence.objects.filter(pk=sequence.pk, last_id__lt=last).update(last_id=last)
+
+
+def next_bid_id():
+    """Takes the next id from the central bid sequence"""
+    with transaction.atomic(using=DEFAULT_DB_ALIAS):
+        if not IdSequence.objects.filter(name='bid').update(last_id=F('last_id') + 1):
+            seed_bid_ids()
+            IdSequence.objects.filter(name='bid').update(last_id=F('last_id') + 1)
+        return IdSequence.objects.values_list('last_id', flat=True).get(name='bid')
+
+
+def reshard_batch(source, shards, after, batch_size):
+    """Moves the next ``batch_size`` bids after id ``after`` on ``source``
+    that belong elsewhere under the ``shards`` layout.
+
+    Rows are copied before they are deleted, so an interrupted run loses
+    nothing and a rerun skips the copies it already made.
+
+    Returns:
+        tuple: the last id looked at, or None when ``source`` is exhausted,
+        and the number of bids moved
+    """
+    bids = list(Bid._base_manager.using(source).filter(pk__gt=after).order_by('pk')[:batch_size])
+    if not bids:
+        return None, 0
+
+    moving = defaultdict(list)
+    for bid in bids:
+        target = shard_for(bid.job_id, shards)
+        if target != source:
+            moving[target].append(bid)
+    for target, target_bids in moving.items():
+        Bid._base_manager.db_manager(target).bulk_create(target_bids, ignore_conflicts=True)
+
+    moved = [bid.pk for target_bids in moving.values() for bid in target_bids]
+    # A move is not a delete: skip the post_delete receivers, which would
+    # tombstone the bid in the change log
+    Bid._base_manager.using(source).filter(pk__in=moved)._raw_delete(source)
+    return bids[-1].pk, len(moved)
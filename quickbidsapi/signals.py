@@ -0,0 +1,191 @@
+from functools import partial
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+from django.dispatch import receiver
+from quickbidsapi import response_cache
+from quickbidsapi.activity import record_bid_activity
+from quickbidsapi.analytics import forget_job, rate_store, record_bid
+from quickbidsapi.audit import audit_log
+from quickbidsapi.changelog import log_delete
+from quickbidsapi.dashboard import (
+    invalidate_contractor_dashboards, invalidate_dashboards, invalidate_job_dashboards,
+    invalidate_user_dashboards)
+from quickbidsapi.models import Bid, Change, Contractor, Field, Job, JobField
+from quickbidsapi.models.change_logged import log_change
+from quickbidsapi.search import index_contractor, index_user
+from quickbidsapi.sharding import delete_bids, is_sharded, next_bid_id
+
+
+@receiver([post_save, post_delete], sender=Bid)
+def bid_changed(sender, instance, **kwargs):
+    invalidate_dashboards(instance.primary_contractor_id,
+                          instance.sub_contractor_id)
+
+
+@receiver([post_save, post_delete], sender=Job)
+def job_changed(sender, instance, **kwargs):
+    invalidate_dashboards(instance.contractor_id)
+    invalidate_job_dashboards(instance.pk)
+
+
+@receiver(m2m_changed, sender=Job.fields.through)
+def job_fields_changed(sender, instance, **kwargs):
+    if isinstance(instance, Job):
+        invalidate_dashboards(instance.contractor_id)
+
+
+@receiver([post_save, post_delete], sender=Contractor)
+def contractor_changed(sender, instance, **kwargs):
+    # Dashboards show the company name and user of everyone on their bids
+    invalidate_contractor_dashboards(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, **kwargs):
+    invalidate_user_dashboards(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Bid)
+@receiver([post_save, post_delete], sender=Job)
+@receiver([post_save, post_delete], sender=JobField)
+@receiver([post_save, post_delete], sender=Contractor)
+@receiver([post_save, post_delete], sender=Field)
+def bump_response_cache(sender, **kwargs):
+    response_cache.bump(sender)
+
+
+@receiver(m2m_changed, sender=Job.fields.through)
+def bump_job_fields(sender, action, **kwargs):
+    if action.startswith('post_'):
+        response_cache.bump(JobField)
+
+
+@receiver(post_save, sender=User)
+def bump_contractor_users(sender, **kwargs):
+    # Contractor responses include the user's name and email
+    response_cache.bump(Contractor)
+
+
+@receiver([post_save, post_delete], sender=Contractor)
+def reindex_contractor(sender, instance, **kwargs):
+    # The index is in memory, so a rolled back write must never reach it
+    transaction.on_commit(partial(index_contractor, instance.pk))
+
+
+@receiver(post_save, sender=User)
+def reindex_user(sender, instance, **kwargs):
+    transaction.on_commit(partial(index_user, instance.pk))
+
+
+@receiver(post_save, sender=Bid)
+def record_bid_rate(sender, instance, **kwargs):
+    transaction.on_commit(partial(record_bid, instance))
+
+
+@receiver(post_delete, sender=Bid)
+def forget_bid_rate(sender, instance, **kwargs):
+    rate_store.remove_bid(instance.pk)
+
+
+@receiver(post_save, sender=Job)
+def forget_job_rates(sender, instance, created, **kwargs):
+    if not created:
+        forget_job(instance.pk)
+
+
+@receiver(m2m_changed, sender=Job.fields.through)
+def forget_job_field_rates(sender, instance, action, **kwargs):
+    if isinstance(instance, Job) and action.startswith('post_'):
+        forget_job(instance.pk)
+
+
+@receiver(post_save, sender=Contractor)
+def forget_contractor_rates(sender, instance, **kwargs):
+    # A deleted contractor's bids drop out of every trade's samples
+    if instance.deleted_at is not None:
+        rate_store.clear()
+
+
+@receiver(post_delete, sender=Bid)
+@receiver(post_delete, sender=Job)
+@receiver(post_delete, sender=JobField)
+@receiver(post_delete, sender=Contractor)
+def log_deleted(sender, instance, **kwargs):
+    # Sent inside the delete's transaction, so the tombstone commits with it
+    log_delete(instance)
+
+
+@receiver(post_save, sender=Bid)
+@receiver(post_save, sender=Job)
+@receiver(post_save, sender=JobField)
+@receiver(post_save, sender=Contractor)
+def log_loaded(sender, instance, raw, **kwargs):
+    # Fixtures are saved without calling save(); everything else logs itself
+    if raw:
+        log_change(instance.change_key(), instance.change_action())
+
+
+@receiver(m2m_changed, sender=Job.fields.through)
+def log_job_fields(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    job_ids = (pk_set or ()) if reverse else [instance.pk]
+    for job_id in job_ids:
+        log_change(('job', job_id, None, None), Change.UPSERT)
+
+
+@receiver(post_save, sender=User)
+def log_contractor_user(sender, instance, **kwargs):
+    for contractor in Contractor.objects.filter(user=instance):
+        log_change(contractor.change_key(), contractor.change_action())
+
+
+@receiver(post_save, sender=Bid)
+@receiver(post_save, sender=Job)
+def audit_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    # Diffed now, written only once the save commits
+    changes = instance.audit_changes()
+    instance.audit_loaded = instance.audit_values()
+    if sender is Bid:
+        # The rollups change in the save's own transaction
+        record_bid_activity(instance, created, changes)
+    if changes:
+        transaction.on_commit(partial(
+            audit_log.record, sender._meta.model_name, instance.pk, changes, created))
+
+
+@receiver(pre_save, sender=Bid)
+def assign_bid_shard(sender, instance, raw, using, **kwargs):
+    if raw or not is_sharded():
+        return
+    if instance.pk is None:
+        # Each shard would otherwise number its bids from 1
+        instance.pk = next_bid_id()
+    elif not instance._state.adding and instance._state.db != using:
+        # The bid moved to another job's shard: Django inserts it there
+        instance._moved_from = instance._state.db
+
+
+@receiver(post_save, sender=Bid)
+def remove_moved_bid(sender, instance, **kwargs):
+    moved_from = instance.__dict__.pop('_moved_from', None)
+    if moved_from is not None:
+        # Not a delete of the bid, so no post_delete receivers
+        Bid._base_manager.using(moved_from).filter(pk=instance.pk)._raw_delete(moved_from)
+
+
+@receiver(post_delete, sender=Job)
+def delete_job_bids(sender, instance, **kwargs):
+    # The cascade only reaches bids in the job's own database
+    if is_sharded():
+        delete_bids(job_id=instance.pk)
+
+
+@receiver(post_delete, sender=Contractor)
+def delete_contractor_bids(sender, instance, **kwargs):
+    if is_sharded():
+        delete_bids(Q(primary_contractor_id=instance.pk) | Q(sub_contractor_id=instance.pk))
@@ -0,0 +1,199 @@
+"""Stateless signed access tokens, sent as ``Authorization: Bearer <token>``.
+
+A signed token carries the id of the user who logged in, their contractor id
+and the staff and primary flags, signed with SECRET_KEY by
+``django.core.signing`` and expiring ``settings.SIGNED_TOKEN_MAX_AGE`` seconds
+after it was issued, so ``SignedTokenAuthentication`` verifies it without
+reading the database. DRF's Token keeps working alongside it while clients
+move over; ``/login`` and ``/register`` issue either kind by ``token_type``.
+
+A revoked token is recorded as a RevokedToken row until it would have expired
+anyway. Each process keeps the live rows in memory, token ids as 64 bit
+integers and a cut off per user, and reads the rows added since its last look
+at most every ``settings.SIGNED_TOKEN_REVOCATION_SYNC_SECONDS``: a revocation
+made by another process can take that long to apply here.
+"""
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core import signing
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from django.utils.functional import cached_property
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+from quickbidsapi.models import RevokedToken
+
+SALT = 'quickbidsapi.signed_tokens'
+
+# Values of the token_type parameter of /login and /register
+TOKEN = 'token'
+SIGNED = 'signed'
+TOKEN_TYPES = (TOKEN, SIGNED)
+
+
+class SignedToken:
+    """The verified claims of a signed token, set as ``request.auth``"""
+
+    def __init__(self, key, claims):
+        self.key = key
+        self.jti = claims['j']
+        self.user_id = claims['u']
+        self.contractor_id = claims['c']
+        self.staff = claims['s']
+        self.primary = claims['p']
+        self.issued_at = claims['i']
+        self.expires = claims['e']
+
+    @property
+    def expires_at(self):
+        return datetime.fromtimestamp(self.expires, dt_timezone.utc)
+
+    @cached_property
+    def user(self):
+        """The token's user built from its claims rather than read, with only
+        ``pk``, ``is_staff`` and ``is_active`` set
+        """
+        user = User(pk=self.user_id, is_staff=self.staff, is_active=True)
+        user._state.adding = False
+        user._state.db = DEFAULT_DB_ALIAS
+        return user
+
+
+def issue_token(user, contractor):
+    """A new signed token for ``user``, whose contractor is ``contractor``"""
+    issued_at = int(time.time())
+    claims = {
+        'j': secrets.token_hex(8),
+        'u': user.pk,
+        'c': contractor.pk,
+        's': user.is_staff,
+        'p': contractor.primary_contractor,
+        'i': issued_at,
+        'e': issued_at + settings.SIGNED_TOKEN_MAX_AGE,
+    }
+    return SignedToken(signing.Signer(salt=SALT).sign_object(claims, compress=True), claims)
+
+
+def read_token(key):
+    """The SignedToken ``key`` encodes
+
+    Raises:
+        AuthenticationFailed: if the token is forged, expired or revoked
+    """
+    try:
+        claims = signing.Signer(salt=SALT).unsign_object(key)
+    except signing.BadSignature as error:
+        raise exceptions.AuthenticationFailed('Invalid token.') from error
+    token = SignedToken(key, claims)
+    if token.expires <= time.time():
+        raise exceptions.AuthenticationFailed('Token has expired.')
+    if revocations.is_revoked(token):
+        raise exceptions.AuthenticationFailed('Token has been revoked.')
+    return token
+
+
+class Revocations:
+    """The RevokedToken rows that have not expired, as this process last read them"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        """Forgets every revocation; the next check reads them all again"""
+        with self.lock:
+            # int(jti, 16): expiry, and user id: (revoked up to, expiry)
+            self.jtis = {}
+            self.users = {}
+            self.last_id = 0
+            self.synced_at = None
+
+    def _add(self, jti, user_id, revoked_at, expires):
+        if jti:
+            self.jtis[int(jti, 16)] = expires
+            return
+        previous = self.users.get(user_id)
+        if previous is None or previous[0] < revoked_at:
+            self.users[user_id] = (revoked_at, expires)
+
+    def add(self, revoked):
+        with self.lock:
+            self._add(revoked.jti, revoked.user_id,
+                      revoked.revoked_at.timestamp(), revoked.expires_at.timestamp())
+
+    def sync(self):
+        """Reads the revocations added since the last sync and drops expired ones"""
+        now = time.time()
+        with self.lock:
+            rows = RevokedToken.objects.filter(
+                id__gt=self.last_id, expires_at__gt=timezone.now(),
+            ).order_by('id').values_list('id', 'jti', 'user_id', 'revoked_at', 'expires_at')
+            for pk, jti, user_id, revoked_at, expires_at in rows:
+                self._add(jti, user_id, revoked_at.timestamp(), expires_at.timestamp())
+                self.last_id = pk
+            self.jtis = {jti: expires for jti, expires in self.jtis.items() if expires > now}
+            self.users = {user_id: cut_off for user_id, cut_off in self.users.items()
+                          if cut_off[1] > now}
+            self.synced_at = time.monotonic()
+
+    def is_revoked(self, token):
+        if self.synced_at is None or time.monotonic() - self.synced_at \
+                >= settings.SIGNED_TOKEN_REVOCATION_SYNC_SECONDS:
+            self.sync()
+        if int(token.jti, 16) in self.jtis:
+            return True
+        cut_off = self.users.get(token.user_id)
+        # Issue times are whole seconds, so a token from the second of the
+        # revocation counts as revoked
+        return cut_off is not None and token.issued_at <= cut_off[0]
+
+
+revocations = Revocations()
+
+
+def _revoke(jti, user_id, expires_at):
+    now = timezone.now()
+    revoked = RevokedToken.objects.create(
+        jti=jti, user_id=user_id, revoked_at=now, expires_at=expires_at)
+    RevokedToken.objects.filter(expires_at__lte=now).delete()
+    # Applies in this process at once rather than at the next sync
+    transaction.on_commit(lambda: revocations.add(revoked))
+    return revoked
+
+
+def revoke_token(token):
+    """Stops a SignedToken from authenticating"""
+    return _revoke(token.jti, token.user_id, token.expires_at)
+
+
+def revoke_user_tokens(user_id):
+    """Stops every signed token issued to a user so far from authenticating"""
+    return _revoke('', user_id, timezone.now() + timedelta(seconds=settings.SIGNED_TOKEN_MAX_AGE))
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """Authenticates ``Authorization: Bearer <token>`` signed tokens without a
+    database read
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+        try:
+            key = auth[1].decode()
+        except UnicodeError as error:
+            raise exceptions.AuthenticationFailed('Invalid token header.') from error
+
+        token = read_token(key)
+        return token.user, token
+
+    def authenticate_header(self, request):
+        return self.keyword
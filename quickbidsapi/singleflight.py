@@ -0,0 +1,53 @@
+"""Collapses identical concurrent computations into one.
+
+The first thread to ask for a key (the leader) runs the computation; threads
+asking for the same key while it is in progress wait and receive the
+leader's result, or its exception, instead of repeating the work.
+"""
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, timeout=None):
+        """Runs ``func()`` unless a call for ``key`` is already in flight.
+
+        Returns:
+            tuple: ``(result, leader)`` where ``leader`` tells the caller
+            whether the result came from its own call of ``func``. A waiter
+            that times out runs ``func`` itself and counts as a leader.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.done.wait(timeout):
+                return func(), True
+            if call.error is not None:
+                raise call.error
+            return call.result, False
+
+        try:
+            call.result = func()
+        except Exception as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, True
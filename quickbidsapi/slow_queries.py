@@ -0,0 +1,225 @@
+"""Always-on log of SQL statements slower than ``settings.SLOW_QUERY_THRESHOLD_MS``.
+
+``log_slow_queries`` is installed as an execute wrapper on every database
+connection as it is opened, so requests, tasks and commands are all covered.
+A query under the threshold costs two clock reads. A slow one is appended to
+``settings.SLOW_QUERY_LOG_PATH`` as a JSON line holding:
+
+- the view it ran for (``BidView.list``), set by ``QueryContextMiddleware``
+- the innermost project frame it was run from, and the project frames
+  leading to it, which tell a reader's lookups from the view's own queries
+- a fingerprint of the statement with its literals stripped, which groups
+  repeats of the same query, and one of its parameters, which tells the
+  same query with the same arguments apart; the parameters themselves are
+  not written, since they can hold password hashes and tokens
+- the database's plan for a SELECT (``EXPLAIN QUERY PLAN`` on SQLite), for
+  at most one entry per statement every
+  ``settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS``, since explaining is run
+  right after the slow query and plans rarely change
+
+``manage.py slow_queries`` summarizes the log by fingerprint.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+# Frames in these files are never the call site
+SKIPPED_FILES = (__file__, os.path.join('quickbidsapi', 'metrics.py'))
+MAX_SQL_LENGTH = 4000
+MAX_STACK_FRAMES = 6
+# Statements whose last explain time is remembered
+MAX_EXPLAINED = 10000
+
+_context = threading.local()
+_write_lock = threading.Lock()
+# Statement fingerprint: monotonic time it was last explained
+_explained = {}
+_explained_lock = threading.Lock()
+
+_LITERALS = [
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def normalize(sql):
+    """``sql`` with its literals and placeholders replaced, for grouping"""
+    for pattern, replacement in _LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def fingerprint(text):
+    return hashlib.sha1(text.encode()).hexdigest()[:12]
+
+
+def _project_frames():
+    """``path:line in function`` of the project frames calling in, innermost first"""
+    root = str(settings.BASE_DIR) + os.sep
+    frames = []
+    frame = sys._getframe(2)  # pylint: disable=protected-access
+    while frame is not None and len(frames) < MAX_STACK_FRAMES:
+        filename = frame.f_code.co_filename
+        if filename.startswith(root) and not filename.endswith(SKIPPED_FILES) \
+                and not any(f'{os.sep}{part}{os.sep}' in filename
+                            for part in ('tests', 'site-packages')):
+            frames.append(f'{filename[len(root):]}:{frame.f_lineno} in {frame.f_code.co_name}')
+        frame = frame.f_back
+    return frames
+
+
+def _plan(connection, sql, params):
+    if sql.lstrip()[:6].upper() != 'SELECT':
+        return None
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    _context.explaining = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+    except DatabaseError as error:
+        return [f'EXPLAIN failed: {error}']
+    finally:
+        _context.explaining = False
+
+
+def _should_explain(statement):
+    now = time.monotonic()
+    with _explained_lock:
+        last = _explained.get(statement)
+        if last is not None and now - last < settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+            return False
+        if len(_explained) >= MAX_EXPLAINED:
+            _explained.clear()
+        _explained[statement] = now
+        return True
+
+
+def write_entry(entry):
+    line = json.dumps(entry, cls=DjangoJSONEncoder) + '\n'
+    # One write on an O_APPEND descriptor, so lines of concurrent processes never interleave
+    with _write_lock:
+        descriptor = os.open(
+            settings.SLOW_QUERY_LOG_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(descriptor, line.encode())
+        finally:
+            os.close(descriptor)
+
+
+def log_slow_queries(execute, sql, params, many, context):
+    """Execute wrapper logging the statements over the threshold; failed
+    statements raise as usual and are not logged
+    """
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    threshold = settings.SLOW_QUERY_THRESHOLD_MS
+    if threshold is None or elapsed < threshold or getattr(_context, 'explaining', False):
+        return result
+    connection = context['connection']
+    frames = _project_frames()
+    text = normalize(sql)
+    statement = fingerprint(text)
+    explain = settings.SLOW_QUERY_EXPLAIN and not many and _should_explain(statement)
+    write_entry({
+        'time': timezone.now(),
+        'duration_ms': round(elapsed, 3),
+        'database': connection.alias,
+        'view': getattr(_context, 'view', None),
+        'call_site': frames[0] if frames else None,
+        'stack': frames,
+        'fingerprint': statement,
+        'params_fingerprint': None if many else fingerprint(repr(params)),
+        'sql': text[:MAX_SQL_LENGTH],
+        'plan': _plan(connection, sql, params) if explain else None,
+    })
+    return result
+
+
+def install(sender, connection, **kwargs):
+    """``connection_created`` receiver adding the wrapper to a new connection"""
+    if log_slow_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, log_slow_queries)
+
+
+def view_name(view_func, method):
+    """``BidView.list`` for a viewset action, the function name for other views"""
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return getattr(view_func, '__name__', repr(view_func))
+    action = getattr(view_func, 'actions', {}).get(method.lower())
+    return f'{cls.__name__}.{action}' if action else cls.__name__
+
+
+class QueryContextMiddleware:
+    """Names the view a request's queries run for in the slow query log"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            return self.get_response(request)
+        finally:
+            _context.view = None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        _context.view = view_name(view_func, request.method)
+
+
+def read_log(path=None):
+    """Every entry of the slow query log, skipping lines cut short by a crash"""
+    try:
+        with open(path or settings.SLOW_QUERY_LOG_PATH, encoding='utf-8') as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        return
+
+
+def summarize(entries, since=None):
+    """Entries grouped by fingerprint, the most total time first"""
+    groups = {}
+    for entry in entries:
+        if since is not None and parse_datetime(entry['time']) < since:
+            continue
+        group = groups.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'sql': entry['sql'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': {},
+            'call_sites': {},
+            'distinct_params': set(),
+            'slowest': entry,
+            'plan': None,
+        })
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        if entry['duration_ms'] >= group['max_ms']:
+            group['max_ms'] = entry['duration_ms']
+            group['slowest'] = entry
+        for key, value in (('views', entry['view']), ('call_sites', entry['call_site'])):
+            group[key][value] = group[key].get(value, 0) + 1
+        group['distinct_params'].add(entry['params_fingerprint'])
+        if entry.get('plan'):
+            group['plan'] = entry['plan']
+    return sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)
@@ -0,0 +1,74 @@
+"""Bounded memory rendering for list endpoints.
+
+Reading a whole list before rendering holds every row and every output dict
+at once before a byte is sent. Here the queryset is read with
+``iterator(chunk_size=...)`` and each chunk is built by its reader (see
+``quickbidsapi.readers``) and rendered on its own, so peak memory follows the
+chunk size rather than the number of rows. Results that fit in one chunk are returned
+as a normal ``Response``. ``quickbidsapi.response_cache`` reads a streamed
+result into bytes and caches it when it is small enough.
+"""
+from itertools import chain, islice
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+
+def iter_chunks(parts, chunk_size):
+    """Yields ``(reader, rows)`` chunks of at most ``chunk_size`` rows.
+
+    Args:
+        parts: ``(queryset, reader)`` pairs, read in order.
+    """
+    for queryset, reader in parts:
+        rows = reader.values(queryset).iterator(chunk_size=chunk_size)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield reader, chunk
+
+
+def stream_json(chunks):
+    """Renders chunks as one JSON array, byte for byte what JSONRenderer
+    would produce for the whole list
+    """
+    renderer = JSONRenderer()
+    yield b'['
+    first = True
+    for reader, chunk in chunks:
+        # Strip each chunk's brackets and join the bodies with commas
+        body = renderer.render(reader.build(chunk))[1:-1]
+        if not first:
+            yield b','
+        yield body
+        first = False
+    yield b']'
+
+
+def list_response(request, *parts):
+    """Serializes one or more querysets as a single list response.
+
+    Args:
+        request (Request): The DRF request; only JSON responses are streamed.
+        parts: ``(queryset, reader)`` pairs, concatenated in order.
+    """
+    chunk_size = settings.STREAM_CHUNK_SIZE
+    chunks = iter_chunks(parts, chunk_size)
+
+    if request.accepted_renderer.format == 'json':
+        buffered = []
+        for chunk in chunks:
+            buffered.append(chunk)
+            if sum(len(rows) for _, rows in buffered) >= chunk_size:
+                return StreamingHttpResponse(
+                    stream_json(chain(buffered, chunks)),
+                    content_type=request.accepted_renderer.media_type)
+        chunks = buffered
+
+    data = []
+    for reader, rows in chunks:
+        data += reader.build(rows)
+    return Response(data, status=status.HTTP_200_OK)
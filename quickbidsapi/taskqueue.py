@@ -0,0 +1,120 @@
+"""A small task queue backed by the Task table.
+
+Views enqueue work and return immediately; ``manage.py run_worker`` claims
+tasks in priority order and runs them on a thread pool. A claimed task holds
+a lease (``locked_until``); if the worker dies the lease runs out and the task
+is claimed again, so every task runs at least once and task functions must be
+safe to repeat. Failures are retried with exponential backoff until
+``max_attempts`` is reached.
+
+Task functions are registered with ``@task`` in ``quickbidsapi.tasks``::
+
+    @task
+    def warm_dashboard(contractor_id):
+        ...
+
+    warm_dashboard.enqueue(contractor_id=3, priority=5)
+"""
+import logging
+import traceback
+from datetime import timedelta
+from functools import partial
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+from quickbidsapi.models import Task
+from quickbidsapi.transactions import atomic_with_retry
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+def task(func):
+    """Registers ``func`` under its name and gives it an ``enqueue`` helper"""
+    registry[func.__name__] = func
+    func.enqueue = partial(enqueue, func.__name__)
+    return func
+
+
+def enqueue(name, priority=0, delay=None, max_attempts=None, **payload):
+    """Adds a task to the queue.
+
+    Args:
+        name (str): The registered task name.
+        priority (int): Higher priorities are claimed first.
+        delay (timedelta): Do not run the task before this much time has passed.
+        max_attempts (int): Give up after this many failed runs.
+        payload: JSON serializable keyword arguments for the task function.
+    """
+    if name not in registry:
+        raise KeyError(f'Unknown task {name}')
+    return Task.objects.create(
+        name=name,
+        payload=payload,
+        priority=priority,
+        run_after=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+    )
+
+
+def _claimable(now):
+    return Q(status=Task.PENDING, run_after__lte=now) \
+        | Q(status=Task.RUNNING, locked_until__lt=now)
+
+
+def claim():
+    """Leases the highest priority runnable task, or returns None.
+
+    Candidates are claimed with a conditional UPDATE, so when several
+    workers race for the same task only one of them gets it.
+    """
+    def claim_next():
+        now = timezone.now()
+        candidates = Task.objects.filter(_claimable(now)) \
+            .order_by('-priority', 'run_after', 'pk') \
+            .values_list('pk', flat=True)[:settings.TASK_CLAIM_CANDIDATES]
+        for pk in candidates:
+            claimed = Task.objects.filter(_claimable(now), pk=pk).update(
+                status=Task.RUNNING,
+                attempts=F('attempts') + 1,
+                locked_until=now + timedelta(seconds=settings.TASK_LEASE_SECONDS),
+            )
+            if claimed:
+                return Task.objects.get(pk=pk)
+        return None
+
+    return atomic_with_retry(claim_next)
+
+
+def run(claimed):
+    """Runs a claimed task and records the outcome"""
+    try:
+        registry[claimed.name](**claimed.payload)
+    except Exception:
+        logger.exception('Task %s (%s) failed', claimed.pk, claimed.name)
+        claimed.last_error = traceback.format_exc()
+        if claimed.attempts >= claimed.max_attempts:
+            claimed.status = Task.FAILED
+            claimed.finished_at = timezone.now()
+        else:
+            claimed.status = Task.PENDING
+            claimed.run_after = timezone.now() + timedelta(
+                seconds=settings.TASK_RETRY_DELAY_SECONDS * 2 ** (claimed.attempts - 1))
+    else:
+        claimed.status = Task.DONE
+        claimed.finished_at = timezone.now()
+
+    claimed.locked_until = None
+    atomic_with_retry(partial(claimed.save, update_fields=[
+        'status', 'last_error', 'run_after', 'locked_until', 'finished_at']))
+    return claimed
+
+
+def run_next():
+    """Claims and runs one task. Returns False when the queue is empty."""
+    claimed = claim()
+    if claimed is None:
+        return False
+    run(claimed)
+    return True
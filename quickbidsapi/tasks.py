@@ -0,0 +1,80 @@
+"""Deferred work run by `manage.py run_worker`; see quickbidsapi.taskqueue"""
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from quickbidsapi.changelog import compact
+from quickbidsapi.estimator import fit_rate_model
+from quickbidsapi.models import Purge, RosterUpload, Task
+from quickbidsapi.purge import purge_batch
+from quickbidsapi.roster import import_roster
+from quickbidsapi.taskqueue import task
+
+
+@task
+def purge_deleted(purge_id):
+    """Works through a few batches of a purge, then requeues the rest so no
+    single task outlives its lease
+    """
+    purge = Purge.objects.get(pk=purge_id)
+    if purge.status == Purge.DONE:
+        return
+
+    for _ in range(settings.PURGE_BATCHES_PER_TASK):
+        if not purge_batch(purge, settings.PURGE_BATCH_SIZE):
+            return
+    purge_deleted.enqueue(purge_id=purge_id)
+
+
+@task
+def refresh_rate_model():
+    """Refits the suggested rate table, then schedules the next refit unless
+    another one is already queued. The next refit is scheduled even when this
+    one fails, so running out of retries does not end the schedule.
+    """
+    try:
+        fit_rate_model()
+    finally:
+        if not Task.objects.filter(name='refresh_rate_model', status=Task.PENDING).exists():
+            refresh_rate_model.enqueue(
+                delay=timedelta(seconds=settings.RATE_MODEL_REFRESH_SECONDS))
+
+
+@task
+def compact_change_log():
+    """Compacts the sync change log, then schedules the next run unless
+    another one is already queued. The next run is scheduled even when this
+    one fails, so running out of retries does not end the schedule.
+    """
+    try:
+        compact()
+    finally:
+        if not Task.objects.filter(name='compact_change_log', status=Task.PENDING).exists():
+            compact_change_log.enqueue(
+                delay=timedelta(seconds=settings.SYNC_COMPACT_INTERVAL_SECONDS))
+
+
+@task
+def import_roster_upload(upload_id):
+    """Imports a roster posted to /contractors/import, saving the results
+    after every batch. A run after an interrupted one resumes it, so the rows
+    the interrupted run created are reported as skipped.
+    """
+    upload = RosterUpload.objects.get(pk=upload_id)
+    if upload.status == RosterUpload.DONE:
+        return
+    resume = upload.resume or upload.status == RosterUpload.RUNNING
+    upload.status = RosterUpload.RUNNING
+    upload.save(update_fields=['status'])
+
+    def progress(result):
+        upload.result = result.as_dict()
+        upload.save(update_fields=['result'])
+
+    result = import_roster(upload.rows, resume=resume, progress=progress,
+                           workers=settings.ROSTER_HASH_WORKERS)
+    # The rows hold plaintext passwords, kept no longer than needed
+    upload.rows = []
+    upload.result = result.as_dict()
+    upload.status = RosterUpload.DONE
+    upload.finished_at = timezone.now()
+    upload.save(update_fields=['rows', 'result', 'status', 'finished_at'])
@@ -0,0 +1,21 @@
+"""Transaction helpers"""
+import random
+import time
+from django.db import OperationalError, transaction
+
+
+def atomic_with_retry(func, attempts=8, delay=0.01, using=None):
+    """Runs ``func`` inside ``transaction.atomic(using=using)`` and returns its result.
+
+    SQLite reports lock contention between concurrent writers as an
+    OperationalError instead of waiting, so the whole transaction is retried
+    with jittered exponential backoff before giving up.
+    """
+    for attempt in range(attempts):
+        try:
+            with transaction.atomic(using=using):
+                return func()
+        except OperationalError as ex:
+            if 'locked' not in str(ex) or attempt == attempts - 1:
+                raise
+            time.sleep(delay * (2 ** attempt) * random.uniform(0.5, 1.5))
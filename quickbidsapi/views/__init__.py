@@ -2,4 +2,9 @@ from .contractor import ContractorView
 from .field import FieldView
 from .bid import BidView
 from .job import JobView
-from .auth import login_user, register_user
+from .analytics import AnalyticsView
+from .auth import login_user, logout_user, register_user
+from .sync import sync_changes
+from .batch import batch_requests
+from .metrics import metrics
+from .profiles import profiles, profile_file
@@ -0,0 +1,125 @@
+import math
+from datetime import datetime, time, timezone as dt_timezone
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.decorators import action
+from rest_framework.viewsets import ViewSet
+from rest_framework.response import Response
+from rest_framework import status
+from quickbidsapi.activity import BUCKETS, activity_series
+from quickbidsapi.analytics import rate_statistics
+from quickbidsapi.models import ActivityRollup
+
+
+class AnalyticsView(ViewSet):
+
+    @action(methods=['get'], detail=False)
+    def rates(self, request):
+        """
+        Summary:
+            Statistics of accepted bid rates, to judge what a fair rate is for a trade
+            and job size. Narrow with ?field= and ?min_sqft= / ?max_sqft=.
+
+        Args:
+            request (HttpRequest): The full HTTP request object.
+
+        Returns:
+            Response: The rate count, mean, spread and percentiles, a histogram of rates,
+            the same statistics of rate per square foot and HTTP status 200 OK,
+            or HTTP status 400 Bad Request if a parameter is not a number.
+        """
+        try:
+            field_id = _param(request, 'field', int)
+            min_sqft = _param(request, 'min_sqft', float)
+            max_sqft = _param(request, 'max_sqft', float)
+        except ValueError as ex:
+            return Response({'message': str(ex)}, status=status.HTTP_400_BAD_REQUEST)
+
+        data = rate_statistics(field_id, min_sqft, max_sqft)
+        return Response(data, status=status.HTTP_200_OK)
+
+    @action(methods=['get'], detail=False)
+    def activity(self, request):
+        """
+        Summary:
+            Bids made and accepted per hour or day, with their rate sums and averages,
+            read from the pre-aggregated rollups. Pass ?bucket=hour or ?bucket=day, narrow
+            to a trade with ?field= or to a primary contractor with ?contractor=, and pick
+            the range with ?since= and ?until= (ISO dates or datetimes, UTC).
+
+        Args:
+            request (HttpRequest): The full HTTP request object.
+
+        Returns:
+            Response: One entry per bucket in the range, empty buckets included, and HTTP
+            status 200 OK, or HTTP status 400 Bad Request for an unknown bucket, both
+            ?field= and ?contractor=, a malformed time or too many buckets.
+        """
+        bucket = request.query_params.get('bucket', ActivityRollup.DAY)
+        if bucket not in BUCKETS:
+            return Response({'message': 'bucket must be hour or day'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            field_id = _param(request, 'field', int)
+            contractor_id = _param(request, 'contractor', int)
+            until = _time_param(request, 'until') or timezone.now()
+            since = _time_param(request, 'since') \
+                or until - BUCKETS[bucket] * (settings.ACTIVITY_DEFAULT_BUCKETS - 1)
+        except ValueError as ex:
+            return Response({'message': str(ex)}, status=status.HTTP_400_BAD_REQUEST)
+        if field_id is not None and contractor_id is not None:
+            return Response({'message': 'Pass field or contractor, not both'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if since > until or (until - since) / BUCKETS[bucket] >= settings.ACTIVITY_MAX_BUCKETS:
+            return Response(
+                {'message': f'since must be before until and at most '
+                            f'{settings.ACTIVITY_MAX_BUCKETS} buckets apart'},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        if field_id is not None:
+            scope, scope_id = ActivityRollup.FIELD, field_id
+        elif contractor_id is not None:
+            scope, scope_id = ActivityRollup.CONTRACTOR, contractor_id
+        else:
+            scope, scope_id = ActivityRollup.ALL, 0
+
+        data = {
+            'bucket': bucket,
+            'field': field_id,
+            'contractor': contractor_id,
+            'series': activity_series(bucket, scope, scope_id, since, until),
+        }
+        return Response(data, status=status.HTTP_200_OK)
+
+
+def _param(request, name, convert):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        value = convert(value)
+    except ValueError as ex:
+        raise ValueError(f'{name} must be a number') from ex
+    if not math.isfinite(value):
+        raise ValueError(f'{name} must be a number')
+    return value
+
+
+def _time_param(request, name):
+    """An aware UTC datetime from an ISO date or datetime parameter"""
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            moment = day and datetime.combine(day, time.min)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValueError(f'{name} must be an ISO date or datetime')
+    if timezone.is_naive(moment):
+        return timezone.make_aware(moment, dt_timezone.utc)
+    return moment.astimezone(dt_timezone.utc)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from django.db import IntegrityError
@@ -7,6 +8,31 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from quickbidsapi.models import Contractor
+from quickbidsapi.idempotency import idempotent
+from quickbidsapi.signed_tokens import SIGNED, TOKEN, TOKEN_TYPES, SignedToken, issue_token, \
+    revoke_token
+
+
+def _token_type(request):
+    '''The kind of token to respond with, or None if the request asks for an unknown one'''
+    token_type = request.data.get('token_type', settings.DEFAULT_TOKEN_TYPE)
+    return token_type if token_type in TOKEN_TYPES else None
+
+
+def _token_data(token_type, user, contractor, token=None):
+    '''The token fields of a login or register response
+
+    Method arguments:
+      token -- The user's DRF token, read when None and needed
+    '''
+    if token_type == SIGNED:
+        signed = issue_token(user, contractor)
+        return {'token': signed.key, 'token_type': SIGNED, 'expires_at': signed.expires_at}
+    token = token or Token.objects.get(user=user)
+    return {'token': token.key, 'token_type': TOKEN}
+
+
+INVALID_TOKEN_TYPE = {'message': f'token_type must be one of {", ".join(TOKEN_TYPES)}'}
 
 
 @api_view(['POST'])
@@ -19,6 +45,9 @@ def login_user(request):
     '''
     username = request.data['username']
     password = request.data['password']
+    token_type = _token_type(request)
+    if token_type is None:
+        return Response(INVALID_TOKEN_TYPE, status=status.HTTP_400_BAD_REQUEST)
 
     # Use the built-in authenticate method to verify
     # authenticate returns the user object or None if no user is found
@@ -26,12 +55,11 @@ def login_user(request):
 
     # If authentication was successful, respond with their token
     if authenticated_user is not None and authenticated_user.is_active:
-        token = Token.objects.get(user=authenticated_user)
         contractor = Contractor.objects.get(user=authenticated_user)
 
         data = {
             'valid': True,
-            'token': token.key,
+            **_token_data(token_type, authenticated_user, contractor),
             'staff': authenticated_user.is_staff,
             'primary': contractor.primary_contractor
         }
@@ -44,6 +72,7 @@ def login_user(request):
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@idempotent
 def register_user(request):
     '''Handles the creation of a new user for authentication
 
@@ -59,6 +88,9 @@ def register_user(request):
     company_name = request.data.get('company_name', None)
     phone_number = request.data.get('phone_number', None)
     primary_contractor = request.data.get('primary_contractor', None)
+    token_type = _token_type(request)
+    if token_type is None:
+        return Response(INVALID_TOKEN_TYPE, status=status.HTTP_400_BAD_REQUEST)
 
     if account_type is not None \
             and email is not None\
@@ -96,10 +128,28 @@ def register_user(request):
                 primary_contractor=request.data['primary_contractor']
             )
 
-        # Use the REST Framework's token generator on the new user account
+        # Use the REST Framework's token generator on the new user account,
+        # so later logins can ask for either kind of token
         token = Token.objects.create(user=account.user)
         # Return the token to the client
-        data = {'token': token.key, 'staff': new_user.is_staff, 'primary': account.primary_contractor, 'valid': True}
+        data = {**_token_data(token_type, new_user, account, token), 'staff': new_user.is_staff, 'primary': account.primary_contractor, 'valid': True}
         return Response(data)
 
     return Response({'message': 'You must provide email, password, first_name, last_name, and username'}, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+def logout_user(request):
+    '''Revokes the signed token the request was made with
+
+    Method arguments:
+      request -- The full HTTP request object
+    '''
+    if not isinstance(request.auth, SignedToken):
+        return Response(
+            {'message': 'Only signed tokens can be revoked'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    revoke_token(request.auth)
+    return Response(None, status=status.HTTP_204_NO_CONTENT)
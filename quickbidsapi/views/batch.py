@@ -0,0 +1,37 @@
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from quickbidsapi.batch import BatchError, BatchFailed, parse_batch, run_batch
+
+
+@api_view(['POST'])
+def batch_requests(request):
+    '''Runs a list of API requests and returns every result in one response
+
+    The body is {"requests": [{"method": "GET", "path": "/jobs?open=true"}, ...]},
+    where each request may also carry a JSON "body" and extra "headers". Results
+    come back in order as {"status": ..., "body": ...}. Consecutive GETs run
+    concurrently. With "atomic": true every request runs in one transaction and a
+    failing request rolls back the whole batch with HTTP status 409 Conflict.
+
+    Method arguments:
+      request -- The full HTTP request object
+    '''
+    try:
+        sub_requests = parse_batch(request.data)
+    except BatchError as ex:
+        return Response({'message': str(ex)}, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        results = run_batch(request, sub_requests, atomic=request.data.get('atomic') is True)
+    except BatchFailed as ex:
+        return Response({
+            'message': f'Request {ex.index} failed, nothing was saved',
+            'failed': ex.index,
+            'results': ex.results,
+        }, status=status.HTTP_409_CONFLICT)
+    return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+# A batch inside a batch would multiply the limits
+batch_requests.batchable = False
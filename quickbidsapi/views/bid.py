@@ -1,44 +1,62 @@
-from rest_framework import serializers
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import status
-from quickbidsapi.models import Bid, Job, Contractor
+from quickbidsapi.models import ArchivedBid, Bid, Job, Contractor
+from quickbidsapi.activity import remove_acceptances
+from quickbidsapi.analytics import record_job
+from quickbidsapi.audit import audit_log, record_update
+from quickbidsapi.changelog import log_rows
+from quickbidsapi.dashboard import invalidate_job_dashboards
+from quickbidsapi.idempotency import idempotent
+from quickbidsapi.multiget import multiget_response
+from quickbidsapi.readers import archived_bid_reader
+from quickbidsapi.response_cache import bump, cached_response
+from quickbidsapi.sharding import bid_shards, bid_source, bids_on_job, get_bid
+from quickbidsapi.streaming import list_response
+from quickbidsapi.transactions import atomic_with_retry
 
 
 class BidView(ViewSet):
 
+    @cached_response(Bid, Job, Contractor)
     def list(self, request):
         """
         Summary:
             Retrieve a list of bids based on query parameters.
+            Bids on archived jobs are included when ?include_archived=true is passed.
+            Passing ?ids=1,2,3 retrieves those bids in one batch instead, listing
+            any ids that do not exist under "missing".
 
         Args:
             request (HttpRequest): The full HTTP request object.
 
         Returns:
-            Response: A serialized dictionary and HTTP status 200 OK.
+            Response: A serialized dictionary and HTTP status 200 OK. Large results are
+            streamed in chunks of STREAM_CHUNK_SIZE bids.
         """
-        bids = Bid.objects.all()
-
-        if "sub" in request.query_params:
-            bids = bids.filter(sub_contractor=request.query_params.get('sub'))
-        if "primary" in request.query_params:
-            bids = bids.filter(
-                primary_contractor=request.query_params.get('primary'))
-        if "job" in request.query_params:
-            bids = bids.filter(job=request.query_params.get('job'))
-        if "accepted" in request.query_params:
-            bids = bids.filter(accepted=request.query_params.get('accepted'))
-        if "request" in request.query_params:
-            bids = bids.filter(is_request=request.query_params.get('request'))
-
-        serializer = BidSerializer(bids, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if "ids" in request.query_params:
+            return multiget_response(request, *bid_source())
 
+        # ?job= is answered by one shard, any other filter by all of them
+        bids, reader = bid_source(request.query_params.get('job'))
+        parts = [(filter_bids(bids, request.query_params), reader)]
+
+        if request.query_params.get('include_archived') == 'true':
+            archived_bids = filter_bids(ArchivedBid.objects.all(), request.query_params)
+            parts.append((archived_bids, archived_bid_reader))
+
+        return list_response(request, *parts)
+
+    @cached_response(Bid, Job, Contractor)
     def retrieve(self, request, pk=None):
         """
         Summary:
-            Retrieve a specific bid by primary key.
+            Retrieve a specific bid by primary key, falling back to the archive
+            when ?include_archived=true is passed.
 
         Args:
             request (HttpRequest): The full HTTP request object.
@@ -48,13 +66,15 @@ class BidView(ViewSet):
             Response: A serialized dictionary containing the bid's data and HTTP status 200 OK,
             or HTTP status 404 Not Found if the bid with the specified primary key does not exist.
         """
-        try:
-            bid = Bid.objects.get(pk=pk)
-            serializer = BidSerializer(bid, many=False)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except Bid.DoesNotExist:
+        bids, reader = bid_source()
+        data = reader.get(bids, pk=pk)
+        if data is None and request.query_params.get('include_archived') == 'true':
+            data = archived_bid_reader.get(ArchivedBid.objects.all(), pk=pk)
+        if data is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(data, status=status.HTTP_200_OK)
 
+    @idempotent
     def create(self, request):
         """
         Summary:
@@ -72,7 +92,8 @@ class BidView(ViewSet):
             user=request.data["primary"])
         job = Job.objects.get(pk=request.data["job"])
 
-        bid = Bid.objects.create(
+        # Saved through the instance so the router can pick the job's shard
+        bid = Bid(
             rate=request.data["rate"],
             accepted=False,
             job=job,
@@ -80,9 +101,11 @@ class BidView(ViewSet):
             primary_contractor=primary_contractor,
             is_request=request.data["is_request"],
         )
+        bid.save()
 
-        serializer = BidSerializer(bid, many=False)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        bids, reader = bid_source(job.pk)
+        data = reader.get(bids, pk=bid.pk)
+        return Response(data, status=status.HTTP_201_CREATED)
 
     def update(self, request, pk=None):
         """
@@ -98,13 +121,18 @@ class BidView(ViewSet):
             or HTTP status 404 Not Found if the bid with the specified primary key does not exist.
         """
         try:
-            bid = Bid.objects.get(pk=pk)
+            bid = get_bid(pk)
             bid.job = Job.objects.get(pk=request.data["job"])
             bid.sub_contractor = Contractor.objects.get(pk=request.data["sub"])
             bid.primary_contractor = Contractor.objects.get(
                 pk=request.data["primary"])
             bid.rate = request.data["rate"]
             bid.accepted = request.data["accepted"]
+            if not bid.accepted:
+                bid.accepted_at = None
+            elif bid.accepted_at is None:
+                bid.accepted_at = timezone.now()
+            bid.rejected = request.data.get("rejected", bid.rejected)
             bid.is_request = request.data["is_request"]
             bid.save()
             return Response(None, status=status.HTTP_204_NO_CONTENT)
@@ -126,32 +154,127 @@ class BidView(ViewSet):
         """
 
         try:
-            bid = Bid.objects.get(pk=pk)
+            bid = get_bid(pk)
             bid.delete()
             return Response(None, status=status.HTTP_204_NO_CONTENT)
         except Bid.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
+    @action(methods=['post'], detail=True)
+    def accept(self, request, pk=None):
+        """
+        Summary:
+            Accept a bid, reject every competing bid on the same job and close the job,
+            all in one transaction.
+
+        Args:
+            request (HttpRequest): The full HTTP request object.
+            pk (int): The primary key of the bid to accept.
+
+        Returns:
+            Response: A serialized dictionary containing the accepted bid's data and HTTP status 200 OK,
+            HTTP status 403 Forbidden if the user is neither the job's contractor nor the
+            bid's primary contractor, HTTP status 404 Not Found if the bid with the specified
+            primary key does not exist, or HTTP status 409 Conflict if the job is no longer open.
+        """
+        contractor_id = Contractor.objects.filter(
+            user_id=request.user.pk).values_list('pk', flat=True).first()
+        try:
+            bid = get_bid(pk)
+        except Bid.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        owner_id = Job.objects.filter(pk=bid.job_id).values_list('contractor_id', flat=True).first()
+        if contractor_id is None or contractor_id not in (owner_id, bid.primary_contractor_id):
+            raise PermissionDenied('Only the job\'s contractor can accept its bids')
+
+        def accept_bid():
+            # Runs in the bid's shard's transaction, with the job and the
+            # change log in a default database transaction nested inside it,
+            # so the log commits first: a shard commit that then fails leaves
+            # entries for unchanged rows, never changed rows without entries
+            with transaction.atomic(using=DEFAULT_DB_ALIAS):
+                # Only one acceptance can flip the job from open to closed, so
+                # the row count tells us whether this request won
+                accepted_at = timezone.now()
+                closed = Job.objects.filter(
+                    pk=bid.job_id, open=True).update(open=False, accepted_at=accepted_at)
+                if not closed:
+                    return None
+
+                record_update(Job, {bid.job_id: {'open': True}}, open=False)
+
+                rejected = bids_on_job(bid.job_id).exclude(pk=bid.pk)
+                rows = list(rejected.values(
+                    'id', 'accepted', 'rejected', 'accepted_at', 'rate', 'primary_contractor_id'))
+                record_update(Bid, {row['id']: row for row in rows},
+                              accepted=False, rejected=True, accepted_at=None)
+                # An update can accept a bid on an open job, so a competitor
+                # may already be accepted and counted in the activity rollups
+                remove_acceptances(bid.job_id, [
+                    (row['accepted_at'], row['rate'], row['primary_contractor_id'])
+                    for row in rows])
+                rejected.update(accepted=False, rejected=True, accepted_at=None)
+                log_rows(Job.objects.filter(pk=bid.job_id))
+                log_rows(rejected)
 
-class JobSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Job
-        fields = ('id', 'name', 'contractor_id', 'complete', 'open')
+                bid.accepted = True
+                bid.rejected = False
+                bid.accepted_at = accepted_at
+                bid.save(update_fields=['accepted', 'rejected', 'accepted_at'])
+            return bid
 
+        bid = atomic_with_retry(accept_bid, using=bid._state.db)
+        if bid is None:
+            return Response(
+                {'message': 'This job is no longer open'},
+                status=status.HTTP_409_CONFLICT
+            )
 
-class ContractorSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Contractor
-        fields = ('id', 'company_name',)
+        # The bulk updates above bypass model signals
+        invalidate_job_dashboards(bid.job_id)
+        record_job(bid.job_id)
+        bump(Bid, Job)
 
+        bids, reader = bid_source(bid.job_id)
+        data = reader.get(bids, pk=bid.pk)
+        return Response(data, status=status.HTTP_200_OK)
 
-class BidSerializer(serializers.ModelSerializer):
+    @action(methods=['get'], detail=True)
+    def history(self, request, pk=None):
+        """
+        Summary:
+            List every recorded change to a bid's rate, acceptance and rejection, oldest first.
+
+        Args:
+            request (HttpRequest): The full HTTP request object.
+            pk (int): The primary key of the bid.
+
+        Returns:
+            Response: A list of audit records with the time, whether the bid was created and
+            each changed field's old and new value and HTTP status 200 OK, or HTTP status
+            404 Not Found if the bid never existed.
+        """
+        try:
+            pk = int(pk)
+        except ValueError:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        entries = audit_log.history('bid', pk)
+        if not entries and not any(Bid._base_manager.using(alias).filter(pk=pk).exists()
+                                   for alias in bid_shards()):
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(entries, status=status.HTTP_200_OK)
 
-    job = JobSerializer(many=False)
-    primary_contractor = ContractorSerializer(many=False)
-    sub_contractor = ContractorSerializer(many=False)
 
-    class Meta:
-        model = Bid
-        fields = ('id', 'rate', 'job', 'primary_contractor',
-                  'sub_contractor', 'accepted', 'is_request',)
+def filter_bids(bids, params):
+    """Applies the list query parameters to a Bid or ArchivedBid queryset"""
+    if "sub" in params:
+        bids = bids.filter(sub_contractor=params.get('sub'))
+    if "primary" in params:
+        bids = bids.filter(primary_contractor=params.get('primary'))
+    if "job" in params:
+        bids = bids.filter(job=params.get('job'))
+    if "accepted" in params:
+        bids = bids.filter(accepted=params.get('accepted'))
+    if "request" in params:
+        bids = bids.filter(is_request=params.get('request'))
+    return bids
@@ -1,16 +1,32 @@
-from rest_framework import serializers
+from django.conf import settings
+from django.db.models import Count, Q
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import status
-from quickbidsapi.models import Contractor
+from quickbidsapi.dashboard import cache_dashboard, get_cached_dashboard
+from quickbidsapi.models import Contractor, Job, RosterUpload
+from quickbidsapi.multiget import multiget_response
+from quickbidsapi.purge import soft_delete_contractor
+from quickbidsapi.readers import contractor_reader, dashboard_job_reader, job_reader
+from quickbidsapi.response_cache import cached_response
+from quickbidsapi.roster import RosterError, parse_roster
+from quickbidsapi.search import get_contractor_index
+from quickbidsapi.sharding import bid_counts, bid_source, is_sharded
+from quickbidsapi.tasks import import_roster_upload, purge_deleted
 
 
 class ContractorView(ViewSet):
 
+    @cached_response(Contractor, vary_on=lambda request: (
+        request.user.pk if "current" in request.query_params else None))
     def list(self, request):
         """
         Summary:
             Retrieve a list of contractors based on query parameters.
+            Passing ?ids=1,2,3 retrieves those contractors in one batch instead, listing
+            any ids that do not exist under "missing".
 
         Args:
             request (HttpRequest): The full HTTP request object.
@@ -18,6 +34,9 @@ class ContractorView(ViewSet):
         Returns:
             Response: A serialized dictionary and HTTP status 200 OK.
         """
+        if "ids" in request.query_params:
+            return multiget_response(request, Contractor.objects.all(), contractor_reader)
+
         contractors = Contractor.objects.all()
 
         if request.query_params.get('primary_contractor') is not None:
@@ -29,9 +48,9 @@ class ContractorView(ViewSet):
         if "current" in request.query_params:
             contractors = contractors.filter(user=request.auth.user)
 
-        serializer = ContractorSerializer(contractors, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(contractor_reader.read(contractors), status=status.HTTP_200_OK)
 
+    @cached_response(Contractor)
     def retrieve(self, request, pk=None):
         """
         Summary:
@@ -45,12 +64,10 @@ class ContractorView(ViewSet):
             Response: A serialized dictionary containing the contractor's data and HTTP status 200 OK,
             or HTTP status 404 Not Found if the contractor with the specified primary key does not exist.
         """
-        try:
-            contractor = Contractor.objects.get(pk=pk)
-            serializer = ContractorSerializer(contractor, many=False)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except Contractor.DoesNotExist:
+        contractor = contractor_reader.get(Contractor.objects.all(), pk=pk)
+        if contractor is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(contractor, status=status.HTTP_200_OK)
 
     def update(self, request, pk=None):
         """
@@ -84,6 +101,8 @@ class ContractorView(ViewSet):
         """
         Summary:
             Delete a specific contractor and associated user by primary key.
+            The contractor, their jobs and bids are hidden immediately and removed
+            by a background task.
 
         Args:
             request (HttpRequest): The full HTTP request object.
@@ -96,17 +115,181 @@ class ContractorView(ViewSet):
 
         try:
             contractor = Contractor.objects.get(pk=pk)
-            user = contractor.user
-            contractor.delete()
-            user.delete()
+            purge = soft_delete_contractor(contractor)
+            purge_deleted.enqueue(purge_id=purge.pk)
             return Response(None, status=status.HTTP_204_NO_CONTENT)
         except Contractor.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
+    @action(methods=['get'], detail=False)
+    def search(self, request):
+        """
+        Summary:
+            Typeahead search over company names and contractor first and last names.
+            Every word of ?q= must prefix a name; close misspellings of the last word
+            are matched too. Narrow with ?primary_contractor=true|false and cap the
+            results with ?limit=.
+
+        Args:
+            request (HttpRequest): The full HTTP request object.
+
+        Returns:
+            Response: A list of matching contractors' id, company_name, full_name and
+            primary_contractor and HTTP status 200 OK.
+        """
+        try:
+            limit = min(int(request.query_params.get('limit', 10)),
+                        settings.SEARCH_MAX_RESULTS)
+        except ValueError:
+            return Response({'message': 'limit must be a number'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        primary_contractor = None
+        if request.query_params.get('primary_contractor') == 'true':
+            primary_contractor = True
+        elif request.query_params.get('primary_contractor') == 'false':
+            primary_contractor = False
+
+        results = get_contractor_index().search(
+            request.query_params.get('q', ''), limit, primary_contractor)
+        return Response(results, status=status.HTTP_200_OK)
+
+    @action(methods=['post'], detail=False, url_path='import', permission_classes=[IsAdminUser])
+    def import_roster(self, request):
+        """
+        Summary:
+            Onboard a roster of contractors at once, for staff only. The roster is a
+            "roster" list of objects with the fields /register takes, CSV text with a
+            header row, or an uploaded CSV or JSON file. Pass "resume": true to rerun
+            an interrupted import, skipping the rows it already created. The roster is
+            imported in the background; follow its progress at /contractors/import/{id}.
+
+        Args:
+            request (HttpRequest): The full HTTP request object.
+
+        Returns:
+            Response: The import's progress and HTTP status 202 Accepted,
+            or HTTP status 400 Bad Request if the roster cannot be read or is too large.
+        """
+        roster = request.data.get('roster')
+        try:
+            if hasattr(roster, 'read'):
+                rows = parse_roster(roster.read(), roster.name)
+            elif isinstance(roster, str):
+                rows = parse_roster(roster)
+            elif isinstance(roster, list) and all(isinstance(row, dict) for row in roster):
+                rows = roster
+            else:
+                raise RosterError('roster must be a list of objects, CSV text or a file')
+        except RosterError as error:
+            return Response({'message': str(error)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if len(rows) > settings.ROSTER_MAX_REQUEST_ROWS:
+            return Response(
+                {'message': f'At most {settings.ROSTER_MAX_REQUEST_ROWS} rows may be imported '
+                            'per request; use manage.py import_roster for larger rosters'},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        resume = str(request.data.get('resume', False)).lower() in ('true', '1')
+        upload = RosterUpload.objects.create(rows=rows, row_count=len(rows), resume=resume)
+        import_roster_upload.enqueue(upload_id=upload.pk)
+        return Response(roster_upload_data(upload), status=status.HTTP_202_ACCEPTED)
+
+    @action(methods=['get'], detail=False, url_path=r'import/(?P<upload_id>\d+)',
+            permission_classes=[IsAdminUser])
+    def roster_upload(self, request, upload_id=None):
+        """
+        Summary:
+            Follow a roster import started with POST /contractors/import, for staff only.
+
+        Args:
+            request (HttpRequest): The full HTTP request object.
+            upload_id (int): The id the import was started with.
+
+        Returns:
+            Response: The import's status and the rows created, skipped and refused so far
+            with HTTP status 200 OK, or HTTP status 404 Not Found if there is no such import.
+        """
+        upload = RosterUpload.objects.filter(pk=upload_id).first()
+        if upload is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(roster_upload_data(upload), status=status.HTTP_200_OK)
+
+    @action(methods=['get'], detail=True)
+    def dashboard(self, request, pk=None):
+        """
+        Summary:
+            Retrieve everything the contractor's landing page needs in one response:
+            their jobs with bid counts, bids received, requests sent and received,
+            and accepted work.
+
+        Args:
+            request (HttpRequest): The full HTTP request object.
+            pk (int): The primary key of the contractor.
+
+        Returns:
+            Response: A serialized dictionary containing the dashboard data and HTTP status 200 OK,
+            or HTTP status 404 Not Found if the contractor with the specified primary key does not exist.
+        """
+        data = get_cached_dashboard(pk)
+        if data is not None:
+            return Response(data, status=status.HTTP_200_OK)
+
+        contractor = contractor_reader.get(Contractor.objects.all(), pk=pk)
+        if contractor is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        jobs = Job.objects.filter(contractor=pk)
+        if is_sharded():
+            # The bids are in other databases, so they are counted per shard
+            jobs = job_reader.read(jobs)
+            counts = bid_counts([job['id'] for job in jobs])
+            for job in jobs:
+                job['bid_count'] = counts[job['id']]
+        else:
+            jobs = dashboard_job_reader.read(jobs.annotate(bid_count=Count('bids')))
+
+        # One query for every bid the contractor is on either side of,
+        # split up in Python below
+        bids, reader = bid_source()
+        bids = reader.read(bids.filter(Q(primary_contractor=pk) | Q(sub_contractor=pk)))
+
+        incoming_bids = []
+        outgoing_requests = []
+        incoming_requests = []
+        accepted_work = []
+        for bid in bids:
+            if bid['primary_contractor']['id'] == contractor['id']:
+                if bid['is_request']:
+                    outgoing_requests.append(bid)
+                else:
+                    incoming_bids.append(bid)
+            if bid['sub_contractor']['id'] == contractor['id']:
+                if bid['is_request']:
+                    incoming_requests.append(bid)
+                if bid['accepted']:
+                    accepted_work.append(bid)
+
+        data = {
+            'contractor': contractor,
+            'jobs': jobs,
+            'incoming_bids': incoming_bids,
+            'outgoing_requests': outgoing_requests,
+            'incoming_requests': incoming_requests,
+            'accepted_work': accepted_work,
+        }
+        cache_dashboard(contractor['id'], data)
+        return Response(data, status=status.HTTP_200_OK)
 
-class ContractorSerializer(serializers.ModelSerializer):
 
-    class Meta:
-        model = Contractor
-        fields = ('id', 'first_name', 'last_name', 'username', 'email',
-                  'company_name', 'phone_number', 'primary_contractor', 'full_name')
+def roster_upload_data(upload):
+    return {
+        'id': upload.pk,
+        'status': upload.status,
+        'rows': upload.row_count,
+        'created': upload.result.get('created', []),
+        'skipped': upload.result.get('skipped', []),
+        'errors': upload.result.get('errors', []),
+        'created_at': upload.created_at,
+        'finished_at': upload.finished_at,
+    }
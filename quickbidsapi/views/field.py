@@ -1,12 +1,14 @@
-from rest_framework import serializers
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import status
 from quickbidsapi.models import Field
+from quickbidsapi.readers import field_reader
+from quickbidsapi.response_cache import cached_response
 
 
 class FieldView(ViewSet):
 
+    @cached_response(Field)
     def list(self, request):
         """
         Summary:
@@ -18,11 +20,10 @@ class FieldView(ViewSet):
         Returns:
             Response: A serialized dictionary and HTTP status 200 OK.
         """
-        fields = Field.objects.all()
-
-        serializer = FieldSerializer(fields, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        fields = field_reader.read(Field.objects.all())
+        return Response(fields, status=status.HTTP_200_OK)
 
+    @cached_response(Field)
     def retrieve(self, request, pk=None):
         """
         Summary:
@@ -36,12 +37,10 @@ class FieldView(ViewSet):
             Response: A serialized dictionary containing the field's data and HTTP status 200 OK,
             or HTTP status 404 Not Found if the field with the specified primary key does not exist.
         """
-        try:
-            field = Field.objects.get(pk=pk)
-            serializer = FieldSerializer(field, many=False)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except Field.DoesNotExist:
+        field = field_reader.get(Field.objects.all(), pk=pk)
+        if field is None:
             return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(field, status=status.HTTP_200_OK)
 
     def create(self, request):
         """
@@ -60,8 +59,8 @@ class FieldView(ViewSet):
             job_title=request.data["job_title"]
         )
 
-        serializer = FieldSerializer(field, many=False)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        data = field_reader.get(Field.objects.all(), pk=field.pk)
+        return Response(data, status=status.HTTP_201_CREATED)
 
     def update(self, request, pk=None):
         """
@@ -104,10 +103,3 @@ class FieldView(ViewSet):
             return Response(None, status=status.HTTP_204_NO_CONTENT)
         except Field.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
-
-
-class FieldSerializer(serializers.ModelSerializer):
-
-    class Meta:
-        model = Field
-        fields = ('id', 'job_title',)
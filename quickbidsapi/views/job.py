@@ -1,46 +1,56 @@
-from rest_framework import serializers
+from django.utils import timezone
+from rest_framework.decorators import action
 from rest_framework.viewsets import ViewSet
 from rest_framework.response import Response
 from rest_framework import status
-from quickbidsapi.models import Job, Contractor, Field
+from quickbidsapi.models import ArchivedJob, Job, JobField, Contractor, Field
+from quickbidsapi.audit import audit_log
+from quickbidsapi.estimator import suggest_rate
+from quickbidsapi.idempotency import idempotent
+from quickbidsapi.multiget import multiget_response
+from quickbidsapi.purge import soft_delete_job
+from quickbidsapi.readers import archived_job_reader, job_reader
+from quickbidsapi.response_cache import cached_response
+from quickbidsapi.streaming import list_response
+from quickbidsapi.tasks import purge_deleted
 
 
 class JobView(ViewSet):
 
+    @cached_response(Job, JobField, Field, Contractor)
     def list(self, request):
         """
         Summary:
             Retrieve a list of jobs based on query parameters.
+            Archived jobs are included when ?include_archived=true is passed.
+            Passing ?ids=1,2,3 retrieves those jobs in one batch instead, listing
+            any ids that do not exist under "missing".
 
         Args:
             request (HttpRequest): The full HTTP request object.
 
         Returns:
-            Response: A serialized dictionary and HTTP status 200 OK.
+            Response: A serialized dictionary and HTTP status 200 OK. Large results are
+            streamed in chunks of STREAM_CHUNK_SIZE jobs.
         """
-        jobs = Job.objects.all()
-
-        if "contractor" in request.query_params:
-            jobs = jobs.filter(
-                contractor=request.query_params.get('contractor'))
-        if request.query_params.get('open') is not None:
-            if request.query_params.get('open') == 'true':
-                jobs = jobs.filter(open=True)
-            elif request.query_params.get('open') == 'false':
-                jobs = jobs.filter(open=False)
-        if request.query_params.get('complete') is not None:
-            if request.query_params.get('complete') == 'true':
-                jobs = jobs.filter(complete=True)
-            elif request.query_params.get('complete') == 'false':
-                jobs = jobs.filter(complete=False)
-
-        serializer = JobSerializer(jobs, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if "ids" in request.query_params:
+            return multiget_response(request, Job.objects.all(), job_reader)
 
+        jobs = filter_jobs(Job.objects.all(), request.query_params)
+        parts = [(jobs, job_reader)]
+
+        if request.query_params.get('include_archived') == 'true':
+            archived_jobs = filter_jobs(ArchivedJob.objects.all(), request.query_params)
+            parts.append((archived_jobs, archived_job_reader))
+
+        return list_response(request, *parts)
+
+    @cached_response(Job, JobField, Field, Contractor)
     def retrieve(self, request, pk=None):
         """
         Summary:
-            Retrieve a specific job by primary key.
+            Retrieve a specific job by primary key, falling back to the archive
+            when ?include_archived=true is passed.
 
         Args:
             request (HttpRequest): The full HTTP request object.
@@ -50,20 +60,19 @@ class JobView(ViewSet):
             Response: A serialized dictionary containing the job's data and HTTP status 200 OK,
             or HTTP status 404 Not Found if the job with the specified primary key does not exist.
         """
-        try:
-            job = Job.objects.get(pk=pk)
+        job = job_reader.get(Job.objects.all(), pk=pk)
+        if job is None and request.query_params.get('include_archived') == 'true':
+            job = archived_job_reader.get(ArchivedJob.objects.all(), pk=pk)
+        if job is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
 
-            if "complete" in request.query_params:
-                if job.complete == bool(request.query_params.get('complete')):
-                    serializer = JobSerializer(job, many=False)
-                    return Response(serializer.data, status=status.HTTP_200_OK)
+        if "complete" in request.query_params:
+            if job['complete'] != bool(request.query_params.get('complete')):
                 return Response(status=status.HTTP_404_NOT_FOUND)
 
-            serializer = JobSerializer(job, many=False)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except Job.DoesNotExist:
-            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(job, status=status.HTTP_200_OK)
 
+    @idempotent
     def create(self, request):
         """
         Summary:
@@ -90,8 +99,8 @@ class JobView(ViewSet):
 
         job.fields.set(fields)
 
-        serializer = JobSerializer(job, many=False)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        data = job_reader.get(Job.objects.all(), pk=job.pk)
+        return Response(data, status=status.HTTP_201_CREATED)
 
     def update(self, request, pk=None):
         """
@@ -116,6 +125,10 @@ class JobView(ViewSet):
             job.square_footage = request.data["square_footage"]
             job.open = request.data["open"]
             job.complete = request.data["complete"]
+            if not job.complete:
+                job.completed_at = None
+            elif job.completed_at is None:
+                job.completed_at = timezone.now()
             job.fields.set(fields)
             job.save()
             return Response(None, status=status.HTTP_204_NO_CONTENT)
@@ -126,6 +139,8 @@ class JobView(ViewSet):
         """
         Summary:
             Delete a specific job and associated user by primary key.
+            The job and its bids are hidden immediately and removed by a
+            background task.
 
         Args:
             request (HttpRequest): The full HTTP request object.
@@ -138,30 +153,77 @@ class JobView(ViewSet):
 
         try:
             job = Job.objects.get(pk=pk)
-            job.delete()
+            purge = soft_delete_job(job)
+            purge_deleted.enqueue(purge_id=purge.pk)
             return Response(None, status=status.HTTP_204_NO_CONTENT)
         except Job.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
+    @action(methods=['get'], detail=True)
+    def suggested_rate(self, request, pk=None):
+        """
+        Summary:
+            Suggest a rate for a job from accepted bids on jobs needing the same fields,
+            scaled to the job's square footage. Served from the fitted coefficient table,
+            refreshed by `manage.py fit_rate_model`.
 
-class FieldSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Field
-        fields = ('id', 'job_title',)
-
+        Args:
+            request (HttpRequest): The full HTTP request object.
+            pk (int): The primary key of the job.
 
-class ContractorSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Contractor
-        fields = ('id', 'company_name',)
+        Returns:
+            Response: The suggested rate with a low to high range, the fields and number of
+            bids it is based on and HTTP status 200 OK, or HTTP status 404 Not Found if the
+            job does not exist or no rates have been fitted yet.
+        """
+        try:
+            job = Job.objects.get(pk=pk)
+        except Job.DoesNotExist:
+            return Response(status=status.HTTP_404_NOT_FOUND)
 
+        data = suggest_rate(job)
+        if data is None:
+            return Response({'message': 'No suggested rates have been fitted yet'},
+                            status=status.HTTP_404_NOT_FOUND)
+        return Response(data, status=status.HTTP_200_OK)
 
-class JobSerializer(serializers.ModelSerializer):
+    @action(methods=['get'], detail=True)
+    def history(self, request, pk=None):
+        """
+        Summary:
+            List every recorded change to a job's open and complete flags, oldest first.
 
-    fields = FieldSerializer(many=True)
-    contractor = ContractorSerializer(many=False)
+        Args:
+            request (HttpRequest): The full HTTP request object.
+            pk (int): The primary key of the job.
 
-    class Meta:
-        model = Job
-        fields = ('id', 'contractor', 'fields', 'name', 'address',
-                  'square_footage', 'open', 'complete',)
+        Returns:
+            Response: A list of audit records with the time, whether the job was created and
+            each changed field's old and new value and HTTP status 200 OK, or HTTP status
+            404 Not Found if the job never existed.
+        """
+        try:
+            pk = int(pk)
+        except ValueError:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        entries = audit_log.history('job', pk)
+        if not entries and not Job._base_manager.filter(pk=pk).exists():
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return Response(entries, status=status.HTTP_200_OK)
+
+
+def filter_jobs(jobs, params):
+    """Applies the list query parameters to a Job or ArchivedJob queryset"""
+    if "contractor" in params:
+        jobs = jobs.filter(contractor=params.get('contractor'))
+    if params.get('open') is not None:
+        if params.get('open') == 'true':
+            jobs = jobs.filter(open=True)
+        elif params.get('open') == 'false':
+            jobs = jobs.filter(open=False)
+    if params.get('complete') is not None:
+        if params.get('complete') == 'true':
+            jobs = jobs.filter(complete=True)
+        elif params.get('complete') == 'false':
+            jobs = jobs.filter(complete=False)
+    return jobs
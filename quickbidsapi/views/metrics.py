@@ -0,0 +1,65 @@
+import hmac
+import threading
+import time
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from quickbidsapi.metrics import exposition
+from quickbidsapi.models import Bid, Job
+from quickbidsapi.sharding import bid_shards
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_gauge_lock = threading.Lock()
+# 'gauges': (monotonic time read, gauges)
+_gauge_cache = {}
+
+
+def business_gauges():
+    '''``(name, help, value)`` of the gauges read from the database at each scrape'''
+    pending = sum(Bid._base_manager.using(alias).filter(accepted=False, rejected=False).count()
+                  for alias in bid_shards())
+    return [
+        ('quickbids_open_jobs', 'Jobs open to bids', Job.objects.filter(open=True).count()),
+        ('quickbids_pending_bids', 'Bids neither accepted nor rejected', pending),
+    ]
+
+
+def cached_business_gauges():
+    '''The business gauges, read at most once every METRICS_GAUGE_CACHE_SECONDS;
+    concurrent scrapes wait for one read rather than counting again'''
+    with _gauge_lock:
+        cached = _gauge_cache.get('gauges')
+        if cached is None or time.monotonic() - cached[0] >= settings.METRICS_GAUGE_CACHE_SECONDS:
+            cached = _gauge_cache['gauges'] = (time.monotonic(), business_gauges())
+        return cached[1]
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def metrics(request):
+    '''Returns every worker's metrics in the Prometheus text format
+
+    Scrapers authenticate with "Authorization: Bearer <METRICS_TOKEN>". Without
+    settings.METRICS_TOKEN the endpoint is closed, unless settings.METRICS_PUBLIC
+    opens it to anyone.
+
+    Method arguments:
+      request -- The full HTTP request object
+    '''
+    if settings.METRICS_TOKEN:
+        if not hmac.compare_digest(request.META.get('HTTP_AUTHORIZATION', ''),
+                                   f'Bearer {settings.METRICS_TOKEN}'):
+            return Response(status=status.HTTP_401_UNAUTHORIZED)
+    elif not settings.METRICS_PUBLIC:
+        return Response({'message': 'Set METRICS_TOKEN to scrape /metrics'},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    return HttpResponse(exposition(cached_business_gauges()), content_type=CONTENT_TYPE)
+
+
+metrics.batchable = False
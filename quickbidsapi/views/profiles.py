@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.http import FileResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from quickbidsapi.profiling import CAPTURE_FILES, capture_path, recent_captures
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profiles(request):
+    '''Lists the newest request profiles, each with its memory summary
+
+    Takes an optional ?limit, PROFILE_INDEX_SIZE by default. A capture's files
+    are at /profiles/<id>.prof and /profiles/<id>.folded.
+
+    Method arguments:
+      request -- The full HTTP request object
+    '''
+    try:
+        limit = int(request.query_params.get('limit', settings.PROFILE_INDEX_SIZE))
+    except ValueError:
+        return Response({'message': 'limit must be a whole number'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    captures = recent_captures(max(limit, 0))
+    for summary in captures:
+        summary['files'] = {kind: request.build_absolute_uri(f'/profiles/{summary["id"]}.{kind}')
+                            for kind in CAPTURE_FILES}
+    return Response(captures, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_file(request, capture_id, kind):
+    '''Returns the cProfile statistics (.prof) or collapsed stacks (.folded) of a capture
+
+    Method arguments:
+      request -- The full HTTP request object
+      capture_id -- The capture's id, as listed by /profiles
+      kind -- "prof" or "folded"
+    '''
+    path = capture_path(capture_id, kind)
+    if path is None:
+        return Response({'message': 'No such profile'}, status=status.HTTP_404_NOT_FOUND)
+    # FileResponse closes the file once it is sent
+    return FileResponse(open(path, 'rb'),  # pylint: disable=consider-using-with
+                        content_type=CAPTURE_FILES[kind], as_attachment=True,
+                        filename=f'{capture_id}.{kind}')
+
+
+profiles.batchable = False
+profile_file.batchable = False
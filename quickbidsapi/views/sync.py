@@ -0,0 +1,42 @@
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+from quickbidsapi.changelog import CursorExpired, sync
+from quickbidsapi.models import Contractor
+
+
+@api_view(['GET'])
+def sync_changes(request):
+    '''Returns the jobs, bids and contractors that changed after ?since=<cursor>
+
+    Rows still present are returned in full under "upserts", deleted or no longer
+    visible rows as ids under "tombstones". Pass the returned "cursor" as ?since= for
+    the next page while "has_more" is true; leave ?since= out for a first full sync.
+    A cursor older than compacted tombstones gets HTTP status 410 Gone.
+
+    Method arguments:
+      request -- The full HTTP request object
+    '''
+    try:
+        limit = request.query_params.get('limit')
+        limit = int(limit) if limit else None
+    except ValueError:
+        return Response({'message': 'limit must be a number'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if limit is not None and limit < 1:
+        return Response({'message': 'limit must be positive'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    contractor = Contractor.objects.filter(user=request.auth.user).first()
+    if contractor is None:
+        return Response(status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        data = sync(contractor.id, request.query_params.get('since'), limit)
+    except ValueError:
+        return Response({'message': 'since is not a valid cursor'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    except CursorExpired:
+        return Response({'message': 'This cursor has expired, sync again without since'},
+                        status=status.HTTP_410_GONE)
+    return Response(data, status=status.HTTP_200_OK)
@@ -1,4 +1,29 @@
 from .contractor_tests import ContractorTests
 from .field_tests import FieldTests
 from .bid_tests import BidTests
-from .job_tests import JobTests
\ No newline at end of file
+from .job_tests import JobTests
+from .idempotency_tests import IdempotencyTests
+from .bid_accept_tests import BidAcceptTests, BidAcceptStressTests
+from .dashboard_tests import DashboardTests
+from .multiget_tests import MultiGetTests
+from .archive_tests import ArchiveTests
+from .purge_tests import PurgeTests
+from .task_tests import TaskQueueTests, WorkerTests
+from .response_cache_tests import ResponseCacheTests
+from .singleflight_tests import SingleFlightTests
+from .contractor_search_tests import ContractorSearchTests
+from .streaming_tests import StreamingTests
+from .readers_tests import ReaderTests
+from .analytics_tests import RateAnalyticsTests
+from .rate_model_tests import RateModelTests
+from .sync_tests import SyncTests
+from .audit_tests import AuditTests
+from .sharding_tests import ShardingTests
+from .batch_tests import BatchTests, ConcurrentBatchTests
+from .activity_tests import ActivityTests
+from .signed_token_tests import SignedTokenTests
+from .roster_tests import RosterImportTests
+from .admin_tests import AdminTests
+from .metrics_tests import MetricsTests
+from .slow_query_tests import SlowQueryTests
+from .profiling_tests import ProfilingTests
\ No newline at end of file
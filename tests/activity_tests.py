@@ -0,0 +1,112 @@
+import json
+from rest_framework import status
+from rest_framework.test import APITestCase
+from quickbidsapi.activity import rebuild_activity
+from quickbidsapi.models import ActivityRollup, Bid, Contractor, Job, JobField
+from rest_framework.authtoken.models import Token
+
+
+class ActivityTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.job = Job.objects.filter(open=True).first()
+
+    def get_activity(self, query=""):
+        response = self.client.get(f"/analytics/activity{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def create_bid(self, rate):
+        data = {"rate": rate, "job": self.job.id, "primary": self.contractor.user_id,
+                "sub": 2, "is_request": False}
+        response = self.client.post("/bids", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return json.loads(response.content)["id"]
+
+    def rollups(self):
+        return sorted(ActivityRollup.objects.values_list(
+            'bucket', 'scope', 'scope_id', 'start', 'bids', 'rated_bids', 'rate_sum',
+            'accepted', 'rated_accepted', 'accepted_rate_sum'))
+
+    def test_created_and_accepted_bids_are_counted(self):
+        """
+        Ensure new and accepted bids show up in the current hour and day
+        """
+        first = self.create_bid(20)
+        self.create_bid(30)
+        self.client.post(f"/bids/{first}/accept")
+        field_id = JobField.objects.filter(job=self.job).values_list('field_id', flat=True).first()
+
+        for query in ["", "?bucket=hour", f"?field={field_id}",
+                      f"?contractor={Bid.objects.get(pk=first).primary_contractor_id}"]:
+            latest = self.get_activity(query)["series"][-1]
+            self.assertEqual(latest["bids"], 2)
+            self.assertEqual(latest["average_rate"], 25)
+            self.assertEqual(latest["accepted"], 1)
+            self.assertEqual(latest["accepted_rate_sum"], 20)
+
+    def test_rollups_match_a_rebuild(self):
+        """
+        Ensure incremental updates leave the same rollups as recounting from the bids
+        """
+        first = self.create_bid(20)
+        second = self.create_bid(None)
+        self.client.post(f"/bids/{first}/accept")
+        data = {"rate": 45, "job": self.job.id, "primary": self.contractor.id, "sub": 2,
+                "accepted": True, "is_request": False}
+        self.client.put(f"/bids/{second}", data, format='json')
+        data["accepted"] = False
+        self.client.put(f"/bids/{first}", data, format='json')
+
+        incremental = self.rollups()
+        rebuild_activity()
+        self.assertEqual(incremental, self.rollups())
+
+    def test_accept_clears_an_updated_acceptance(self):
+        """
+        Ensure accepting a bid uncounts a competitor an update had accepted
+        """
+        first = self.create_bid(20)
+        second = self.create_bid(30)
+        data = {"rate": 20, "job": self.job.id, "primary": self.contractor.id, "sub": 2,
+                "accepted": True, "is_request": False}
+        response = self.client.put(f"/bids/{first}", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.post(f"/bids/{second}/accept")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        bid = Bid.objects.get(pk=first)
+        self.assertFalse(bid.accepted)
+        self.assertTrue(bid.rejected)
+        self.assertIsNone(bid.accepted_at)
+        incremental = self.rollups()
+        rebuild_activity()
+        self.assertEqual(incremental, self.rollups())
+
+    def test_series_reads_one_query(self):
+        """
+        Ensure a range of buckets is read from the rollups alone, empty buckets included
+        """
+        self.create_bid(20)
+        # One query authenticates the token
+        with self.assertNumQueries(2):
+            series = self.get_activity("?bucket=hour&since=2026-01-01&until=2026-01-03")["series"]
+        self.assertEqual(len(series), 49)
+        self.assertEqual(series[0]["start"], "2026-01-01T00:00:00Z")
+        self.assertTrue(all(entry["bids"] == 0 for entry in series))
+
+    def test_invalid_parameters(self):
+        """
+        Ensure malformed activity queries are refused
+        """
+        for query in ["?bucket=week", "?field=1&contractor=1", "?since=yesterday",
+                      "?since=2026-02-01&until=2026-01-01", "?bucket=hour&since=2020-01-01"]:
+            response = self.client.get(f"/analytics/activity{query}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
@@ -0,0 +1,153 @@
+from django.contrib.admin import helpers
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from quickbidsapi.admin import EstimatedCountPaginator
+from quickbidsapi.models import Bid, Change, Job
+from quickbidsapi.sharding import reshard_batch
+
+
+class AdminTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("support", "support@example.com", "password")
+        self.client.force_login(self.admin)
+
+    def test_changelists_do_not_query_per_row(self):
+        """
+        Ensure every changelist renders in a fixed number of queries.
+        """
+        for url in ["/admin/quickbidsapi/bid/", "/admin/quickbidsapi/job/",
+                    "/admin/quickbidsapi/contractor/", "/admin/quickbidsapi/jobfield/",
+                    "/admin/quickbidsapi/field/"]:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            self.assertLess(len(queries), 10, url)
+
+    def test_filters_and_search(self):
+        """
+        Ensure the status filters and prefix search narrow the changelists.
+        """
+        response = self.client.get("/admin/quickbidsapi/bid/?status=accepted")
+        self.assertEqual(len(response.context["cl"].result_list),
+                         Bid.objects.filter(accepted=True).count())
+
+        response = self.client.get("/admin/quickbidsapi/job/?status=open&deleted=no")
+        self.assertEqual(len(response.context["cl"].result_list),
+                         Job.objects.filter(open=True).count())
+
+        job = Job.objects.first()
+        response = self.client.get(f"/admin/quickbidsapi/job/?q={job.name[:3]}")
+        self.assertIn(job, response.context["cl"].result_list)
+
+    @override_settings(ADMIN_ESTIMATED_COUNT_THRESHOLD=1)
+    def test_unfiltered_count_is_estimated(self):
+        """
+        Ensure an unfiltered changelist is counted from the table statistics.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        Bid.objects.filter(pk=Bid.objects.first().pk).delete()
+
+        # The statistics are stale until the next ANALYZE
+        estimated = EstimatedCountPaginator(Bid._base_manager.order_by("pk"), 10).count
+        self.assertEqual(estimated, Bid._base_manager.count() + 1)
+        filtered = EstimatedCountPaginator(Bid._base_manager.filter(accepted=True).order_by("pk"), 10).count
+        self.assertEqual(filtered, Bid._base_manager.filter(accepted=True).count())
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/admin/quickbidsapi/bid/")
+        self.assertFalse([query for query in queries.captured_queries
+                          if "COUNT(" in query["sql"] and "quickbidsapi_bid" in query["sql"]])
+
+    def test_close_jobs_action(self):
+        """
+        Ensure closing jobs runs one UPDATE and logs the change for syncing clients.
+        """
+        jobs = list(Job.objects.filter(open=True))
+        changes = Change.objects.count()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post("/admin/quickbidsapi/job/", {
+                "action": "close_jobs",
+                helpers.ACTION_CHECKBOX_NAME: [job.pk for job in jobs],
+            })
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+
+        self.assertFalse(Job.objects.filter(open=True).exists())
+        self.assertEqual(Change.objects.count(), changes + len(jobs))
+        updates = [query for query in queries.captured_queries
+                   if query["sql"].startswith('UPDATE "quickbidsapi_job"')]
+        self.assertEqual(len(updates), 1)
+
+    def test_reject_bids_action(self):
+        """
+        Ensure rejecting bids leaves accepted bids alone.
+        """
+        bids = list(Bid.objects.all())
+
+        self.client.post("/admin/quickbidsapi/bid/", {
+            "action": "reject_bids",
+            helpers.ACTION_CHECKBOX_NAME: [bid.pk for bid in bids],
+        })
+
+        for bid in bids:
+            bid.refresh_from_db()
+            self.assertEqual(bid.rejected, not bid.accepted)
+
+    def test_contractors_and_jobs_cannot_be_deleted(self):
+        """
+        Ensure contractors and jobs are only deleted through the API's soft delete.
+        """
+        job = Job.objects.first()
+        response = self.client.get(f"/admin/quickbidsapi/job/{job.pk}/delete/")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+SHARDS = ['bids_0', 'bids_1']
+
+
+@override_settings(BID_SHARDS=SHARDS)
+class ShardedAdminTests(APITestCase):
+
+    databases = {'default', *SHARDS}
+
+    @classmethod
+    def setUpTestData(cls):
+        # Loaded by hand, since fixtures are loaded into every test database
+        call_command('loaddata', 'users', 'tokens', 'contractors', 'jobs', 'fields',
+                     'job_fields', 'bids', database='default', verbosity=0)
+
+    def setUp(self):
+        for source in ['default', *SHARDS]:
+            after = 0
+            while after is not None:
+                after, _ = reshard_batch(source, SHARDS, after, 100)
+        self.admin = User.objects.create_superuser("support", "support@example.com", "password")
+        self.client.force_login(self.admin)
+
+    def test_bid_changelist_lists_one_shard(self):
+        """
+        Ensure a shard's bids are listed with their own id columns and open by id.
+        """
+        response = self.client.get("/admin/quickbidsapi/bid/?shard=bids_1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([name for name in response.context["cl"].list_display
+                          if name.endswith("_id")],
+                         ["job_id", "primary_contractor_id", "sub_contractor_id"])
+        listed = {bid.pk for bid in response.context["cl"].result_list}
+        self.assertEqual(listed,
+                         set(Bid._base_manager.using("bids_1").values_list("pk", flat=True)))
+
+        bid = Bid._base_manager.using("bids_1").first()
+        response = self.client.get(f"/admin/quickbidsapi/bid/{bid.pk}/change/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,114 @@
+import json
+from unittest import mock
+from rest_framework import status
+from rest_framework.test import APITestCase
+from quickbidsapi.analytics import rate_rows, rate_store
+from quickbidsapi.models import Bid, Contractor, Job
+from rest_framework.authtoken.models import Token
+
+
+class RateAnalyticsTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        rate_store.clear()
+
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def get_rates(self, query=""):
+        response = self.client.get(f"/analytics/rates{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def accepted_rates(self, **filters):
+        return sorted(Bid.objects.filter(
+            accepted=True, rate__isnull=False, **filters).values_list('rate', flat=True))
+
+    def test_rates_for_a_field(self):
+        """
+        Ensure statistics cover the accepted bids on a field's jobs
+        """
+        rates = self.accepted_rates(job__fields=1)
+
+        json_response = self.get_rates("?field=1")
+
+        self.assertEqual(json_response["rate"]["count"], len(rates))
+        self.assertEqual(json_response["rate"]["min"], rates[0])
+        self.assertEqual(json_response["rate"]["max"], rates[-1])
+        self.assertAlmostEqual(json_response["rate"]["mean"], sum(rates) / len(rates))
+        self.assertEqual(sum(bucket["count"] for bucket in json_response["histogram"]),
+                         len(rates))
+
+    def test_square_footage_range(self):
+        """
+        Ensure only jobs inside the size range are counted
+        """
+        rates = self.accepted_rates(job__square_footage__gte=2000,
+                                    job__square_footage__lte=3000)
+
+        json_response = self.get_rates("?min_sqft=2000&max_sqft=3000")
+
+        self.assertEqual(json_response["rate"]["count"], len(rates))
+        self.assertEqual(json_response["rate_per_sqft"]["count"], len(rates))
+
+    def test_accepting_a_bid_updates_the_statistics(self):
+        """
+        Ensure accepting a bid is reflected without waiting for a rebuild
+        """
+        before = self.get_rates()["rate"]["count"]
+        job = Job.objects.filter(open=True, bids__accepted=False).first()
+        bid = job.bids.filter(rate__isnull=False, accepted=False).first()
+
+        response = self.client.post(f"/bids/{bid.id}/accept")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        expected = len(self.accepted_rates())
+        self.assertEqual(self.get_rates()["rate"]["count"], expected)
+        self.assertNotEqual(expected, before)
+
+    def test_deleting_a_bid_updates_the_statistics(self):
+        """
+        Ensure a deleted bid drops out of the statistics
+        """
+        self.get_rates()
+        Bid.objects.filter(accepted=True, rate__isnull=False).first().delete()
+
+        self.assertEqual(self.get_rates()["rate"]["count"], len(self.accepted_rates()))
+
+    def test_no_matching_bids(self):
+        """
+        Ensure an empty selection returns empty statistics
+        """
+        json_response = self.get_rates("?min_sqft=1000000")
+
+        self.assertEqual(json_response["rate"]["count"], 0)
+        self.assertIsNone(json_response["rate"]["mean"])
+        self.assertEqual(json_response["histogram"], [])
+
+    def test_invalid_parameters(self):
+        """
+        Ensure parameters that are not numbers are rejected
+        """
+        for query in ("?field=abc", "?min_sqft=nan"):
+            response = self.client.get(f"/analytics/rates{query}")
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+    def test_rebuild_reads_without_the_lock(self):
+        """
+        Ensure samples are read from the database unlocked and keep updates made meanwhile
+        """
+        def read_rows(field_id):
+            self.assertFalse(rate_store._lock.locked())
+            rate_store.update_bid(999, True, 1234.0, 100.0, [])
+            return rate_rows(field_id)
+
+        with mock.patch("quickbidsapi.analytics.rate_rows", side_effect=read_rows):
+            rates, _ = rate_store.arrays(None)
+
+        self.assertIn(1234.0, rates)
+        self.assertEqual(len(rates), len(self.accepted_rates()) + 1)
@@ -0,0 +1,90 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.core.management import call_command
+from django.utils import timezone
+from quickbidsapi.models import (
+    ArchivedBid, ArchivedJob, ArchivedJobField, Bid, Contractor, Job, JobField)
+from rest_framework.authtoken.models import Token
+
+
+class ArchiveTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        # Age every completed job past the archive cutoff
+        Job.objects.filter(complete=True).update(
+            completed_at=timezone.now() - timedelta(days=365))
+        self.job = Job.objects.filter(complete=True).first()
+        self.bid_ids = list(
+            Bid.objects.filter(job=self.job).values_list('pk', flat=True))
+        self.field_count = JobField.objects.filter(job=self.job).count()
+
+    def archive(self):
+        call_command('archive_jobs', days=30, batch_size=1, stdout=StringIO())
+
+    def test_archive_moves_completed_jobs(self):
+        """
+        Ensure completed jobs and their bids and fields leave the hot tables
+        """
+        completed = Job.objects.filter(complete=True).count()
+
+        self.archive()
+
+        self.assertFalse(Job.objects.filter(complete=True).exists())
+        self.assertEqual(ArchivedJob.objects.count(), completed)
+        self.assertFalse(Bid.objects.filter(pk__in=self.bid_ids).exists())
+        self.assertEqual(
+            ArchivedBid.objects.filter(job=self.job.pk).count(), len(self.bid_ids))
+        self.assertEqual(
+            ArchivedJobField.objects.filter(job=self.job.pk).count(), self.field_count)
+
+    def test_recently_completed_jobs_stay_hot(self):
+        """
+        Ensure jobs completed after the cutoff are left alone
+        """
+        Job.objects.filter(pk=self.job.pk).update(completed_at=timezone.now())
+
+        self.archive()
+
+        self.assertTrue(Job.objects.filter(pk=self.job.pk).exists())
+
+    def test_list_jobs_include_archived(self):
+        """
+        Ensure archived jobs are only listed when asked for
+        """
+        self.archive()
+
+        response = self.client.get("/jobs?complete=true")
+        self.assertEqual(json.loads(response.content), [])
+
+        response = self.client.get("/jobs?complete=true&include_archived=true")
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(self.job.pk, [job["id"] for job in json_response])
+
+    def test_retrieve_archived_bid(self):
+        """
+        Ensure an archived bid can be retrieved by its original id
+        """
+        self.archive()
+        bid_id = self.bid_ids[0]
+
+        response = self.client.get(f"/bids/{bid_id}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(f"/bids/{bid_id}?include_archived=true")
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json_response["id"], bid_id)
+        self.assertEqual(json_response["job"]["id"], self.job.pk)
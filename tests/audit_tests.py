@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+from unittest import mock
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from quickbidsapi.audit import audit_log
+from quickbidsapi.models import Bid, Contractor, Job
+from rest_framework.authtoken.models import Token
+
+
+class AuditTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        audit_log.flush()
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'audit.log')
+        settings = override_settings(AUDIT_LOG_PATH=self.path)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def get_history(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def test_saved_changes_are_recorded(self):
+        """
+        Ensure saving a bid records only the audited fields that changed
+        """
+        bid = Bid.objects.first()
+        rate = bid.rate
+        with self.captureOnCommitCallbacks(execute=True):
+            bid.rate = (rate or 0) + 5
+            bid.save()
+            bid.save()
+
+        history = self.get_history(f"/bids/{bid.id}/history")
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0]["changes"], {"rate": [rate, bid.rate]})
+        self.assertFalse(history[0]["created"])
+
+    def test_accept_records_bulk_updates(self):
+        """
+        Ensure accepting a bid records the rejected competitors and the closed job
+        """
+        bid = Bid.objects.filter(job__open=True).first()
+        competitors = list(Bid.objects.filter(job=bid.job_id).exclude(pk=bid.id)
+                           .exclude(rejected=True).values_list('id', flat=True))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/bids/{bid.id}/accept")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.get_history(f"/jobs/{bid.job_id}/history")[-1]["changes"],
+                         {"open": [True, False]})
+        self.assertIn("accepted", self.get_history(f"/bids/{bid.id}/history")[-1]["changes"])
+        for competitor in competitors:
+            changes = self.get_history(f"/bids/{competitor}/history")[-1]["changes"]
+            self.assertEqual(changes["rejected"], [False, True])
+
+    def test_records_are_appended(self):
+        """
+        Ensure each record is one line keyed by its row
+        """
+        job = Job.objects.first()
+        for complete in (True, False):
+            with self.captureOnCommitCallbacks(execute=True):
+                job.complete = complete
+                job.save()
+
+        audit_log.flush()
+        with open(self.path, encoding='utf-8') as audit_file:
+            lines = audit_file.readlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(all(line.startswith(f"job:{job.id}\t") for line in lines))
+
+    def test_missing_history(self):
+        """
+        Ensure the history of a row that never existed is a 404
+        """
+        response = self.client.get("/bids/999999/history")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+    def test_non_numeric_history(self):
+        """
+        Ensure the history of an id that is not a number is a 404
+        """
+        for url in ("/bids/abc/history", "/jobs/abc/history"):
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_history_reads_buffer_and_new_lines(self):
+        """
+        Ensure a lookup neither flushes the buffer nor misses lines appended since the last one
+        """
+        job = Job.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            job.complete = not job.complete
+            job.save()
+        with mock.patch.object(audit_log, "flush") as flush:
+            self.assertEqual(len(audit_log.history("job", job.id)), 1)
+        flush.assert_not_called()
+
+        audit_log.flush()
+        with self.captureOnCommitCallbacks(execute=True):
+            job.complete = not job.complete
+            job.save()
+        audit_log.flush()
+
+        history = audit_log.history("job", job.id)
+        self.assertEqual([record["changes"]["complete"][1] for record in history],
+                         [not job.complete, job.complete])
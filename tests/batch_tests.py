@@ -0,0 +1,117 @@
+import json
+from rest_framework import status
+from rest_framework.test import APITestCase, APITransactionTestCase
+from quickbidsapi import response_cache
+from quickbidsapi.models import Contractor, Job
+from rest_framework.authtoken.models import Token
+
+READS = ["/jobs", "/fields", "/contractors", "/bids?job=1", "/jobs/1"]
+
+
+def authenticate(client):
+    contractor = Contractor.objects.first()
+    token, created = Token.objects.get_or_create(user=contractor.user)
+    client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+
+class BatchTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        response_cache.clear()
+        authenticate(self.client)
+
+    def post_batch(self, requests, expected=status.HTTP_200_OK, **options):
+        response = self.client.post("/batch", dict(options, requests=requests), format='json')
+        self.assertEqual(response.status_code, expected)
+        return json.loads(response.content)
+
+    def test_reads_match_single_requests(self):
+        """
+        Ensure batched reads return what the requests return on their own
+        """
+        expected = [json.loads(self.client.get(path).content) for path in READS]
+        results = self.post_batch([{"method": "GET", "path": path} for path in READS])["results"]
+
+        self.assertEqual([result["status"] for result in results], [200] * len(READS))
+        self.assertEqual([result["body"] for result in results], expected)
+
+    def test_reads_see_earlier_writes(self):
+        """
+        Ensure a read after a write in the same batch sees the write
+        """
+        job = {"fields": [1], "name": "Batched Job", "address": "1 Batch Rd.", "square_footage": 900}
+        results = self.post_batch([
+            {"method": "POST", "path": "/jobs", "body": job},
+            {"method": "GET", "path": "/jobs"},
+            {"method": "GET", "path": "/jobs/999999"},
+        ])["results"]
+
+        self.assertEqual([result["status"] for result in results], [201, 200, 404])
+        created = results[0]["body"]["id"]
+        self.assertIn(created, [row["id"] for row in results[1]["body"]])
+
+    def test_sub_requests_run_as_the_batch_user(self):
+        """
+        Ensure sub-requests are authenticated as the batch's user whatever headers they carry
+        """
+        results = self.post_batch([
+            {"method": "GET", "path": "/contractors?current",
+             "headers": {"Authorization": "Token bogus"}},
+        ])["results"]
+
+        self.assertEqual(results[0]["status"], 200)
+        self.assertEqual([row["id"] for row in results[0]["body"]], [Contractor.objects.first().id])
+
+        self.client.credentials()
+        self.post_batch([{"method": "GET", "path": "/jobs"}], status.HTTP_401_UNAUTHORIZED)
+
+    def test_atomic_batch_rolls_back(self):
+        """
+        Ensure a failing request in an atomic batch undoes the earlier writes
+        """
+        jobs = Job.objects.count()
+        job = {"fields": [1], "name": "Rolled Back", "address": "1 Batch Rd.", "square_footage": 900}
+        data = self.post_batch([
+            {"method": "POST", "path": "/jobs", "body": job},
+            {"method": "POST", "path": "/bids/999999/accept"},
+        ], expected=status.HTTP_409_CONFLICT, atomic=True)
+
+        self.assertEqual(data["failed"], 1)
+        self.assertEqual(Job.objects.count(), jobs)
+
+    def test_invalid_batches(self):
+        """
+        Ensure malformed batches are refused and batches cannot be nested
+        """
+        self.post_batch([], expected=status.HTTP_400_BAD_REQUEST)
+        self.post_batch([{"method": "TRACE", "path": "/jobs"}], expected=status.HTTP_400_BAD_REQUEST)
+        self.post_batch([{"path": "/jobs"}] * 21, expected=status.HTTP_400_BAD_REQUEST)
+
+        results = self.post_batch([{"method": "POST", "path": "/batch"},
+                                   {"path": "/admin/"}])["results"]
+        self.assertEqual([result["status"] for result in results], [404, 404])
+
+        self.client.credentials()
+        self.post_batch([{"path": "/jobs"}], expected=status.HTTP_401_UNAUTHORIZED)
+
+
+class ConcurrentBatchTests(APITransactionTestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def test_concurrent_reads(self):
+        """
+        Ensure reads spread over worker threads come back complete and in order
+        """
+        response_cache.clear()
+        authenticate(self.client)
+        expected = [json.loads(self.client.get(path).content) for path in READS]
+
+        response = self.client.post("/batch", {
+            "requests": [{"method": "GET", "path": path} for path in READS]}, format='json')
+        results = json.loads(response.content)["results"]
+        self.assertEqual([result["body"] for result in results], expected)
@@ -0,0 +1,112 @@
+import json
+import threading
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase, APITransactionTestCase
+from django.db import connection
+from quickbidsapi.models import Contractor, Bid, Job
+from rest_framework.authtoken.models import Token
+
+
+class BidAcceptTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_accept_bid(self):
+        """
+        Ensure accepting a bid rejects its competitors and closes the job.
+        """
+        bid = Bid.objects.filter(job__open=True).first()
+
+        response = self.client.post(f"/bids/{bid.id}/accept")
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json_response["accepted"], True)
+        self.assertEqual(json_response["job"]["open"], False)
+        self.assertFalse(Job.objects.get(pk=bid.job_id).open)
+
+        competitors = Bid.objects.filter(job=bid.job_id).exclude(pk=bid.id)
+        for competitor in competitors:
+            self.assertFalse(competitor.accepted)
+            self.assertTrue(competitor.rejected)
+
+    def test_accept_bid_on_closed_job(self):
+        """
+        Ensure a bid on a job that is no longer open cannot be accepted.
+        """
+        bid = Bid.objects.filter(job__open=True).first()
+        Job.objects.filter(pk=bid.job_id).update(open=False)
+
+        response = self.client.post(f"/bids/{bid.id}/accept")
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Bid.objects.get(pk=bid.id).accepted)
+
+    def test_accept_bid_on_another_contractors_job(self):
+        """
+        Ensure only the job's contractor or the bid's primary contractor can accept it.
+        """
+        bid = Bid.objects.filter(job__open=True).exclude(
+            job__contractor=self.contractor).exclude(primary_contractor=self.contractor).first()
+
+        response = self.client.post(f"/bids/{bid.id}/accept")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Bid.objects.get(pk=bid.id).accepted)
+        self.assertTrue(Job.objects.get(pk=bid.job_id).open)
+
+    def test_accept_missing_bid(self):
+        """
+        Ensure accepting a bid that does not exist returns a 404.
+        """
+        response = self.client.post("/bids/9999/accept")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class BidAcceptStressTests(APITransactionTestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def test_concurrent_acceptances_have_one_winner(self):
+        """
+        Ensure exactly one of many concurrent acceptances on the same job wins.
+        """
+        job = Job.objects.filter(open=True).first()
+        contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=contractor.user)
+        subs = Contractor.objects.filter(primary_contractor=False)
+        bids = [
+            Bid.objects.create(rate=20 + i, job=job, primary_contractor=contractor,
+                               sub_contractor=subs[i % len(subs)])
+            for i in range(8)
+        ]
+
+        barrier = threading.Barrier(len(bids))
+        results = []
+
+        def accept(bid):
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+            try:
+                barrier.wait()
+                results.append(client.post(f"/bids/{bid.id}/accept").status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=accept, args=(bid,)) for bid in bids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(status.HTTP_200_OK), 1)
+        self.assertEqual(results.count(status.HTTP_409_CONFLICT), len(bids) - 1)
+        self.assertEqual(Bid.objects.filter(job=job, accepted=True).count(), 1)
+        self.assertFalse(Job.objects.get(pk=job.pk).open)
@@ -0,0 +1,124 @@
+import json
+import threading
+from django.db import transaction
+from rest_framework import status
+from rest_framework.test import APITestCase
+from quickbidsapi.models import Contractor
+from quickbidsapi.search import ContractorIndex, contractor_index
+from rest_framework.authtoken.models import Token
+
+
+class ContractorSearchTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        contractor_index.invalidate()
+
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def search(self, query):
+        response = self.client.get(f"/contractors/search?{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def test_search_by_company_prefix(self):
+        """
+        Ensure contractors are found by the start of a company name word
+        """
+        results = self.search("q=duch")
+
+        self.assertEqual([result["company_name"] for result in results],
+                         ["Ducharme Construction"])
+        self.assertEqual(set(results[0]),
+                         {"id", "company_name", "full_name", "primary_contractor"})
+
+    def test_search_by_user_name(self):
+        """
+        Ensure every word must prefix one of the contractor's names
+        """
+        results = self.search("q=tyler hill")
+
+        self.assertEqual([result["full_name"] for result in results],
+                         ["Tyler Hilliard"])
+
+    def test_fuzzy_match(self):
+        """
+        Ensure a misspelled name still finds the contractor
+        """
+        results = self.search("q=nilsen")
+
+        self.assertIn("Nilson Painting",
+                      [result["company_name"] for result in results])
+
+    def test_index_follows_writes(self):
+        """
+        Ensure renamed and deleted contractors are reflected without a rebuild
+        """
+        self.search("q=construction")
+        contractor = Contractor.objects.get(company_name="Ducharme Construction")
+
+        contractor.company_name = "Zephyr Builders"
+        with self.captureOnCommitCallbacks(execute=True):
+            contractor.save()
+        self.assertEqual(self.search("q=construction"), [])
+        self.assertEqual(len(self.search("q=zephyr")), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f"/contractors/{contractor.id}")
+        self.assertEqual(self.search("q=zephyr"), [])
+
+    def test_rolled_back_write_is_not_indexed(self):
+        """
+        Ensure a write that is rolled back never reaches the index
+        """
+        self.search("q=construction")
+        contractor = Contractor.objects.get(company_name="Ducharme Construction")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    contractor.company_name = "Zephyr Builders"
+                    contractor.save()
+                    raise RuntimeError("rolled back")
+            except RuntimeError:
+                pass
+
+        self.assertEqual(self.search("q=zephyr"), [])
+        self.assertEqual(len(self.search("q=ducharme")), 1)
+
+    def test_filter_by_primary_contractor(self):
+        """
+        Ensure the picker can ask for subcontractors only
+        """
+        results = self.search("q=b&primary_contractor=false")
+
+        for result in results:
+            self.assertFalse(result["primary_contractor"])
+
+
+    def test_rebuild_does_not_block_searches(self):
+        """
+        Ensure searches use the old contents while a rebuild reads its rows,
+        and writes made meanwhile survive the swap
+        """
+        index = ContractorIndex()
+        index.build([(1, "Ducharme Construction", "Tyler", "Hilliard", True)])
+        found = []
+
+        def rows():
+            searcher = threading.Thread(target=lambda: found.extend(index.search("duch")))
+            searcher.start()
+            searcher.join(timeout=5)
+            self.assertFalse(searcher.is_alive())
+            index.update(2, "Zephyr Builders", "Ann", "Lee", False)
+            yield (1, "Ducharme Construction", "Tyler", "Hilliard", True)
+
+        index.refresh(rows, max_age=0)
+
+        self.assertEqual([doc["id"] for doc in found], [1])
+        self.assertEqual([doc["id"] for doc in index.search("zeph")], [2])
+        self.assertEqual([doc["id"] for doc in index.search("duch")], [1])
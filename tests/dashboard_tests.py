@@ -0,0 +1,97 @@
+import json
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.core.cache import cache
+from quickbidsapi.models import Contractor, Bid, Job
+from rest_framework.authtoken.models import Token
+
+
+class DashboardTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        cache.clear()
+
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_get_dashboard(self):
+        """
+        Ensure the dashboard returns the contractor's jobs and bids
+        """
+        # Token lookup, contractor, jobs, job fields and bids
+        with self.assertNumQueries(5):
+            response = self.client.get(
+                f"/contractors/{self.contractor.id}/dashboard")
+
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json_response["contractor"]["id"], self.contractor.id)
+        self.assertEqual(
+            len(json_response["jobs"]),
+            Job.objects.filter(contractor=self.contractor).count())
+        for job in json_response["jobs"]:
+            self.assertEqual(
+                job["bid_count"], Bid.objects.filter(job=job["id"]).count())
+        self.assertEqual(
+            len(json_response["incoming_bids"]),
+            Bid.objects.filter(primary_contractor=self.contractor,
+                               is_request=False).count())
+
+    def test_dashboard_is_cached_until_a_bid_changes(self):
+        """
+        Ensure a cached dashboard is served until a relevant bid is written
+        """
+        url = f"/contractors/{self.contractor.id}/dashboard"
+        self.client.get(url)
+
+        # Only the token lookup runs on a cache hit
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+        job = Job.objects.filter(contractor=self.contractor).first()
+        Bid.objects.create(rate=30, job=job, primary_contractor=self.contractor,
+                           sub_contractor=Contractor.objects.last())
+
+        response = self.client.get(url)
+        json_response = json.loads(response.content)
+        job_response = next(
+            item for item in json_response["jobs"] if item["id"] == job.id)
+
+        self.assertEqual(
+            job_response["bid_count"], Bid.objects.filter(job=job).count())
+
+    def test_dashboard_for_missing_contractor(self):
+        """
+        Ensure a dashboard for an unknown contractor returns a 404
+        """
+        response = self.client.get("/contractors/9999/dashboard")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_contractor_edit_refreshes_dashboards(self):
+        """
+        Ensure editing a contractor refreshes its dashboard and those of its bids' contractors
+        """
+        url = f"/contractors/{self.contractor.id}/dashboard"
+        bid = Bid.objects.filter(primary_contractor=self.contractor, is_request=False) \
+            .exclude(sub_contractor=self.contractor).first()
+        sub = bid.sub_contractor
+        self.client.get(url)
+
+        for contractor, company_name in ((self.contractor, "Renamed Primary"),
+                                         (sub, "Renamed Sub")):
+            response = self.client.put(f"/contractors/{contractor.id}", {
+                "first_name": contractor.user.first_name, "last_name": "Renamed",
+                "username": contractor.user.username, "email": contractor.user.email,
+                "company_name": company_name, "phone_number": contractor.phone_number,
+                "primary_contractor": contractor.primary_contractor}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        data = json.loads(self.client.get(url).content)
+        self.assertEqual(data["contractor"]["company_name"], "Renamed Primary")
+        incoming = {incoming["id"]: incoming for incoming in data["incoming_bids"]}
+        self.assertEqual(incoming[bid.id]["sub_contractor"]["company_name"], "Renamed Sub")
@@ -0,0 +1,101 @@
+import json
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.core.cache import caches
+from quickbidsapi.models import Contractor, Bid, Job
+from rest_framework.authtoken.models import Token
+
+
+class IdempotencyTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        # Start every test with an empty idempotency store
+        caches['idempotency'].clear()
+
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        self.bid_data = {
+            "rate": 17,
+            "job": 1,
+            "primary": 1,
+            "sub": 4,
+            "is_request": False
+        }
+
+    def test_replayed_bid_is_not_created_twice(self):
+        """
+        Ensure a retried POST /bids with the same key returns the first bid.
+        """
+        count = Bid.objects.count()
+
+        first = self.client.post(
+            "/bids", self.bid_data, format='json', HTTP_IDEMPOTENCY_KEY="retry-1")
+        second = self.client.post(
+            "/bids", self.bid_data, format='json', HTTP_IDEMPOTENCY_KEY="retry-1")
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(json.loads(first.content), json.loads(second.content))
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(Bid.objects.count(), count + 1)
+
+    def test_different_keys_create_separate_jobs(self):
+        """
+        Ensure distinct keys are treated as distinct requests.
+        """
+        count = Job.objects.count()
+        data = {
+            "fields": [1],
+            "name": "Test Job",
+            "address": "123 Testing Rd.",
+            "square_footage": 1700
+        }
+
+        self.client.post("/jobs", data, format='json', HTTP_IDEMPOTENCY_KEY="a")
+        self.client.post("/jobs", data, format='json', HTTP_IDEMPOTENCY_KEY="b")
+
+        self.assertEqual(Job.objects.count(), count + 2)
+
+    def test_reused_key_with_different_body_is_rejected(self):
+        """
+        Ensure a key cannot be reused for a different payload.
+        """
+        self.client.post(
+            "/bids", self.bid_data, format='json', HTTP_IDEMPOTENCY_KEY="retry-2")
+
+        self.bid_data["rate"] = 25
+        response = self.client.post(
+            "/bids", self.bid_data, format='json', HTTP_IDEMPOTENCY_KEY="retry-2")
+
+        self.assertEqual(response.status_code,
+                         status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_replayed_registration(self):
+        """
+        Ensure a retried registration returns the original token.
+        """
+        self.client.credentials()
+        data = {
+            "email": "retry@example.com",
+            "first_name": "Retry",
+            "last_name": "User",
+            "username": "retryuser",
+            "password": "password",
+            "company_name": "Retry Co",
+            "phone_number": "5555555555",
+            "primary_contractor": False
+        }
+
+        first = self.client.post(
+            "/register", data, format='json', HTTP_IDEMPOTENCY_KEY="signup")
+        second = self.client.post(
+            "/register", data, format='json', HTTP_IDEMPOTENCY_KEY="signup")
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(first.content)["token"],
+                         json.loads(second.content)["token"])
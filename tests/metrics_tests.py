@@ -0,0 +1,155 @@
+import multiprocessing
+import re
+import tempfile
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from quickbidsapi.metrics import cache_requests, http_requests_in_flight, store
+from quickbidsapi.models import Bid, Contractor, Job
+from quickbidsapi.views.metrics import _gauge_cache
+
+
+def sample(text, name, **labels):
+    """The value of one sample in a scrape, or None"""
+    for line in text.splitlines():
+        match = re.fullmatch(rf'{re.escape(name)}(?:{{(.*)}})? (\S+)', line)
+        if match and dict(re.findall(r'(\w+)="([^"]*)"', match.group(1) or '')) == labels:
+            return float(match.group(2))
+    return None
+
+
+def record_in_child(directory):
+    with override_settings(METRICS_DIR=directory):
+        cache_requests.inc(5, cache='response', result='hit')
+        http_requests_in_flight.inc()
+
+
+class MetricsTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(METRICS_DIR=self.directory, METRICS_TOKEN=None,
+                                     METRICS_PUBLIC=True)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        _gauge_cache.clear()
+
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def scrape(self):
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        return response.content.decode()
+
+    def test_requests_are_counted_and_timed(self):
+        """
+        Ensure request counts, latency and query histograms are recorded per route.
+        """
+        self.client.get("/bids")
+        self.client.get("/bids")
+        self.client.get(f"/bids/{Bid.objects.first().pk}")
+        self.client.get("/bids/0")
+
+        text = self.scrape()
+
+        self.assertEqual(sample(text, "quickbids_http_requests_total",
+                                method="GET", route="bid-list", status="200"), 2)
+        self.assertEqual(sample(text, "quickbids_http_requests_total",
+                                method="GET", route="bid-detail", status="404"), 1)
+        self.assertEqual(sample(text, "quickbids_http_request_duration_seconds_count",
+                                method="GET", route="bid-list"), 2)
+        self.assertEqual(sample(text, "quickbids_http_request_duration_seconds_bucket",
+                                method="GET", route="bid-list", le="+Inf"), 2)
+        self.assertGreater(sample(text, "quickbids_db_queries_per_request_sum",
+                                  route="bid-list"), 0)
+        self.assertGreater(sample(text, "quickbids_db_query_duration_seconds_count",
+                                  database="default"), 0)
+        # The scrape itself is in flight
+        self.assertEqual(sample(text, "quickbids_http_requests_in_flight"), 1)
+
+    def test_cache_lookups_and_business_gauges(self):
+        """
+        Ensure cache hits and misses and the open job and pending bid gauges are exposed.
+        """
+        self.client.get("/fields")
+        self.client.get("/fields")
+
+        text = self.scrape()
+
+        self.assertGreaterEqual(sample(text, "quickbids_cache_requests_total",
+                                       cache="response", result="hit"), 1)
+        self.assertEqual(sample(text, "quickbids_open_jobs"), Job.objects.filter(open=True).count())
+        self.assertEqual(sample(text, "quickbids_pending_bids"),
+                         Bid.objects.filter(accepted=False, rejected=False).count())
+
+    def test_metrics_of_every_process_are_summed(self):
+        """
+        Ensure another process's counters are added in and its gauges dropped once it exits.
+        """
+        cache_requests.inc(2, cache='response', result='hit')
+
+        child = multiprocessing.get_context("fork").Process(
+            target=record_in_child, args=(self.directory,))
+        child.start()
+        child.join()
+        text = self.scrape()
+
+        self.assertEqual(sample(text, "quickbids_cache_requests_total",
+                                cache="response", result="hit"), 7)
+        self.assertEqual(sample(text, "quickbids_http_requests_in_flight"), 1)
+
+    def test_values_survive_reopening_and_growth(self):
+        """
+        Ensure a process's file keeps its values when it outgrows its first size.
+        """
+        for number in range(30000):
+            cache_requests.inc(cache=f'cache{number}', result='hit')
+        store.directory = None
+
+        cache_requests.inc(cache='cache0', result='hit')
+        text = self.scrape()
+
+        self.assertEqual(sample(text, "quickbids_cache_requests_total",
+                                cache="cache0", result="hit"), 2)
+        self.assertEqual(sample(text, "quickbids_cache_requests_total",
+                                cache="cache29999", result="hit"), 1)
+
+    def test_token_is_required_when_configured(self):
+        """
+        Ensure scrapes must carry METRICS_TOKEN when it is set.
+        """
+        with override_settings(METRICS_TOKEN="secret"):
+            self.client.credentials()
+            self.assertEqual(self.client.get("/metrics").status_code,
+                             status.HTTP_401_UNAUTHORIZED)
+            self.client.credentials(HTTP_AUTHORIZATION="Bearer secret")
+            self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_200_OK)
+
+
+    def test_closed_without_token(self):
+        """
+        Ensure /metrics is refused when no METRICS_TOKEN is set and it is not public.
+        """
+        with override_settings(METRICS_PUBLIC=False):
+            self.assertEqual(self.client.get("/metrics").status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_business_gauges_are_cached(self):
+        """
+        Ensure the database gauges are counted once per METRICS_GAUGE_CACHE_SECONDS.
+        """
+        open_jobs = Job.objects.filter(open=True).count()
+        self.scrape()
+        Job.objects.filter(open=True).update(open=False)
+
+        self.assertEqual(sample(self.scrape(), "quickbids_open_jobs"), open_jobs)
+        with override_settings(METRICS_GAUGE_CACHE_SECONDS=0):
+            self.assertEqual(sample(self.scrape(), "quickbids_open_jobs"), 0)
@@ -0,0 +1,61 @@
+import json
+from rest_framework import status
+from rest_framework.test import APITestCase
+from quickbidsapi.models import Contractor
+from rest_framework.authtoken.models import Token
+
+
+class MultiGetTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_get_jobs_by_ids(self):
+        """
+        Ensure several jobs can be retrieved at once in request order
+        """
+        # Token lookup, jobs and their fields
+        with self.assertNumQueries(3):
+            response = self.client.get("/jobs?ids=3,1,2")
+
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([job["id"] for job in json_response["results"]], [3, 1, 2])
+        self.assertEqual(json_response["missing"], [])
+
+    def test_get_bids_by_ids_reports_missing(self):
+        """
+        Ensure ids that do not exist are reported rather than failing the batch
+        """
+        response = self.client.get("/bids?ids=1,9999,2")
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([bid["id"] for bid in json_response["results"]], [1, 2])
+        self.assertEqual(json_response["missing"], [9999])
+
+    def test_get_contractors_by_ids(self):
+        """
+        Ensure contractors can be retrieved by id with their user details
+        """
+        with self.assertNumQueries(2):
+            response = self.client.get("/contractors?ids=1,2")
+
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(json_response["results"]), 2)
+        self.assertIn("full_name", json_response["results"][0])
+
+    def test_invalid_ids(self):
+        """
+        Ensure a malformed id list is rejected
+        """
+        response = self.client.get("/jobs?ids=1,abc")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import time
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.response import Response
+from rest_framework.test import APITestCase
+from quickbidsapi.models import Contractor
+
+
+def slow_list(*args, **kwargs):
+    time.sleep(0.05)
+    return Response([])
+
+
+class ProfilingTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(PROFILE_DIR=self.directory, PROFILE_SAMPLE_RATE=0,
+                                     PROFILE_MAX_CAPTURES=3)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.staff_token = Token.objects.get_or_create(
+            user=User.objects.filter(is_staff=True).first())[0]
+        self.token = Token.objects.get_or_create(
+            user=Contractor.objects.filter(user__is_staff=False).first().user)[0]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.staff_token.key}")
+
+    def test_staff_header_captures_request(self):
+        """
+        Ensure a staff request with the header is profiled and listed.
+        """
+        response = self.client.get("/bids", HTTP_X_PROFILE="1")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        capture_id = response["X-Profile-Id"]
+        for suffix in (".json", ".prof", ".folded"):
+            self.assertTrue(os.path.exists(os.path.join(self.directory, capture_id + suffix)))
+
+        response = self.client.get("/profiles")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        summary = response.data[0]
+        self.assertEqual(summary["id"], capture_id)
+        self.assertEqual(summary["path"], "/bids")
+        self.assertEqual(summary["trigger"], "header")
+        self.assertEqual(summary["status"], 200)
+        self.assertGreater(summary["memory"]["peak"], 0)
+        self.assertTrue(summary["memory"]["top"])
+
+        response = self.client.get(f"/profiles/{capture_id}.prof")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(b"".join(response.streaming_content))
+
+    def test_collapsed_stacks_reach_the_view(self):
+        """
+        Ensure the sampled stacks are in collapsed form and reach the view.
+        """
+        with override_settings(PROFILE_SAMPLE_INTERVAL_MS=0.1), \
+                mock.patch("quickbidsapi.views.bid.BidView.list", side_effect=slow_list):
+            response = self.client.get("/bids", HTTP_X_PROFILE="1")
+
+        response = self.client.get(f"/profiles/{response['X-Profile-Id']}.folded")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(" ", 1)
+        self.assertGreater(int(count), 0)
+        self.assertIn("slow_list (tests/profiling_tests.py)", stack)
+
+    def test_header_ignored_for_other_users(self):
+        """
+        Ensure the header of a user who is not staff, and no header, profile nothing.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        response = self.client.get("/bids", HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("X-Profile-Id", response)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.staff_token.key}")
+        response = self.client.get("/bids")
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(os.listdir(self.directory), [])
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.assertEqual(self.client.get("/profiles").status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_sampled_requests_and_retention(self):
+        """
+        Ensure sampled requests are profiled and only the newest captures are kept.
+        """
+        with override_settings(PROFILE_SAMPLE_RATE=1):
+            ids = [self.client.get("/fields")["X-Profile-Id"] for _ in range(5)]
+
+        response = self.client.get("/profiles?limit=2")
+        self.assertEqual([summary["id"] for summary in response.data], ids[:-3:-1])
+        self.assertEqual({summary["trigger"] for summary in response.data}, {"sample"})
+        self.assertEqual(len(self.client.get("/profiles").data), 3)
+        self.assertEqual(self.client.get(f"/profiles/{ids[0]}.prof").status_code,
+                         status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,90 @@
+import json
+from io import StringIO
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from quickbidsapi import taskqueue
+from quickbidsapi.models import Bid, Contractor, Job, JobField, Purge
+from rest_framework.authtoken.models import Token
+
+
+class PurgeTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        # A contractor other than the one making the requests
+        self.target = Contractor.objects.filter(my_bids__isnull=False).exclude(
+            pk=self.contractor.pk).first()
+
+    def purge(self):
+        call_command('purge_deleted', batch_size=2, stdout=StringIO())
+
+    def test_deleted_contractor_bids_are_hidden(self):
+        """
+        Ensure a deleted contractor's bids disappear before they are purged
+        """
+        bid_ids = list(Bid.objects.filter(
+            sub_contractor=self.target).values_list('pk', flat=True))
+
+        response = self.client.delete(f"/contractors/{self.target.id}")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.client.get(f"/bids?sub={self.target.id}")
+        self.assertEqual(json.loads(response.content), [])
+        response = self.client.get(f"/bids/{bid_ids[0]}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # Still in the table until the purge runs
+        self.assertTrue(Bid._base_manager.filter(pk__in=bid_ids).exists())
+        self.assertFalse(User.objects.get(pk=self.target.user_id).is_active)
+
+    def test_purge_contractor(self):
+        """
+        Ensure the purge removes the contractor, their user and their bids
+        """
+        self.client.delete(f"/contractors/{self.target.id}")
+
+        self.purge()
+
+        purge = Purge.objects.get(model='contractor', object_id=self.target.id)
+        self.assertEqual(purge.status, Purge.DONE)
+        self.assertGreater(purge.rows_deleted, 0)
+        self.assertFalse(Contractor._base_manager.filter(pk=self.target.id).exists())
+        self.assertFalse(User.objects.filter(pk=self.target.user_id).exists())
+        self.assertFalse(Bid._base_manager.filter(sub_contractor=self.target.id).exists())
+
+    def test_delete_enqueues_purge_task(self):
+        """
+        Ensure deleting a contractor queues the background purge
+        """
+        self.client.delete(f"/contractors/{self.target.id}")
+
+        while taskqueue.run_next():
+            pass
+
+        purge = Purge.objects.get(model='contractor', object_id=self.target.id)
+        self.assertEqual(purge.status, Purge.DONE)
+        self.assertFalse(User.objects.filter(pk=self.target.user_id).exists())
+
+    def test_purge_job(self):
+        """
+        Ensure a deleted job is hidden, then purged with its bids and fields
+        """
+        job = Job.objects.filter(bids__isnull=False).first()
+
+        response = self.client.delete(f"/jobs/{job.id}")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Bid.objects.filter(job=job.id).exists())
+
+        self.purge()
+
+        self.assertFalse(Job._base_manager.filter(pk=job.id).exists())
+        self.assertFalse(Bid._base_manager.filter(job=job.id).exists())
+        self.assertFalse(JobField.objects.filter(job=job.id).exists())
@@ -0,0 +1,98 @@
+import json
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+from quickbidsapi import taskqueue
+from quickbidsapi.estimator import fit_rate_model
+from quickbidsapi.models import Contractor, Field, Job, RateCoefficient, Task
+from quickbidsapi.tasks import refresh_rate_model
+from rest_framework.authtoken.models import Token
+
+
+class RateModelTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_fit_recovers_a_line(self):
+        """
+        Ensure each field gets its own least squares line
+        """
+        painting, drywall = Field.objects.all()[:2]
+        rows = [(pk, painting.id, 10 + 0.01 * sqft, sqft)
+                for pk, sqft in enumerate(range(1000, 6000, 500))]
+        rows += [(100 + pk, drywall.id, 30.0, sqft)
+                 for pk, sqft in enumerate(range(1000, 3000, 500))]
+
+        fit_rate_model(rows)
+
+        coefficient = RateCoefficient.objects.get(field=painting)
+        self.assertAlmostEqual(coefficient.intercept, 10)
+        self.assertAlmostEqual(coefficient.slope, 0.01)
+        self.assertAlmostEqual(coefficient.residual_std, 0)
+        self.assertEqual(coefficient.samples, 10)
+
+        # Too few samples for a slope; the mean is used instead
+        coefficient = RateCoefficient.objects.get(field=drywall)
+        self.assertEqual(coefficient.slope, 0)
+        self.assertAlmostEqual(coefficient.intercept, 30)
+
+        self.assertEqual(RateCoefficient.objects.get(field__isnull=True).samples, 14)
+
+    def test_suggested_rate(self):
+        """
+        Ensure a job's suggestion comes from its fields' coefficients
+        """
+        job = Job.objects.filter(fields__isnull=False).first()
+        field = job.fields.first()
+        job.fields.set([field])
+        rows = [(pk, field.id, 10 + 0.01 * sqft, sqft)
+                for pk, sqft in enumerate(range(1000, 6000, 500))]
+        fit_rate_model(rows)
+
+        response = self.client.get(f"/jobs/{job.id}/suggested_rate")
+        json_response = json.loads(response.content)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertAlmostEqual(json_response["suggested_rate"], 10 + 0.01 * job.square_footage)
+        self.assertEqual(json_response["fields"], [field.id])
+        self.assertEqual(json_response["samples"], 10)
+
+    def test_not_fitted(self):
+        """
+        Ensure a job has no suggestion before the first fit
+        """
+        response = self.client.get("/jobs/1/suggested_rate")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_command_fits_fixtures_and_schedules_refresh(self):
+        """
+        Ensure the command fits accepted bids and queues one refresh task
+        """
+        call_command('fit_rate_model', schedule=True, stdout=StringIO())
+        call_command('fit_rate_model', schedule=True, stdout=StringIO())
+
+        self.assertTrue(RateCoefficient.objects.filter(field__isnull=True).exists())
+        self.assertEqual(Task.objects.filter(name='refresh_rate_model').count(), 1)
+
+    def test_failed_refresh_schedules_the_next(self):
+        """
+        Ensure a refresh that fails for good still queues the next one
+        """
+        refresh_rate_model.enqueue(max_attempts=1)
+
+        with mock.patch("quickbidsapi.tasks.fit_rate_model", side_effect=RuntimeError("boom")):
+            with self.assertLogs('quickbidsapi.taskqueue', level='ERROR'):
+                taskqueue.run_next()
+
+        tasks = Task.objects.filter(name='refresh_rate_model')
+        self.assertEqual(tasks.filter(status=Task.FAILED).count(), 1)
+        self.assertEqual(tasks.filter(status=Task.PENDING).count(), 1)
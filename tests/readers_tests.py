@@ -0,0 +1,97 @@
+from django.test import TestCase
+from django.db.models import Count
+from quickbidsapi.models import Bid, Contractor, Job
+from quickbidsapi.readers import (bid_reader, contractor_reader,
+                                  dashboard_job_reader, job_reader)
+
+
+class ReaderTests(TestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def test_bid_matches_model(self):
+        """
+        Ensure a bid is read with its nested job and contractors
+        """
+        bid = Bid.objects.select_related(
+            'job', 'primary_contractor', 'sub_contractor').get(pk=1)
+
+        data = bid_reader.get(Bid.objects.all(), pk=1)
+
+        self.assertEqual(data, {
+            'id': bid.id,
+            'rate': float(bid.rate),
+            'job': {
+                'id': bid.job.id,
+                'name': bid.job.name,
+                'contractor_id': bid.job.contractor_id,
+                'complete': bid.job.complete,
+                'open': bid.job.open,
+            },
+            'primary_contractor': {
+                'id': bid.primary_contractor.id,
+                'company_name': bid.primary_contractor.company_name,
+            },
+            'sub_contractor': {
+                'id': bid.sub_contractor.id,
+                'company_name': bid.sub_contractor.company_name,
+            },
+            'accepted': bid.accepted,
+            'rejected': bid.rejected,
+            'is_request': bid.is_request,
+        })
+
+    def test_float_fields(self):
+        """
+        Ensure float fields are rendered as floats and nulls are kept
+        """
+        Bid.objects.filter(pk=1).update(rate=None)
+        Bid.objects.filter(pk=2).update(rate=20)
+
+        self.assertIsNone(bid_reader.get(Bid.objects.all(), pk=1)['rate'])
+        self.assertIsInstance(bid_reader.get(Bid.objects.all(), pk=2)['rate'], float)
+
+    def test_job_fields(self):
+        """
+        Ensure many to many fields are read in one extra query
+        """
+        job = Job.objects.first()
+        job.fields.clear()
+
+        # Jobs, then every job's fields
+        with self.assertNumQueries(2):
+            jobs = job_reader.read(Job.objects.all())
+
+        by_id = {data['id']: data for data in jobs}
+        self.assertEqual(by_id[job.id]['fields'], [])
+        for other in Job.objects.exclude(pk=job.pk).prefetch_related('fields'):
+            self.assertEqual(by_id[other.id]['fields'], [
+                {'id': field.id, 'job_title': field.job_title} for field in other.fields.all()])
+
+    def test_contractor_names(self):
+        """
+        Ensure user columns and computed values are read with the contractor
+        """
+        contractor = Contractor.objects.select_related('user').first()
+
+        with self.assertNumQueries(1):
+            data = contractor_reader.get(Contractor.objects.all(), pk=contractor.pk)
+
+        self.assertEqual(data['username'], contractor.username())
+        self.assertEqual(data['full_name'], contractor.full_name)
+
+    def test_annotations(self):
+        """
+        Ensure annotated values can be read alongside model fields
+        """
+        jobs = Job.objects.filter(contractor=1).annotate(bid_count=Count('bids'))
+
+        for data in dashboard_job_reader.read(jobs):
+            self.assertEqual(data['bid_count'], Bid.objects.filter(job=data['id']).count())
+
+    def test_missing_row(self):
+        """
+        Ensure get returns None when nothing matches
+        """
+        self.assertIsNone(bid_reader.get(Bid.objects.all(), pk=9999))
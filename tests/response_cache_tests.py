@@ -0,0 +1,113 @@
+import json
+import time
+from unittest import mock
+from rest_framework import status
+from rest_framework.test import APITestCase
+from quickbidsapi import response_cache
+from quickbidsapi.models import Contractor, Field, Job
+from rest_framework.authtoken.models import Token
+
+
+class ResponseCacheTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        response_cache.clear()
+
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_repeated_list_is_served_from_cache(self):
+        """
+        Ensure an identical request does not query the jobs again
+        """
+        first = self.client.get("/jobs?open=true")
+
+        # Only the token lookup runs on a cache hit
+        with self.assertNumQueries(1):
+            second = self.client.get("/jobs?open=true")
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.content, second.content)
+
+    def test_query_parameter_order_is_normalized(self):
+        """
+        Ensure reordered query parameters share an entry
+        """
+        self.client.get("/jobs?open=true&complete=false")
+
+        with self.assertNumQueries(1):
+            self.client.get("/jobs?complete=false&open=true")
+
+    def test_write_invalidates_cached_list(self):
+        """
+        Ensure saving a field is visible on the next request
+        """
+        self.client.get("/fields")
+
+        field = Field.objects.first()
+        field.job_title = "Tile"
+        field.save()
+
+        response = self.client.get("/fields")
+        json_response = json.loads(response.content)
+
+        self.assertIn("Tile", [item["job_title"] for item in json_response])
+
+    def test_job_fields_change_invalidates_job(self):
+        """
+        Ensure changing a job's fields is visible on the next request
+        """
+        job = Job.objects.first()
+        self.client.get(f"/jobs/{job.id}")
+
+        job.fields.set([Field.objects.last()])
+
+        response = self.client.get(f"/jobs/{job.id}")
+        json_response = json.loads(response.content)
+
+        self.assertEqual([field["id"] for field in json_response["fields"]],
+                         [Field.objects.last().id])
+
+    def test_current_contractor_varies_by_user(self):
+        """
+        Ensure ?current is not shared between users
+        """
+        self.client.get("/contractors?current")
+
+        other = Contractor.objects.last()
+        token, created = Token.objects.get_or_create(user=other.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        response = self.client.get("/contractors?current")
+        json_response = json.loads(response.content)
+
+        self.assertEqual(json_response[0]["id"], other.id)
+
+    def test_not_found_is_not_cached(self):
+        """
+        Ensure a 404 is not served from the cache once the row exists
+        """
+        response = self.client.get("/fields/999")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        Field.objects.create(id=999, job_title="Roofing")
+
+        response = self.client.get("/fields/999")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_local_entries_expire(self):
+        """
+        Ensure an in-process entry is recomputed once its timeout has passed
+        """
+        self.client.get("/jobs?open=true")
+        later = time.monotonic() + 60
+
+        with mock.patch("quickbidsapi.response_cache.time.monotonic", return_value=later):
+            with mock.patch.object(response_cache, "put") as put:
+                self.client.get("/jobs?open=true")
+
+        put.assert_called_once()
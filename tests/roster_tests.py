@@ -0,0 +1,167 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import authenticate
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from quickbidsapi import taskqueue
+from quickbidsapi.models import Change, Contractor, RosterUpload
+
+
+def roster_row(number, **values):
+    return {
+        "username": f"roster{number}",
+        "email": f"roster{number}@example.com",
+        "password": f"password{number}",
+        "first_name": "Roster",
+        "last_name": f"Member {number}",
+        "company_name": f"Roster Co {number}",
+        "phone_number": "5555555555",
+        "primary_contractor": False,
+        **values,
+    }
+
+
+# PBKDF2 is slow on purpose; a fast hasher keeps the tests quick
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    ROSTER_HASH_WORKERS=1, ROSTER_BATCH_SIZE=2)
+class RosterImportTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors']
+
+    def setUp(self):
+        self.staff = User.objects.filter(is_staff=True).first()
+        token, created = Token.objects.get_or_create(user=self.staff)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def import_roster(self, data):
+        """Posts a roster, runs the queued import and returns its final progress"""
+        response = self.client.post("/contractors/import", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        while taskqueue.run_next():
+            pass
+        response = self.client.get(f"/contractors/import/{json.loads(response.content)['id']}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def test_import_creates_users_contractors_and_tokens(self):
+        """
+        Ensure every valid row gets a user who can log in, a contractor and a token.
+        """
+        rows = [roster_row(number) for number in range(1, 6)]
+        changes = Change.objects.count()
+
+        # The request only queues the import; a worker hashes the passwords
+        with mock.patch("quickbidsapi.roster.hash_passwords") as hash_passwords:
+            response = self.client.post("/contractors/import", {"roster": rows}, format='json')
+        hash_passwords.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(json.loads(response.content)["status"], RosterUpload.PENDING)
+
+        while taskqueue.run_next():
+            pass
+        response = self.client.get(f"/contractors/import/{json.loads(response.content)['id']}")
+        data = json.loads(response.content)
+
+        self.assertEqual(data["status"], RosterUpload.DONE)
+        self.assertEqual([created["row"] for created in data["created"]], [1, 2, 3, 4, 5])
+        # The plaintext passwords are dropped once imported
+        self.assertEqual(RosterUpload.objects.get(pk=data["id"]).rows, [])
+        self.assertEqual(data["errors"], [])
+        for number in range(1, 6):
+            user = authenticate(username=f"roster{number}", password=f"password{number}")
+            self.assertIsNotNone(user)
+            self.assertEqual(Contractor.objects.get(user=user).company_name, f"Roster Co {number}")
+            self.assertTrue(Token.objects.filter(user=user).exists())
+        # Imported contractors reach syncing clients
+        self.assertEqual(Change.objects.count(), changes + 5)
+
+    def test_import_reports_row_errors(self):
+        """
+        Ensure incomplete and duplicate rows are reported without stopping the rest.
+        """
+        taken = User.objects.first()
+        rows = [
+            roster_row(1),
+            roster_row(2, username=taken.username),
+            roster_row(3, email="ROSTER1@example.com"),
+            roster_row(4, company_name=""),
+            roster_row(5, email=taken.email),
+            roster_row(6, primary_contractor="maybe"),
+            roster_row(7),
+        ]
+
+        data = self.import_roster({"roster": rows})
+
+        self.assertEqual([created["username"] for created in data["created"]],
+                         ["roster1", "roster7"])
+        self.assertEqual({error["row"]: error["error"] for error in data["errors"]}, {
+            2: "An account with that username already exists",
+            3: "Duplicate email in roster",
+            4: "Missing company_name",
+            5: "An account with that email address already exists",
+            6: "primary_contractor must be true or false",
+        })
+        self.assertFalse(User.objects.filter(username="roster3").exists())
+
+    def test_resume_skips_rows_already_imported(self):
+        """
+        Ensure rerunning a roster with resume skips the rows it created before.
+        """
+        header = "username,email,password,first_name,last_name,company_name,phone_number,primary_contractor\n"
+        lines = [f"roster{number},roster{number}@example.com,pw,Roster,Member,Co,5555555555,true\n"
+                 for number in range(1, 4)]
+        csv = header + "".join(lines)
+        # An earlier run that stopped after two rows
+        self.import_roster({"roster": header + "".join(lines[:2])})
+        self.assertEqual(Contractor.objects.filter(user__username__startswith="roster").count(), 2)
+
+        data = self.import_roster({"roster": csv, "resume": True})
+
+        self.assertEqual([skipped["row"] for skipped in data["skipped"]], [1, 2])
+        self.assertEqual([created["row"] for created in data["created"]], [3])
+        self.assertEqual(data["errors"], [])
+        self.assertTrue(Contractor.objects.get(user__username="roster3").primary_contractor)
+
+        again = self.import_roster({"roster": csv})
+        self.assertEqual(len(again["errors"]), 3)
+
+    def test_import_is_staff_only(self):
+        """
+        Ensure contractors who are not staff cannot import rosters.
+        """
+        user = User.objects.filter(is_staff=False).first()
+        token, created = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        response = self.client.post(
+            "/contractors/import", {"roster": [roster_row(1)]}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(User.objects.filter(username="roster1").exists())
+        self.assertFalse(RosterUpload.objects.exists())
+
+    def test_import_roster_command(self):
+        """
+        Ensure the command imports a JSON roster file and writes its report.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "roster.json")
+            report = os.path.join(directory, "report.json")
+            with open(path, "w", encoding="utf-8") as roster:
+                json.dump([roster_row(1), roster_row(2), roster_row(3, username="roster1")], roster)
+
+            call_command('import_roster', path, report=report, workers=2,
+                         stdout=StringIO(), stderr=StringIO())
+
+            with open(report, encoding="utf-8") as result:
+                data = json.load(result)
+        self.assertEqual(len(data["created"]), 2)
+        self.assertEqual(data["errors"][0]["row"], 3)
@@ -0,0 +1,146 @@
+import json
+from django.core.management import call_command
+from django.db import connections
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from quickbidsapi import response_cache
+from quickbidsapi.analytics import rate_rows
+from quickbidsapi.dashboard import invalidate_dashboards
+from quickbidsapi.estimator import training_rows
+from quickbidsapi.models import Bid, Contractor, Field, Job
+from quickbidsapi.sharding import reshard_batch, shard_for
+from rest_framework.authtoken.models import Token
+
+SHARDS = ['bids_0', 'bids_1']
+
+
+@override_settings(BID_SHARDS=SHARDS)
+class ShardingTests(APITestCase):
+
+    databases = {'default', *SHARDS}
+
+    @classmethod
+    def setUpTestData(cls):
+        # Loaded by hand, since fixtures are loaded into every test database
+        call_command('loaddata', 'users', 'tokens', 'contractors', 'jobs', 'fields',
+                     'job_fields', 'bids', database='default', verbosity=0)
+
+    def setUp(self):
+        response_cache.clear()
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def reshard(self):
+        for source in ['default', *SHARDS]:
+            after = 0
+            while after is not None:
+                after, _ = reshard_batch(source, SHARDS, after, 4)
+
+    def get_json(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def test_reshard_moves_every_bid(self):
+        """
+        Ensure resharding leaves each bid on its job's shard and none behind
+        """
+        expected = set(Bid._base_manager.values_list('id', 'job_id'))
+        self.reshard()
+
+        self.assertFalse(Bid._base_manager.using('default').exists())
+        found = set()
+        for alias in SHARDS:
+            for pk, job_id in Bid._base_manager.using(alias).values_list('id', 'job_id'):
+                self.assertEqual(shard_for(job_id), alias)
+                found.add((pk, job_id))
+        self.assertEqual(found, expected)
+
+    def test_list_matches_unsharded(self):
+        """
+        Ensure scatter gathered lists hold the unsharded responses in id order
+        """
+        urls = ["/bids", f"/bids?sub={self.contractor.id}"]
+        with self.settings(BID_SHARDS=[]):
+            expected = [sorted(self.get_json(url), key=lambda bid: bid["id"]) for url in urls]
+            expected.append(self.get_json("/bids?ids=1,3,5,999"))
+
+        self.reshard()
+        response_cache.clear()
+        self.assertEqual([self.get_json(url) for url in urls + ["/bids?ids=1,3,5,999"]], expected)
+
+    def test_cross_job_reads_match_unsharded(self):
+        """
+        Ensure dashboards, rate samples and model training rows read every shard
+        """
+        dashboard = f"/contractors/{self.contractor.id}/dashboard"
+        field_id = Field.objects.values_list('id', flat=True).first()
+
+        def read():
+            invalidate_dashboards(self.contractor.id)
+            return (self.get_json(dashboard), sorted(rate_rows(None)),
+                    sorted(rate_rows(field_id)), sorted(training_rows()))
+
+        with self.settings(BID_SHARDS=[]):
+            expected = read()
+        self.assertTrue(expected[1])
+        self.assertTrue(any(job["bid_count"] for job in expected[0]["jobs"]))
+
+        self.reshard()
+        self.assertEqual(read(), expected)
+
+    def test_job_filter_reads_one_shard(self):
+        """
+        Ensure listing a job's bids only queries that job's shard
+        """
+        self.reshard()
+        job_id = Bid._base_manager.using('bids_1').values_list('job_id', flat=True).first()
+
+        with CaptureQueriesContext(connections['bids_0']) as queries:
+            bids = self.get_json(f"/bids?job={job_id}")
+        self.assertEqual(len(queries), 0)
+        self.assertEqual({bid["job"]["id"] for bid in bids}, {job_id})
+
+    def test_create_and_move(self):
+        """
+        Ensure new bids get unique ids on their job's shard and follow a job change
+        """
+        self.reshard()
+        jobs = {shard_for(job.id): job for job in Job.objects.all()}
+
+        data = {"rate": 17, "job": jobs['bids_0'].id, "primary": 1, "sub": 2, "is_request": False}
+        response = self.client.post("/bids", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        pk = json.loads(response.content)["id"]
+        self.assertEqual(Bid._base_manager.using('bids_0').filter(id__gte=pk).count(), 1)
+        self.assertFalse(Bid._base_manager.using('bids_1').filter(id__gte=pk).exists())
+
+        data = {"rate": 19, "job": jobs['bids_1'].id, "primary": 1, "sub": 2,
+                "accepted": False, "is_request": False}
+        response = self.client.put(f"/bids/{pk}", data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Bid._base_manager.using('bids_0').filter(pk=pk).exists())
+        self.assertEqual(Bid._base_manager.using('bids_1').get(pk=pk).rate, 19)
+
+    def test_accept_and_delete(self):
+        """
+        Ensure accepting and job deletes reach bids on the job's shard
+        """
+        self.reshard()
+        open_jobs = list(Job.objects.filter(
+            open=True, contractor=self.contractor).values_list('id', flat=True))
+        bid = Bid._base_manager.using(SHARDS[0]).filter(job__in=open_jobs).first() \
+            or Bid._base_manager.using(SHARDS[1]).filter(job__in=open_jobs).first()
+
+        response = self.client.post(f"/bids/{bid.id}/accept")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(json.loads(response.content)["accepted"])
+        shard = shard_for(bid.job_id)
+        for competitor in Bid._base_manager.using(shard).filter(job_id=bid.job_id).exclude(pk=bid.id):
+            self.assertTrue(competitor.rejected)
+
+        Job.objects.get(pk=bid.job_id).delete()
+        self.assertFalse(Bid._base_manager.using(shard).filter(job_id=bid.job_id).exists())
@@ -0,0 +1,156 @@
+import json
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from quickbidsapi.models import Contractor, Job, RevokedToken
+from quickbidsapi.purge import soft_delete_contractor
+from quickbidsapi.signed_tokens import issue_token, revocations
+
+
+class SignedTokenTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        # Revocations are kept per process, outside the test transaction
+        revocations.clear()
+
+        self.contractor = Contractor.objects.first()
+        self.contractor.user.set_password("password")
+        self.contractor.user.save()
+
+    def login(self, **data):
+        response = self.client.post("/login", {
+            "username": self.contractor.user.username, "password": "password", **data},
+            format='json')
+        return json.loads(response.content)
+
+    def test_login_issues_either_token_type(self):
+        """
+        Ensure login keeps returning DRF tokens unless a signed one is asked for.
+        """
+        token = Token.objects.get(user=self.contractor.user)
+        self.assertEqual(self.login()["token"], token.key)
+        self.assertEqual(self.login()["token_type"], "token")
+
+        signed = self.login(token_type="signed")
+        self.assertTrue(signed["valid"])
+        self.assertEqual(signed["token_type"], "signed")
+        self.assertNotEqual(signed["token"], token.key)
+        self.assertTrue(signed["primary"])
+        self.assertIn("expires_at", signed)
+
+        response = self.client.post("/login", {
+            "username": "nobody", "password": "password", "token_type": "jwt"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_signed_token_authenticates_without_reading_users(self):
+        """
+        Ensure a signed token is verified without a token or user query.
+        """
+        signed = self.login(token_type="signed")["token"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {signed}")
+
+        revocations.sync()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/fields")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tables = " ".join(query["sql"] for query in queries.captured_queries)
+        self.assertNotIn("authtoken_token", tables)
+        self.assertNotIn("auth_user", tables)
+        self.assertNotIn("revokedtoken", tables)
+
+    def test_signed_token_user_can_create_jobs(self):
+        """
+        Ensure views reading request.auth.user work with a signed token.
+        """
+        signed = self.login(token_type="signed")["token"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {signed}")
+
+        response = self.client.post("/jobs", {
+            "fields": [1], "name": "Signed Job", "address": "1 Signed St.",
+            "square_footage": 1000}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Job.objects.get(name="Signed Job").contractor, self.contractor)
+
+    def test_register_issues_signed_token(self):
+        """
+        Ensure register can answer with a signed token and still creates a DRF token.
+        """
+        response = self.client.post("/register", {
+            "email": "signed@example.com", "first_name": "Signed", "last_name": "User",
+            "username": "signeduser", "password": "password", "company_name": "Signed Co",
+            "phone_number": "5555555555", "primary_contractor": False,
+            "token_type": "signed"}, format='json')
+        data = json.loads(response.content)
+
+        self.assertEqual(data["token_type"], "signed")
+        self.assertFalse(data["primary"])
+        self.assertTrue(Token.objects.filter(user__username="signeduser").exists())
+
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {data['token']}")
+        self.assertEqual(self.client.get("/fields").status_code, status.HTTP_200_OK)
+
+    def test_tampered_and_expired_tokens_are_refused(self):
+        """
+        Ensure a token that was altered or has expired does not authenticate.
+        """
+        signed = self.login(token_type="signed")["token"]
+        payload, signature = signed.rsplit(":", 1)
+        forged = f"{payload[:-1]}{'A' if payload[-1] != 'A' else 'B'}:{signature}"
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {forged}")
+        self.assertEqual(self.client.get("/fields").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        with override_settings(SIGNED_TOKEN_MAX_AGE=-1):
+            expired = issue_token(self.contractor.user, self.contractor)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {expired.key}")
+        self.assertEqual(self.client.get("/fields").status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_logout_revokes_signed_token(self):
+        """
+        Ensure a logged out token is refused here at once and elsewhere after a sync.
+        """
+        signed = self.login(token_type="signed")["token"]
+        other = self.login(token_type="signed")["token"]
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {signed}")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/logout")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.client.get("/fields").status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # A process that has not seen the revocation reads it from the database
+        revocations.clear()
+        self.assertEqual(self.client.get("/fields").status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {other}")
+        self.assertEqual(self.client.get("/fields").status_code, status.HTTP_200_OK)
+
+    def test_logout_refuses_drf_tokens(self):
+        """
+        Ensure logging out with a DRF token leaves it working.
+        """
+        token = Token.objects.get(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+        response = self.client.post("/logout")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get("/fields").status_code, status.HTTP_200_OK)
+
+    def test_deleting_contractor_revokes_signed_tokens(self):
+        """
+        Ensure deleting a contractor revokes every signed token they hold.
+        """
+        signed = self.login(token_type="signed")["token"]
+
+        soft_delete_contractor(self.contractor)
+        revocations.sync()
+
+        self.assertEqual(RevokedToken.objects.filter(user_id=self.contractor.user_id).count(), 1)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {signed}")
+        self.assertEqual(self.client.get("/fields").status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,72 @@
+import threading
+import time
+from django.test import SimpleTestCase
+from quickbidsapi.singleflight import SingleFlight
+
+
+class SingleFlightTests(SimpleTestCase):
+
+    def run_concurrently(self, count, target):
+        barrier = threading.Barrier(count)
+
+        def run():
+            barrier.wait()
+            target()
+
+        threads = [threading.Thread(target=run) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def test_concurrent_calls_share_one_computation(self):
+        """
+        Ensure a stampede of identical calls runs the work once
+        """
+        flight = SingleFlight()
+        computed = []
+        results = []
+
+        def expensive():
+            computed.append(1)
+            time.sleep(0.2)
+            return b'[]'
+
+        self.run_concurrently(
+            8, lambda: results.append(flight.do('jobs?open=true', expensive)))
+
+        self.assertEqual(len(computed), 1)
+        self.assertEqual([result for result, leader in results], [b'[]'] * 8)
+        self.assertEqual([leader for result, leader in results].count(True), 1)
+
+    def test_waiters_receive_the_leaders_error(self):
+        """
+        Ensure a failure is raised in every waiting caller
+        """
+        flight = SingleFlight()
+        errors = []
+
+        def failing():
+            time.sleep(0.2)
+            raise RuntimeError('boom')
+
+        def call():
+            try:
+                flight.do('key', failing)
+            except RuntimeError as ex:
+                errors.append(ex)
+
+        self.run_concurrently(4, call)
+
+        self.assertEqual(len(errors), 4)
+
+    def test_sequential_calls_are_not_shared(self):
+        """
+        Ensure a key is forgotten once its call finishes
+        """
+        flight = SingleFlight()
+        flight.do('key', lambda: 1)
+        result, leader = flight.do('key', lambda: 2)
+
+        self.assertEqual(result, 2)
+        self.assertTrue(leader)
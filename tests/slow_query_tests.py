@@ -0,0 +1,88 @@
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from quickbidsapi.models import Bid, Contractor
+from quickbidsapi import slow_queries
+from quickbidsapi.slow_queries import normalize, read_log
+
+
+class SlowQueryTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.addCleanup(directory.cleanup)
+        self.log = os.path.join(directory.name, "slow_queries.log")
+        # Every statement counts as slow
+        settings = override_settings(SLOW_QUERY_THRESHOLD_MS=0, SLOW_QUERY_LOG_PATH=self.log)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        slow_queries._explained.clear()
+
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def test_queries_are_attributed_to_view_and_call_site(self):
+        """
+        Ensure each logged query names its viewset action, call site and plan.
+        """
+        self.client.get("/bids")
+
+        entries = [entry for entry in read_log(self.log) if entry["view"] == "BidView.list"]
+        self.assertTrue(entries)
+        bid_reads = [entry for entry in entries if '"quickbidsapi_bid"' in entry["sql"]
+                     and entry["sql"].startswith("SELECT")]
+        self.assertTrue(bid_reads)
+        for entry in bid_reads:
+            self.assertTrue(entry["call_site"].startswith("quickbidsapi"))
+            self.assertTrue(entry["plan"])
+            self.assertNotIn("tests", " ".join(entry["stack"]))
+
+    def test_repeats_share_a_fingerprint(self):
+        """
+        Ensure the same query with other arguments groups under one fingerprint.
+        """
+        first, second = Bid.objects.all()[:2]
+        self.client.get(f"/bids/{first.pk}")
+        self.client.get(f"/bids/{second.pk}")
+
+        entries = [entry for entry in read_log(self.log) if entry["view"] == "BidView.retrieve"]
+        by_fingerprint = {}
+        for entry in entries:
+            by_fingerprint.setdefault(entry["fingerprint"], []).append(entry)
+        repeated = [group for group in by_fingerprint.values()
+                    if len({entry["params_fingerprint"] for entry in group}) == 2]
+        self.assertTrue(repeated)
+        # Each statement is explained once per SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS
+        for group in repeated:
+            if group[0]["sql"].startswith("SELECT"):
+                self.assertTrue(group[0]["plan"])
+                self.assertIsNone(group[1]["plan"])
+
+    def test_normalize_strips_literals(self):
+        """
+        Ensure literals and IN lists do not split a statement's fingerprint.
+        """
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE a = 'x' AND b IN (%s, %s,  %s) LIMIT 21"),
+            normalize("SELECT * FROM t WHERE a = 'yy' AND b IN (%s) LIMIT 5"))
+
+    def test_summary_command(self):
+        """
+        Ensure the summary lists the statements with their views.
+        """
+        self.client.get("/bids")
+        output = StringIO()
+
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=None):
+            call_command("slow_queries", top=3, stdout=output)
+
+        self.assertIn("BidView.list", output.getvalue())
+        self.assertIn("distinct statements", output.getvalue())
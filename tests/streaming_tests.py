@@ -0,0 +1,80 @@
+import json
+from unittest import mock
+from rest_framework import status
+from rest_framework.test import APITestCase
+from django.test import override_settings
+from quickbidsapi import response_cache
+from quickbidsapi.models import Bid, Contractor, Job
+from rest_framework.authtoken.models import Token
+
+
+class StreamingTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        response_cache.clear()
+
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def get_content(self, url, chunk_size):
+        response_cache.clear()
+        # Streamed lists that fit are cached, and come back as one response
+        with override_settings(STREAM_CHUNK_SIZE=chunk_size, RESPONSE_CACHE_MAX_BYTES=0):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        if response.streaming:
+            return True, b''.join(response.streaming_content)
+        return False, response.content
+
+    def test_large_bid_list_is_streamed_identically(self):
+        """
+        Ensure a streamed list has the same bytes as a buffered one
+        """
+        streamed, streamed_content = self.get_content("/bids", 3)
+        buffered, buffered_content = self.get_content("/bids", 1000)
+
+        self.assertTrue(streamed)
+        self.assertFalse(buffered)
+        self.assertEqual(streamed_content, buffered_content)
+        self.assertEqual(len(json.loads(streamed_content)), Bid.objects.count())
+
+    def test_large_job_list_is_streamed_identically(self):
+        """
+        Ensure streamed jobs keep their nested fields
+        """
+        streamed, streamed_content = self.get_content("/jobs", 2)
+        buffered, buffered_content = self.get_content("/jobs", 1000)
+
+        self.assertTrue(streamed)
+        self.assertEqual(streamed_content, buffered_content)
+        self.assertEqual(len(json.loads(streamed_content)), Job.objects.count())
+
+    def test_streamed_list_is_cached(self):
+        """
+        Ensure a streamed list within RESPONSE_CACHE_MAX_BYTES is cached and served again
+        """
+        _, streamed_content = self.get_content("/bids", 3)
+        response_cache.clear()
+
+        with override_settings(STREAM_CHUNK_SIZE=3), \
+                mock.patch("quickbidsapi.response_cache.put", wraps=response_cache.put) as put:
+            first = self.client.get("/bids")
+            second = self.client.get("/bids")
+
+        self.assertEqual(put.call_count, 1)
+        self.assertFalse(first.streaming)
+        self.assertEqual(first.content, streamed_content)
+        self.assertEqual(second.content, streamed_content)
+
+    def test_empty_list(self):
+        """
+        Ensure a filter matching nothing still returns an empty list
+        """
+        streamed, content = self.get_content("/bids?job=9999", 2)
+
+        self.assertFalse(streamed)
+        self.assertEqual(json.loads(content), [])
@@ -0,0 +1,175 @@
+import json
+from datetime import timedelta
+from unittest import mock
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from quickbidsapi import taskqueue
+from quickbidsapi.archive import archive_batch
+from quickbidsapi.changelog import compact, visible_to
+from quickbidsapi.models import ArchivedBid, ArchivedJob, Bid, Change, Contractor, Job, Task
+from quickbidsapi.tasks import compact_change_log
+from rest_framework.authtoken.models import Token
+
+
+class SyncTests(APITestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        self.contractor = Contractor.objects.first()
+        token, created = Token.objects.get_or_create(user=self.contractor.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def create_job(self):
+        return Job.objects.create(contractor=self.contractor, name="Temporary",
+                                  address="1 Temporary Way", open=True, complete=False)
+
+    def get_sync(self, query=""):
+        response = self.client.get(f"/sync{query}")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)
+
+    def sync_all(self, since=""):
+        upserts, tombstones = {}, {}
+        while True:
+            page = self.get_sync(f"?since={since}&limit=7")
+            for name, rows in page["upserts"].items():
+                for row in rows:
+                    upserts.setdefault(name, {})[row["id"]] = row
+            for name, ids in page["tombstones"].items():
+                tombstones.setdefault(name, set()).update(ids)
+            since = page["cursor"]
+            if not page["has_more"]:
+                return since, upserts, tombstones
+
+    def test_first_sync_is_scoped(self):
+        """
+        Ensure a first sync returns every job but only the contractor's own bids
+        """
+        cursor, upserts, tombstones = self.sync_all()
+
+        own_bids = Bid.objects.filter(primary_contractor=self.contractor) \
+            | Bid.objects.filter(sub_contractor=self.contractor)
+        self.assertEqual(set(upserts["jobs"]), set(Job.objects.values_list('id', flat=True)))
+        self.assertEqual(set(upserts["bids"]), set(own_bids.values_list('id', flat=True)))
+        self.assertEqual(int(cursor.split("-")[0]), Change.objects.filter(
+            visible_to(self.contractor.id)).latest('id').id)
+
+    def test_changes_after_cursor(self):
+        """
+        Ensure only rows written after the cursor are returned
+        """
+        deleted = self.create_job()
+        cursor, _, _ = self.sync_all()
+
+        job = Job.objects.first()
+        job.name = "Renamed"
+        job.save()
+        deleted_id = deleted.id
+        deleted.delete()
+
+        page = self.get_sync(f"?since={cursor}")
+
+        self.assertEqual([row["name"] for row in page["upserts"]["jobs"]], ["Renamed"])
+        self.assertEqual(page["tombstones"]["jobs"], [deleted_id])
+        self.assertFalse(page["has_more"])
+
+    def test_changes_share_the_write_transaction(self):
+        """
+        Ensure accepting a bid logs every bid the bulk update rejected
+        """
+        bid = Bid.objects.filter(job__open=True, sub_contractor=self.contractor).first() \
+            or Bid.objects.filter(job__open=True).first()
+        last_change = Change.objects.latest('id').id
+
+        self.client.post(f"/bids/{bid.id}/accept")
+
+        logged = set(Change.objects.filter(id__gt=last_change, model='bid')
+                     .values_list('object_id', flat=True))
+        self.assertEqual(logged, set(Bid.objects.filter(job=bid.job_id)
+                                     .values_list('id', flat=True)))
+        self.assertTrue(Change.objects.filter(id__gt=last_change, model='job',
+                                              object_id=bid.job_id).exists())
+
+    def test_reassigned_bid_is_removed_from_old_contractor(self):
+        """
+        Ensure a contractor who can no longer see a bid gets a tombstone
+        """
+        bid = Bid.objects.filter(sub_contractor=self.contractor).first() \
+            or Bid.objects.filter(primary_contractor=self.contractor).first()
+        cursor, _, _ = self.sync_all()
+        other = Contractor.objects.exclude(pk=self.contractor.pk).exclude(
+            pk=bid.primary_contractor_id).exclude(pk=bid.sub_contractor_id).first()
+
+        if bid.sub_contractor_id == self.contractor.id:
+            bid.sub_contractor = other
+        else:
+            bid.primary_contractor = other
+        bid.save()
+
+        page = self.get_sync(f"?since={cursor}")
+        self.assertIn(bid.id, page["tombstones"]["bids"])
+
+    def test_compaction(self):
+        """
+        Ensure compaction keeps the latest entry per row and expires old cursors
+        """
+        deleted = self.create_job()
+        cursor, before, _ = self.sync_all()
+        job = Job.objects.first()
+        for name in ("One", "Two", "Three"):
+            job.name = name
+            job.save()
+        deleted_id = deleted.id
+        deleted.delete()
+        Change.objects.filter(action=Change.DELETE).update(
+            created_at=timezone.now() - timedelta(days=60))
+
+        run = compact(batch_size=5)
+
+        self.assertEqual(Change.objects.filter(model='job', object_id=job.id).count(), 1)
+        self.assertFalse(Change.objects.filter(action=Change.DELETE).exists())
+        self.assertGreater(run.horizon, int(cursor.split("-")[0]))
+
+        response = self.client.get(f"/sync?since={cursor}")
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+        _, after, _ = self.sync_all()
+        self.assertEqual(after["jobs"][job.id]["name"], "Three")
+        self.assertNotIn(deleted_id, after["jobs"])
+        self.assertEqual(set(after["bids"]), set(before["bids"]))
+
+    def test_archived_rows_are_not_tombstoned(self):
+        """
+        Ensure archiving a job sends its archived row and bids, not tombstones
+        """
+        bid = Bid.objects.filter(primary_contractor=self.contractor).first()
+        cursor, _, _ = self.sync_all()
+        Job.objects.filter(pk=bid.job_id).update(
+            complete=True, completed_at=timezone.now() - timedelta(days=400))
+
+        archive_batch(timezone.now() - timedelta(days=365), 100)
+
+        self.assertTrue(ArchivedJob.objects.filter(pk=bid.job_id).exists())
+        self.assertTrue(ArchivedBid.objects.filter(pk=bid.id).exists())
+        _, upserts, tombstones = self.sync_all(cursor)
+        self.assertEqual(upserts["jobs"][bid.job_id]["id"], bid.job_id)
+        self.assertIn(bid.id, upserts["bids"])
+        self.assertNotIn(bid.job_id, tombstones.get("jobs", set()))
+        self.assertNotIn(bid.id, tombstones.get("bids", set()))
+
+    def test_failed_compaction_schedules_the_next(self):
+        """
+        Ensure a compaction that fails for good still queues the next one
+        """
+        compact_change_log.enqueue(max_attempts=1)
+
+        with mock.patch("quickbidsapi.tasks.compact", side_effect=RuntimeError("boom")):
+            with self.assertLogs('quickbidsapi.taskqueue', level='ERROR'):
+                taskqueue.run_next()
+
+        tasks = Task.objects.filter(name='compact_change_log')
+        self.assertEqual(tasks.filter(status=Task.FAILED).count(), 1)
+        self.assertEqual(tasks.filter(status=Task.PENDING).count(), 1)
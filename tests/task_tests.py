@@ -0,0 +1,101 @@
+from datetime import timedelta
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from quickbidsapi import taskqueue
+from quickbidsapi.models import Task
+from quickbidsapi.taskqueue import task
+
+calls = []
+
+
+@task
+def record_call(value):
+    calls.append(value)
+
+
+@task
+def always_fails():
+    raise RuntimeError('boom')
+
+
+class TaskQueueTests(TestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def setUp(self):
+        calls.clear()
+
+    def test_tasks_run_by_priority(self):
+        """
+        Ensure higher priority tasks are claimed first
+        """
+        record_call.enqueue(value='low')
+        record_call.enqueue(value='high', priority=10)
+
+        while taskqueue.run_next():
+            pass
+
+        self.assertEqual(calls, ['high', 'low'])
+        self.assertFalse(Task.objects.exclude(status=Task.DONE).exists())
+
+    def test_delayed_task_waits(self):
+        """
+        Ensure a delayed task is not claimed early
+        """
+        record_call.enqueue(value='later', delay=timedelta(hours=1))
+
+        self.assertFalse(taskqueue.run_next())
+        self.assertEqual(calls, [])
+
+    def test_failed_task_is_retried_then_given_up(self):
+        """
+        Ensure failures are retried until max_attempts is reached
+        """
+        queued = always_fails.enqueue(max_attempts=2)
+
+        with self.assertLogs('quickbidsapi.taskqueue', level='ERROR'):
+            taskqueue.run_next()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.PENDING)
+        self.assertIn('boom', queued.last_error)
+
+        # Skip the backoff
+        Task.objects.filter(pk=queued.pk).update(run_after=timezone.now())
+        with self.assertLogs('quickbidsapi.taskqueue', level='ERROR'):
+            taskqueue.run_next()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Task.FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_expired_lease_is_reclaimed(self):
+        """
+        Ensure a task abandoned by a dead worker runs again
+        """
+        queued = record_call.enqueue(value='again')
+        Task.objects.filter(pk=queued.pk).update(
+            status=Task.RUNNING, locked_until=timezone.now() - timedelta(seconds=1))
+
+        self.assertTrue(taskqueue.run_next())
+        self.assertEqual(calls, ['again'])
+
+
+class WorkerTests(TransactionTestCase):
+
+    fixtures = ['users', 'tokens', 'contractors',
+                'jobs', 'fields', 'job_fields', 'bids']
+
+    def test_worker_drains_queue(self):
+        """
+        Ensure the worker threads run every queued task
+        """
+        calls.clear()
+        for value in range(10):
+            record_call.enqueue(value=value)
+
+        call_command('run_worker', threads=3, once=True, stdout=StringIO())
+
+        self.assertEqual(sorted(calls), list(range(10)))
+        self.assertEqual(Task.objects.filter(status=Task.DONE).count(), 10)